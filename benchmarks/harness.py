@@ -0,0 +1,105 @@
+"""Timing harness, result files and baseline comparison for the benchmark suite."""
+import asyncio
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of pre-sorted samples."""
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, max(0, int(round(pct / 100.0 * len(samples))) - 1))
+    return samples[index]
+
+
+def summarize(samples: List[float], ops_per_call: int = 1) -> Dict:
+    """Summarize per-call durations (seconds) as latency percentiles and throughput."""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        "iterations": len(ordered),
+        "p50_ms": _percentile(ordered, 50) * 1000,
+        "p99_ms": _percentile(ordered, 99) * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000 if ordered else 0.0,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+        "throughput_per_s": (len(ordered) * ops_per_call / total) if total else 0.0,
+    }
+
+
+def measure(fn: Callable[[], object], iterations: int = 200, warmup: int = 10,
+            ops_per_call: int = 1) -> Dict:
+    """Time a synchronous callable."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, ops_per_call)
+
+
+def measure_async(fn: Callable[[], Awaitable[object]], iterations: int = 200,
+                  warmup: int = 10, ops_per_call: int = 1) -> Dict:
+    """Time a coroutine function on a fresh event loop."""
+    async def _run():
+        for _ in range(warmup):
+            await fn()
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await fn()
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    return summarize(asyncio.run(_run()), ops_per_call)
+
+
+def build_report(results: Dict[str, Dict]) -> Dict:
+    """Wrap benchmark results with run metadata."""
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def write_report(report: Dict, path: str):
+    """Write a report as JSON, creating its directory if needed."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load_report(path: str) -> Dict:
+    """Load a previously written report."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_to_baseline(report: Dict, baseline: Dict, tolerance: float = 0.2,
+                        metric: str = "p99_ms") -> List[Dict]:
+    """Return the benchmarks whose `metric` regressed by more than `tolerance`."""
+    regressions = []
+    for name, current in report["results"].items():
+        previous: Optional[Dict] = baseline.get("results", {}).get(name)
+        if not previous or not previous.get(metric):
+            continue
+        change = (current[metric] - previous[metric]) / previous[metric]
+        if change > tolerance:
+            regressions.append({
+                "benchmark": name,
+                "metric": metric,
+                "baseline": previous[metric],
+                "current": current[metric],
+                "change": change,
+            })
+    return regressions
@@ -0,0 +1,152 @@
+"""
+Parity and per-call speed of `core.market_data.indicators` against pandas/`ta`.
+
+Checks every indicator, on single series and on a batch of series (one per
+row), against the pandas or `ta` implementation it replaces, then times both
+on strategy-sized inputs and writes the timings as JSON (by default to
+benchmarks/results/, which git ignores).
+
+Usage:
+    python -m benchmarks.indicators --output indicators.json
+    python -m benchmarks.indicators --bars 250 --batch 500 --iterations 500
+
+Exits with status 1 when any indicator differs from its reference by more
+than the tolerance.
+"""
+import argparse
+import sys
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from ta.momentum import RSIIndicator
+from ta.trend import MACD
+from ta.volatility import AverageTrueRange, BollingerBands
+
+from benchmarks.harness import build_report, measure, write_report
+from core.market_data import indicators
+
+DEFAULT_OUTPUT = "benchmarks/results/indicators_results.json"
+
+# (name, numpy implementation, pandas/ta reference), each f(high, low, close) -> array
+Case = Tuple[str, Callable, Callable]
+
+CASES: List[Case] = [
+    ("sma", lambda h, l, c: indicators.sma(c, 20),
+     lambda h, l, c: c.rolling(20).mean()),
+    ("ema", lambda h, l, c: indicators.ema(c, 20),
+     lambda h, l, c: c.ewm(span=20, adjust=False).mean()),
+    ("rsi", lambda h, l, c: indicators.rsi(c, 14),
+     lambda h, l, c: RSIIndicator(c, window=14).rsi()),
+    ("macd", lambda h, l, c: indicators.macd(c)[0],
+     lambda h, l, c: MACD(c).macd()),
+    ("macd_signal", lambda h, l, c: indicators.macd(c)[1],
+     lambda h, l, c: MACD(c).macd_signal()),
+    ("macd_diff", lambda h, l, c: indicators.macd(c)[2],
+     lambda h, l, c: MACD(c).macd_diff()),
+    ("bollinger_upper", lambda h, l, c: indicators.bollinger(c)[1],
+     lambda h, l, c: BollingerBands(c).bollinger_hband()),
+    ("bollinger_lower", lambda h, l, c: indicators.bollinger(c)[2],
+     lambda h, l, c: BollingerBands(c).bollinger_lband()),
+    ("atr", lambda h, l, c: indicators.atr(h, l, c, 14),
+     lambda h, l, c: AverageTrueRange(h, l, c, window=14).average_true_range()),
+    ("rolling_max", lambda h, l, c: indicators.rolling_max(h, 20),
+     lambda h, l, c: h.rolling(20).max()),
+    ("rolling_min", lambda h, l, c: indicators.rolling_min(l, 20),
+     lambda h, l, c: l.rolling(20).min()),
+]
+
+# Indicators whose reference fills the warm-up with zeros instead of NaN
+ZERO_WARMUP = {"atr"}
+
+
+def synthetic_ohlc(rows: int, bars: int, seed: int = 7) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Random-walk high, low and close arrays of shape (rows, bars)."""
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.01, (rows, bars)), axis=1))
+    spread = np.abs(rng.normal(0, 0.005, (rows, bars))) * close
+    return close + spread, close - spread, close
+
+
+def _max_error(name: str, ours: np.ndarray, reference: pd.Series) -> float:
+    """Largest absolute difference where the reference is defined; inf if NaNs disagree."""
+    expected = reference.to_numpy(dtype=float)
+    if name in ZERO_WARMUP:
+        expected = np.where(np.isnan(ours), np.nan, expected)
+    if not np.array_equal(np.isnan(ours), np.isnan(expected)):
+        return float("inf")
+    defined = ~np.isnan(expected)
+    return float(np.max(np.abs(ours[defined] - expected[defined]), initial=0.0))
+
+
+def check_parity(bars: int, batch: int, tolerance: float) -> Dict[str, float]:
+    """Max error of each indicator against its reference, 1-D and batched."""
+    high, low, close = synthetic_ohlc(batch, bars)
+    errors = {}
+    for name, ours, reference in CASES:
+        batched = ours(high, low, close)
+        worst = 0.0
+        for row in range(batch):
+            h, l, c = pd.Series(high[row]), pd.Series(low[row]), pd.Series(close[row])
+            expected = reference(h, l, c)
+            worst = max(
+                worst,
+                _max_error(name, ours(high[row], low[row], close[row]), expected),
+                _max_error(name, batched[row], expected),
+            )
+        errors[name] = worst
+        status = "✅" if worst <= tolerance else "❌"
+        print(f"{status} {name:16s} max abs error {worst:.3e}")
+    return errors
+
+
+def bench(bars: int, batch: int, iterations: int) -> Dict:
+    """Per-call timings: numpy 1-D, pandas/ta 1-D, and numpy over a whole batch."""
+    high, low, close = synthetic_ohlc(batch, bars)
+    h, l, c = pd.Series(high[0]), pd.Series(low[0]), pd.Series(close[0])
+    results = {}
+    for name, ours, reference in CASES:
+        results[f"indicators.{name}.numpy"] = measure(
+            lambda f=ours: f(high[0], low[0], close[0]), iterations=iterations
+        )
+        results[f"indicators.{name}.reference"] = measure(
+            lambda f=reference: f(h, l, c), iterations=iterations
+        )
+        results[f"indicators.{name}.numpy_batch"] = measure(
+            lambda f=ours: f(high, low, close), iterations=max(10, iterations // 10),
+            ops_per_call=batch,
+        )
+    return results
+
+
+def main() -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Indicator parity and speed vs pandas/ta")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write results")
+    parser.add_argument("--bars", type=int, default=250, help="Bars per series")
+    parser.add_argument("--batch", type=int, default=100, help="Series in the batched run")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--tolerance", type=float, default=1e-8,
+                        help="Allowed max absolute difference from the reference")
+    args = parser.parse_args()
+
+    errors = check_parity(args.bars, min(args.batch, 20), args.tolerance)
+    results = bench(args.bars, args.batch, args.iterations)
+    report = build_report(results)
+    report["parity"] = errors
+    write_report(report, args.output)
+
+    for name, _, _ in CASES:
+        ours = results[f"indicators.{name}.numpy"]["p50_ms"]
+        reference = results[f"indicators.{name}.reference"]["p50_ms"]
+        per_series = 1000.0 / results[f"indicators.{name}.numpy_batch"]["throughput_per_s"]
+        print(
+            f"{name:16s} numpy={ours:8.4f}ms reference={reference:8.4f}ms "
+            f"speedup={reference / ours:6.1f}x batch={per_series:8.4f}ms/series"
+        )
+    print(f"\n📄 Results written to {args.output}")
+    return 0 if all(error <= args.tolerance for error in errors.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
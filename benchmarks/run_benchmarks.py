@@ -0,0 +1,220 @@
+"""
+End-to-end load and latency benchmarks.
+
+Runs the trading tick, strategy evaluation, Redis publishing, WebSocket fan-out
+and API endpoints against local stand-ins (simulated broker, in-memory Redis,
+temporary SQLite database) and writes p50/p99 latency and throughput as JSON.
+
+Usage:
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --output bench.json --baseline baseline.json --tolerance 0.2
+
+Exits with status 1 when any benchmark's p99 regresses beyond the tolerance.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Dict
+
+from benchmarks.harness import (
+    build_report, compare_to_baseline, load_report, measure, measure_async, write_report
+)
+from benchmarks.stand_ins import InMemoryRedis, NullWebSocket, synthetic_bars, write_bars_csv
+
+BENCH_SYMBOLS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "TSLA", "META", "BRK.B", "UNH", "JNJ"]
+
+
+def configure_environment(workdir: str):
+    """Point every service at local stand-ins before any app module is imported."""
+    bars_file = os.path.join(workdir, "bars.csv")
+    write_bars_csv(synthetic_bars(BENCH_SYMBOLS), bars_file)
+    os.environ["BROKER_BACKEND"] = "simulator"
+    os.environ["SIM_BARS_FILE"] = bars_file
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+    # Benchmarks exercise hot paths that log per call; keep the output readable
+    os.environ["LOG_LEVEL"] = "WARNING"
+
+
+def prepare_services():
+    """Create tables, swap Redis for the in-memory stand-in and replay all bars."""
+    # pylint: disable=import-outside-toplevel
+    from core.clients import alpaca_trading_client
+    from core.clients.redis_messaging_client import redis_client
+    from core.database.database_manager import init_db
+
+    init_db()
+    redis_client.redis = InMemoryRedis()
+    # Every synthetic bar ends before today, so seeking to now makes them all visible
+    alpaca_trading_client.get_alpaca().seek(time.time(), speed=0.0)
+
+
+def bench_trading_job(iterations: int) -> Dict:
+    """One full tick over the benchmark universe (forced, so it runs outside market hours)."""
+    from services.trading.trading_engine import run_trading_job  # pylint: disable=import-outside-toplevel
+
+    return {
+        "trading_job.tick": measure(
+            lambda: run_trading_job(force=True), iterations=iterations, warmup=2
+        )
+    }
+
+
+def bench_strategies(iterations: int) -> Dict:
+    """Each strategy's evaluate() on a realistic bar history."""
+    # pylint: disable=import-outside-toplevel
+    from core.market_data.multi_timeframe import fetch_bars
+    from services.trading.strategy_manager import get_strategy
+
+    results = {}
+    for name in ["momentum", "rsi", "breakout", "sma_crossover"]:
+        strategy = get_strategy(name)
+        # Columnar bars as the tick passes them, and the same bars as dicts
+        bars = fetch_bars("AAPL", strategy.timeframe, strategy.lookback)
+        records = bars.to_records()
+        results[f"strategy.{name}.evaluate"] = measure(
+            lambda s=strategy, b=bars: s.evaluate(b), iterations=iterations
+        )
+        results[f"strategy.{name}.evaluate_records"] = measure(
+            lambda s=strategy, r=records: s.evaluate(r), iterations=iterations
+        )
+    return results
+
+
+def bench_redis(iterations: int) -> Dict:
+    """RedisClient publish_* serialization and dispatch cost."""
+    from core.clients.redis_messaging_client import redis_client  # pylint: disable=import-outside-toplevel
+
+    return {
+        "redis.publish_trade": measure(
+            lambda: redis_client.publish_trade(
+                symbol="AAPL", action="buy", price=187.5,
+                timestamp="2024-01-02T15:30:00", strategy="MomentumStrategy"
+            ),
+            iterations=iterations,
+        ),
+        "redis.publish_status": measure(
+            lambda: redis_client.publish_status("Running"), iterations=iterations
+        ),
+        "redis.publish_strategy_change": measure(
+            lambda: redis_client.publish_strategy_change("rsi"), iterations=iterations
+        ),
+    }
+
+
+def bench_risk(iterations: int) -> Dict:
+    """Pre-trade risk check against a synced account cache (no broker calls)."""
+    # pylint: disable=import-outside-toplevel
+    from services.trading.risk_gate import AccountCache, RiskGate, RiskLimits
+
+    cache = AccountCache()
+    cache.equity, cache.buying_power = 1e9, 1e12
+    gate = RiskGate(
+        RiskLimits(max_position_qty=1e9, max_position_notional=1e12, max_order_notional=1e6,
+                   max_concentration=0.5, killed=["KilledStrategy"]),
+        cache,
+    )
+    return {
+        "risk.check": measure(lambda: gate.check("AAPL", 1, 187.5), iterations=iterations),
+    }
+
+
+def bench_websocket(iterations: int, clients: int) -> Dict:
+    """WebSocketManager.broadcast fan-out to `clients` connections."""
+    # pylint: disable=import-outside-toplevel
+    from core.codec import dumps
+    from services.websocket.websocket_server import WebSocketManager
+
+    ws_manager = WebSocketManager()
+    for _ in range(clients):
+        asyncio.run(ws_manager.connect(NullWebSocket()))
+    # As the Redis subscriber receives it: JSON text encoded by the publisher
+    message = dumps({
+        "type": "trade", "symbol": "AAPL", "action": "buy", "price": 187.5,
+        "timestamp": "2024-01-02T15:30:00", "strategy": "MomentumStrategy",
+    }).decode()
+    return {
+        f"websocket.broadcast.{clients}_clients": measure_async(
+            lambda: ws_manager.broadcast(message), iterations=iterations, ops_per_call=clients
+        )
+    }
+
+
+def bench_api(iterations: int) -> Dict:
+    """Request latency and throughput of the main read endpoints."""
+    # pylint: disable=import-outside-toplevel
+    from fastapi.testclient import TestClient
+    from services.api.api_server import app
+
+    client = TestClient(app)
+    results = {}
+    for path in ["/api/health", "/api/status", "/api/trades", "/api/account", "/api/positions"]:
+        results[f"api.GET {path}"] = measure(lambda p=path: client.get(p), iterations=iterations)
+        # A dashboard re-poll with the ETag it already holds
+        etag = client.get(path).headers.get("etag")
+        if etag:
+            results[f"api.GET {path} (304)"] = measure(
+                lambda p=path, e=etag: client.get(p, headers={"If-None-Match": e}),
+                iterations=iterations,
+            )
+    return results
+
+
+def run(iterations: int, clients: int) -> Dict:
+    """Run every benchmark group and collect results."""
+    results = {}
+    results.update(bench_strategies(iterations))
+    results.update(bench_redis(iterations))
+    results.update(bench_risk(iterations))
+    results.update(bench_websocket(iterations, clients))
+    results.update(bench_api(iterations))
+    results.update(bench_trading_job(max(5, iterations // 20)))
+    return results
+
+
+def main() -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Run latency/throughput benchmarks")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write results")
+    parser.add_argument("--baseline", help="Previous results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative p99 regression before failing (default 0.2)")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=100,
+                        help="WebSocket clients for the broadcast benchmark")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_environment(workdir)
+        prepare_services()
+        report = build_report(run(args.iterations, args.clients))
+
+    write_report(report, args.output)
+    for name, stats in sorted(report["results"].items()):
+        print(
+            f"{name:45s} p50={stats['p50_ms']:9.3f}ms p99={stats['p99_ms']:9.3f}ms "
+            f"throughput={stats['throughput_per_s']:12.1f}/s"
+        )
+    print(f"\n📄 Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(report, load_report(args.baseline), args.tolerance)
+        for reg in regressions:
+            print(
+                f"❌ {reg['benchmark']}: {reg['metric']} {reg['baseline']:.3f} -> "
+                f"{reg['current']:.3f} ({reg['change']:+.0%})"
+            )
+        if regressions:
+            return 1
+        print("✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
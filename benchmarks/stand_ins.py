@@ -0,0 +1,99 @@
+"""Local stand-ins for Redis, WebSocket clients and market data used by benchmarks."""
+import csv
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+
+class InMemoryRedis:
+    """Minimal in-process replacement for the redis-py client's publish/get/set/smembers/ping."""
+
+    def __init__(self, subscribers: int = 1):
+        """Initialize with a fixed subscriber count reported by publish."""
+        self.subscribers = subscribers
+        self.published: List = []
+        self.values: Dict = {}
+
+    def publish(self, channel: str, message) -> int:
+        """Record the message and report the subscriber count."""
+        self.published.append((channel, message))
+        if len(self.published) > 10000:
+            self.published.clear()
+        return self.subscribers
+
+    def set(self, key: str, value, nx: bool = False) -> bool:
+        """Store a value (only if missing with `nx`)."""
+        if nx and key in self.values:
+            return False
+        self.values[key] = value
+        return True
+
+    def get(self, key: str):
+        """A stored value, or None."""
+        return self.values.get(key)
+
+    def smembers(self, key: str) -> set:
+        """Members of a stored set (empty if missing)."""
+        return set(self.values.get(key, ()))
+
+    def ping(self) -> bool:
+        """Always healthy."""
+        return True
+
+
+class NullWebSocket:
+    """WebSocket client stand-in that accepts and discards messages."""
+
+    def __init__(self):
+        """Initialize the sent-message counter."""
+        self.sent = 0
+
+    async def accept(self):
+        """Accept the connection."""
+
+    async def send_json(self, _message):
+        """Discard a JSON message."""
+        self.sent += 1
+
+    async def send_text(self, _message):
+        """Discard a text message."""
+        self.sent += 1
+
+    async def send_bytes(self, _message):
+        """Discard a binary message."""
+        self.sent += 1
+
+
+def synthetic_bars(symbols: List[str], count: int = 300, seed: int = 7) -> List[Dict]:
+    """Random-walk daily bars ending yesterday for each symbol."""
+    rng = random.Random(seed)
+    end = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    rows = []
+    for symbol in symbols:
+        price = rng.uniform(50, 500)
+        for i in range(count):
+            ts = end - timedelta(days=count - i)
+            change = rng.gauss(0, 0.015)
+            open_ = price
+            close = max(1.0, price * (1 + change))
+            rows.append({
+                "symbol": symbol,
+                "timestamp": ts.isoformat().replace("+00:00", "Z"),
+                "open": round(open_, 4),
+                "high": round(max(open_, close) * (1 + abs(rng.gauss(0, 0.005))), 4),
+                "low": round(min(open_, close) * (1 - abs(rng.gauss(0, 0.005))), 4),
+                "close": round(close, 4),
+                "volume": rng.randint(100000, 5000000),
+            })
+            price = close
+    return rows
+
+
+def write_bars_csv(rows: List[Dict], path: str):
+    """Write bars in the replay/simulator CSV format."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(
+            f, fieldnames=["symbol", "timestamp", "open", "high", "low", "close", "volume"]
+        )
+        writer.writeheader()
+        writer.writerows(rows)
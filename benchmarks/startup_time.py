@@ -0,0 +1,91 @@
+"""
+Cold-start budget check for each service.
+
+Imports every service entry module in a fresh interpreter, with no Redis,
+broker or database reachable, and fails if any import exceeds its budget.
+
+Usage:
+    python -m benchmarks.startup_time --output startup.json
+    python -m benchmarks.startup_time --budget-ms 800 --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict
+
+from benchmarks.harness import build_report, write_report
+
+SERVICE_MODULES = {
+    "api": "services.api.api_server",
+    "websocket": "services.websocket.websocket_server",
+    "trading": "services.trading.trading_engine",
+    "streaming": "services.trading.streaming_engine",
+}
+
+DEFAULT_BUDGET_MS = 1000.0
+
+_PROBE = (
+    "import json, time; start = time.perf_counter(); import {module}; "
+    "print(json.dumps({{'ms': (time.perf_counter() - start) * 1000, "
+    "'modules': sorted(m for m in __import__('sys').modules "
+    "if m.split('.')[0] in ('pandas', 'numpy', 'ta', 'alpaca_trade_api', 'apscheduler'))}}))"
+)
+
+
+def measure_import(module: str, runs: int) -> Dict:
+    """Import `module` in `runs` fresh interpreters and summarize the timings."""
+    env = dict(os.environ)
+    # Point at endpoints that do not exist: startup must not need them
+    env.setdefault("REDIS_URL", "redis://127.0.0.1:1")
+    env.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    timings = []
+    heavy_modules = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module)],
+            capture_output=True, text=True, check=True, env=env,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        timings.append(result["ms"])
+        heavy_modules = result["modules"]
+    return {
+        "median_ms": statistics.median(timings),
+        "max_ms": max(timings),
+        "runs": runs,
+        "heavy_modules_loaded": heavy_modules,
+    }
+
+
+def main() -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Measure service cold-start import time")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="Maximum median import time per service")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    over_budget = []
+    for service, module in SERVICE_MODULES.items():
+        stats = measure_import(module, args.runs)
+        stats["budget_ms"] = args.budget_ms
+        results[f"startup.{service}"] = stats
+        status = "✅" if stats["median_ms"] <= args.budget_ms else "❌"
+        if status == "❌":
+            over_budget.append(service)
+        print(
+            f"{status} {service:10s} median={stats['median_ms']:8.1f}ms "
+            f"max={stats['max_ms']:8.1f}ms heavy={stats['heavy_modules_loaded'] or '-'}"
+        )
+
+    if args.output:
+        write_report(build_report(results), args.output)
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
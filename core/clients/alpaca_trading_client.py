@@ -1,102 +1,273 @@
-"""Alpaca trading client for market data and order execution."""
+"""Alpaca trading client for market data and order execution.
+
+The broker client is created on first use (see `get_alpaca`), so importing
+this module loads neither `.env` nor the Alpaca SDK.
+"""
 import os
 import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
-from dotenv import load_dotenv
-from alpaca_trade_api.rest import REST, TimeFrame, APIError
-
-# Load .env from project root
-load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"))
+from core.clients.rate_limiter import (
+    PRIORITY_BARS, PRIORITY_NAMES, PRIORITY_ORDERS, PRIORITY_READS,
+    RateBudgetExceeded, get_broker_limiter
+)
+from core.monitoring.metrics import BROKER_RATE_LIMITED_TOTAL
 
 # Logging
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s - %(message)s')
 
-# Credentials
-ALPACA_KEY = os.getenv("ALPACA_API_KEY")
-ALPACA_SECRET = os.getenv("ALPACA_SECRET_KEY")
-BASE_URL = os.getenv("APCA_API_BASE_URL", "https://paper-api.alpaca.markets")
+# How long a dashboard read may wait for rate budget before giving up
+READ_BUDGET_TIMEOUT = float(os.getenv("BROKER_READ_TIMEOUT", "2"))
+# Retries after an HTTP 429, backing off from RATE_LIMIT_BACKOFF seconds
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_BACKOFF = 1.0
+
+# Monotonic time after which broker calls in this context give up (see broker_deadline)
+_call_deadline: ContextVar[Optional[float]] = ContextVar("broker_call_deadline", default=None)
+
+_client = None
+_client_lock = threading.Lock()
+
+def _load_env():
+    """Load .env from the project root."""
+    from dotenv import load_dotenv  # pylint: disable=import-outside-toplevel
+
+    load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"))
+
+def create_broker():
+    """Create the REST client for the configured broker backend.
+
+    BROKER_BACKEND is "alpaca" (live/paper REST API) or "simulator" (in-process replay).
+    """
+    backend = os.getenv("BROKER_BACKEND", "alpaca").lower()
+    if backend == "simulator":
+        from core.clients.simulated_broker import SimulatedBroker  # pylint: disable=import-outside-toplevel
+
+        return SimulatedBroker.from_csv(
+            os.getenv("SIM_BARS_FILE", "bars.csv"),
+            speed=float(os.getenv("SIM_SPEED", "60")),
+            starting_cash=float(os.getenv("SIM_STARTING_CASH", "100000")),
+            slippage_bps=float(os.getenv("SIM_SLIPPAGE_BPS", "5")),
+            fill_delay=float(os.getenv("SIM_FILL_DELAY", "0")),
+        )
+
+    from alpaca_trade_api.rest import REST  # pylint: disable=import-outside-toplevel
+
+    return REST(
+        os.getenv("ALPACA_API_KEY"),
+        os.getenv("ALPACA_SECRET_KEY"),
+        os.getenv("APCA_API_BASE_URL", "https://paper-api.alpaca.markets"),
+    )
+
+def get_alpaca():
+    """Return the shared broker client, creating it on first use."""
+    global _client  # pylint: disable=global-statement
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _load_env()
+                try:
+                    _client = create_broker()
+                    logger.info(
+                        "✅ Broker client initialized (%s).", os.getenv("BROKER_BACKEND", "alpaca")
+                    )
+                except Exception as e:
+                    logger.error("❌ Failed to initialize broker client: %s", e)
+                    raise
+    return _client
+
+def __getattr__(name):
+    """Keep `alpaca_trading_client.alpaca` working as a lazy alias."""
+    if name == "alpaca":
+        return get_alpaca()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _api_error():
+    """Alpaca's APIError class, imported on demand."""
+    from alpaca_trade_api.rest import APIError  # pylint: disable=import-outside-toplevel
+
+    return APIError
+
+@contextmanager
+def broker_deadline(at: float):
+    """Make broker calls in this block give up (RateBudgetExceeded) once monotonic time `at` passes.
+
+    A request already sent is not interrupted, but none starts, and none
+    waits for rate budget, past the deadline.
+    """
+    token = _call_deadline.set(at)
+    try:
+        yield
+    finally:
+        _call_deadline.reset(token)
 
-# REST client
-try:
-    alpaca = REST(ALPACA_KEY, ALPACA_SECRET, BASE_URL)
-    logger.info("✅ Alpaca client initialized.")
-except Exception as e:
-    logger.error("❌ Failed to initialize Alpaca client: %s", e)
-    raise
+def _broker_call(priority: int, method: str, *args, **kwargs):
+    """Call a broker client method under the shared rate limit.
+
+    Dashboard reads give up (RateBudgetExceeded) if no token frees up within
+    READ_BUDGET_TIMEOUT; orders and bar fetches wait, but never past a
+    `broker_deadline`. On HTTP 429 every caller is held back and the call is
+    retried with exponential backoff.
+    """
+    limiter = get_broker_limiter()
+    attempt = 0
+    while True:
+        timeout = READ_BUDGET_TIMEOUT if priority == PRIORITY_READS else None
+        deadline = _call_deadline.get()
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RateBudgetExceeded(f"Deadline passed before {method} ({PRIORITY_NAMES[priority]})")
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        if not limiter.acquire(priority, timeout=timeout):
+            raise RateBudgetExceeded(
+                f"No broker rate budget for {method} ({PRIORITY_NAMES[priority]})"
+            )
+        try:
+            return getattr(get_alpaca(), method)(*args, **kwargs)
+        except _api_error() as e:
+            if getattr(e, "status_code", None) != 429 or attempt >= RATE_LIMIT_RETRIES:
+                raise
+        delay = RATE_LIMIT_BACKOFF * 2 ** attempt
+        attempt += 1
+        BROKER_RATE_LIMITED_TOTAL.inc()
+        logger.warning("⚠️ Broker rate limited on %s, backing off %.1fs", method, delay)
+        limiter.penalize(delay)
+
+def market_now() -> datetime:
+    """Current time on the broker's clock (simulated time when replaying)."""
+    clock = getattr(get_alpaca(), "clock", None)
+    if clock is not None:
+        return datetime.fromtimestamp(clock.now(), timezone.utc)
+    return datetime.now(timezone.utc)
 
 def get_account():
     """Get account information from Alpaca."""
     try:
-        return alpaca.get_account()
-    except APIError as e:
+        return _broker_call(PRIORITY_READS, "get_account")
+    except (_api_error(), RateBudgetExceeded) as e:
         logger.error("Error fetching account: %s", e)
         return None
 
-def get_positions():
-    """Get current positions from Alpaca."""
+def get_positions(strict: bool = False):
+    """Get current positions from Alpaca; on failure an empty list, or None when `strict`."""
     try:
-        positions = alpaca.list_positions()
+        positions = _broker_call(PRIORITY_READS, "list_positions")
         logger.info("Retrieved %d open positions.", len(positions))
         return [p._raw for p in positions]
-    except APIError as e:
+    except (_api_error(), RateBudgetExceeded) as e:
         logger.error("Error fetching positions: %s", e)
-        return []
+        return None if strict else []
 
 def get_activities(limit=20):
     """Get recent account activities from Alpaca."""
     try:
-        acts = alpaca.get_activities()
+        acts = _broker_call(PRIORITY_READS, "get_activities")
         logger.info("Retrieved %d activity records.", len(acts))
         return [a._raw for a in acts[:limit]]
-    except APIError as e:
+    except (_api_error(), RateBudgetExceeded) as e:
         logger.error("Error fetching activities: %s", e)
         return []
 
-def get_recent_bars(symbol: str, market_type: str = "stock", days: int = 10, limit: int = 5):
-    """Get recent bar data for a symbol."""
-    now = datetime.now(timezone.utc)
-    past = now - timedelta(days=days)
+def get_bars_frame(
+    symbol: str, timeframe, days: int, market_type: str = "stock",
+    start: Optional[datetime] = None
+):
+    """Get bars as a timestamp-indexed DataFrame.
+
+    Covers the last `days` calendar days, or everything since `start` when given.
+    Returns None when the request fails.
+    """
+    now = market_now()
+    past = start if start is not None else now - timedelta(days=days)
     start_str = past.isoformat(timespec="seconds").replace("+00:00", "Z")
     end_str = now.isoformat(timespec="seconds").replace("+00:00", "Z")
 
     try:
         if market_type == "crypto":
-            bars = alpaca.get_crypto_bars(symbol, TimeFrame.Day, start=start_str, end=end_str).df
+            bars = _broker_call(
+                PRIORITY_BARS, "get_crypto_bars", symbol, timeframe, start=start_str, end=end_str
+            ).df
         else:
-            bars = alpaca.get_bars(
-                symbol, TimeFrame.Day, start=start_str, end=end_str, feed="iex"
+            bars = _broker_call(
+                PRIORITY_BARS, "get_bars", symbol, timeframe, start=start_str, end=end_str, feed="iex"
             ).df
+    except _api_error() as e:
+        logger.error("Error fetching bars for %s (%s): %s", symbol, market_type, e)
+        return None
 
-        if bars.empty:
-            logger.warning("No %s bar data for %s", market_type, symbol)
-            return []
-
+    if bars.empty:
+        logger.warning("No %s bar data for %s", market_type, symbol)
+    else:
         logger.info("Retrieved %d %s bars for %s", len(bars), market_type, symbol)
-        return bars.tail(limit).to_dict("records")
-    except APIError as e:
-        logger.error("Error fetching bars for %s (%s): %s", symbol, market_type, e)
+    return bars
+
+def get_recent_bars(
+    symbol: str, market_type: str = "stock", days: int = 10, limit: int = 5,
+    timeframe=None
+):
+    """Get recent bar data for a symbol (daily bars unless `timeframe` is given)."""
+    if timeframe is None:
+        from alpaca_trade_api.rest import TimeFrame  # pylint: disable=import-outside-toplevel
+
+        timeframe = TimeFrame.Day
+    bars = get_bars_frame(symbol, timeframe, days, market_type)
+    if bars is None or bars.empty:
         return []
+    return bars.tail(limit).to_dict("records")
 
-def submit_market_order(symbol: str, qty: float, side: str = "buy", market_type: str = "stock"):
-    """Submit a market order to Alpaca."""
+def get_tradable_symbols(asset_class: str = "us_equity"):
+    """Symbols of active, tradable assets listed by the broker."""
+    try:
+        assets = _broker_call(PRIORITY_BARS, "list_assets", status="active", asset_class=asset_class)
+    except _api_error() as e:
+        logger.error("Error listing %s assets: %s", asset_class, e)
+        return []
+    symbols = [asset.symbol for asset in assets if asset.tradable]
+    logger.info("Retrieved %d tradable %s assets.", len(symbols), asset_class)
+    return symbols
+
+def submit_market_order(
+    symbol: str, qty: float, side: str = "buy", market_type: str = "stock",
+    time_in_force: str = "day"
+):
+    """Submit a market order to Alpaca.
+
+    Market orders default to "day" so anything unfilled at the close expires
+    instead of resting until a later session.
+    """
     try:
         logger.info(
             "Submitting %s %s order: %s %s", side.upper(), market_type.upper(), qty, symbol
         )
-        order = alpaca.submit_order(
+        order = _broker_call(
+            PRIORITY_ORDERS,
+            "submit_order",
             symbol=symbol,
             qty=qty,
             side=side,
             type="market",
-            time_in_force="gtc"
+            time_in_force=time_in_force
         )
         return order._raw
-    except APIError as e:
+    except _api_error() as e:
         logger.error("Failed to submit %s order for %s: %s", side, symbol, e)
         return None
 
+def get_order(order_id: str):
+    """Get the current state of an order, or None if it cannot be read."""
+    try:
+        order = _broker_call(PRIORITY_ORDERS, "get_order", order_id)
+        return order._raw if order is not None else None
+    except _api_error() as e:
+        logger.error("Error fetching order %s: %s", order_id, e)
+        return None
+
 
 def validate_connection():
     """Validate the Alpaca API connection."""
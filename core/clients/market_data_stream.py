@@ -0,0 +1,135 @@
+"""
+Streaming market-data client for real-time bar and trade updates.
+
+Speaks the Alpaca market-data WebSocket protocol, so it works against the
+live feed and against the local replay server used as a stand-in.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+DATA_STREAM_URL = os.getenv(
+    "ALPACA_DATA_STREAM_URL", "wss://stream.data.alpaca.markets/v2/iex"
+)
+
+BarHandler = Callable[[Dict], Awaitable[None]]
+
+# Close reason the replay server sends once every bar has been replayed
+REPLAY_FINISHED = "replay finished"
+
+
+def normalize_bar(raw: Dict) -> Dict:
+    """Convert an Alpaca stream bar into the record format used by strategies."""
+    return {
+        "symbol": raw["S"],
+        "timestamp": raw["t"],
+        "open": float(raw["o"]),
+        "high": float(raw["h"]),
+        "low": float(raw["l"]),
+        "close": float(raw["c"]),
+        "volume": float(raw.get("v", 0)),
+        "trade_count": raw.get("n"),
+        "vwap": raw.get("vw"),
+    }
+
+
+def normalize_trade(raw: Dict) -> Dict:
+    """Convert an Alpaca stream trade into a flat record."""
+    return {
+        "symbol": raw["S"],
+        "timestamp": raw["t"],
+        "price": float(raw["p"]),
+        "size": float(raw.get("s", 0)),
+    }
+
+
+class MarketDataStream:
+    """WebSocket market-data client that dispatches bars and trades to handlers."""
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        key: Optional[str] = None,
+        secret: Optional[str] = None,
+        reconnect_delay: float = 5.0,
+        reconnect: bool = True,
+    ):
+        """Initialize the stream client."""
+        self.url = url or DATA_STREAM_URL
+        self.key = key or os.getenv("ALPACA_API_KEY")
+        self.secret = secret or os.getenv("ALPACA_SECRET_KEY")
+        self.reconnect_delay = reconnect_delay
+        self.reconnect = reconnect
+        self._stopped = False
+
+    def stop(self):
+        """Stop the stream after the current message."""
+        self._stopped = True
+
+    async def _handshake(self, ws, symbols: List[str], trades: bool):
+        """Authenticate and subscribe to bar (and optionally trade) updates."""
+        await ws.send(json.dumps({"action": "auth", "key": self.key, "secret": self.secret}))
+        subscription = {"action": "subscribe", "bars": symbols}
+        if trades:
+            subscription["trades"] = symbols
+        await ws.send(json.dumps(subscription))
+
+    async def _dispatch(
+        self, message: Dict, on_bar: BarHandler, on_trade: Optional[BarHandler]
+    ):
+        """Route a single stream message to the matching handler."""
+        msg_type = message.get("T")
+        if msg_type == "b":
+            await on_bar(normalize_bar(message))
+        elif msg_type == "t" and on_trade is not None:
+            await on_trade(normalize_trade(message))
+        elif msg_type == "error":
+            logger.error("❌ Market data stream error: %s", message.get("msg"))
+        elif msg_type in ("success", "subscription"):
+            logger.info("📡 Market data stream: %s", message.get("msg", msg_type))
+
+    async def run(
+        self,
+        symbols: List[str],
+        on_bar: BarHandler,
+        on_trade: Optional[BarHandler] = None,
+    ):
+        """Consume the stream until stopped, reconnecting after `reconnect_delay` on connection loss.
+
+        A replay that has sent all its bars ends the stream instead of being replayed again.
+        """
+        self._stopped = False
+        while not self._stopped:
+            try:
+                async with websockets.connect(self.url) as ws:
+                    logger.info("🔌 Connected to market data stream: %s", self.url)
+                    await self._handshake(ws, symbols, trades=on_trade is not None)
+                    async for raw in ws:
+                        for message in json.loads(raw):
+                            await self._dispatch(message, on_bar, on_trade)
+                        if self._stopped:
+                            break
+                if self._stopped or not self.reconnect:
+                    break
+                if ws.close_reason == REPLAY_FINISHED:
+                    logger.info("🏁 Replay finished, stopping market data stream")
+                    break
+                logger.warning(
+                    "⚠️ Market data stream closed by the server, reconnecting in %.1fs",
+                    self.reconnect_delay
+                )
+            except (OSError, websockets.ConnectionClosed) as e:
+                if self._stopped or not self.reconnect:
+                    break
+                logger.warning(
+                    "⚠️ Market data stream disconnected (%s), retrying in %.1fs",
+                    e, self.reconnect_delay
+                )
+            await asyncio.sleep(self.reconnect_delay)
@@ -0,0 +1,100 @@
+"""
+Local market-data replay server.
+
+Replays historical bars from a CSV file over the Alpaca market-data WebSocket
+protocol, so the streaming engine can be exercised without a live feed.
+
+Usage:
+    python -m core.clients.market_replay_server --file bars.csv --port 8765 --speed 60
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+import websockets
+
+from core.clients.market_data_stream import REPLAY_FINISHED
+from core.market_data.historical_bars import load_bars_csv
+
+logger = logging.getLogger(__name__)
+
+
+def to_stream_bar(row: Dict) -> Dict:
+    """Convert a CSV row into an Alpaca stream bar message."""
+    return {
+        "T": "b",
+        "S": row["symbol"],
+        "t": row["timestamp"],
+        "o": float(row["open"]),
+        "h": float(row["high"]),
+        "l": float(row["low"]),
+        "c": float(row["close"]),
+        "v": float(row.get("volume") or 0),
+    }
+
+
+def _parse_ts(value: str) -> datetime:
+    """Parse an ISO-8601 timestamp, accepting a trailing Z."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class MarketReplayServer:
+    """Replays recorded bars to subscribed clients at a configurable speed."""
+
+    def __init__(self, bars: List[Dict], speed: float = 0.0):
+        """Initialize the replay server; speed=0 replays as fast as possible."""
+        self.bars = bars
+        self.speed = speed
+
+    async def _replay(self, ws, symbols: List[str]):
+        """Send subscribed bars, sleeping between bar timestamps when speed > 0."""
+        wanted = set(symbols)
+        previous = None
+        for row in self.bars:
+            if "*" not in wanted and row["symbol"] not in wanted:
+                continue
+            if self.speed > 0 and previous is not None:
+                gap = (_parse_ts(row["timestamp"]) - previous).total_seconds()
+                if gap > 0:
+                    await asyncio.sleep(gap / self.speed)
+            previous = _parse_ts(row["timestamp"])
+            await ws.send(json.dumps([to_stream_bar(row)]))
+
+    async def handler(self, ws):
+        """Handle one client: connect, auth and subscribe, then replay."""
+        await ws.send(json.dumps([{"T": "success", "msg": "connected"}]))
+        async for raw in ws:
+            request = json.loads(raw)
+            action = request.get("action")
+            if action == "auth":
+                await ws.send(json.dumps([{"T": "success", "msg": "authenticated"}]))
+            elif action == "subscribe":
+                symbols = request.get("bars", [])
+                await ws.send(json.dumps([{"T": "subscription", "bars": symbols}]))
+                await self._replay(ws, symbols)
+                logger.info("🏁 Replay finished for %d symbols", len(symbols))
+                # Tells the client the replay is over, so it does not reconnect for another
+                await ws.close(reason=REPLAY_FINISHED)
+                return
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765):
+        """Serve replay sessions until cancelled."""
+        async with websockets.serve(self.handler, host, port):
+            logger.info("🎞️ Replay server listening on ws://%s:%d", host, port)
+            await asyncio.Future()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Replay bars over a WebSocket feed")
+    parser.add_argument("--file", required=True, help="CSV of bars to replay")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="Replay speed multiplier (0 = as fast as possible)")
+    args = parser.parse_args()
+    asyncio.run(MarketReplayServer(load_bars_csv(args.file), args.speed).serve(args.host, args.port))
@@ -0,0 +1,226 @@
+"""
+Token-bucket rate limiting for broker API calls.
+
+Every broker request takes a token from one shared bucket. Callers declare a
+priority class: orders may use the whole bucket, bar fetches leave a reserve
+for orders, and dashboard reads leave a larger one, so when the budget runs
+low the least important traffic waits (or is dropped) first. The bucket is
+local to the process by default; `BROKER_RATE_LIMITER=redis` keeps it in
+Redis so several processes share one quota.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Optional, Sequence
+
+from core.monitoring.metrics import BROKER_THROTTLED_TOTAL, BROKER_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Priority classes, most important first
+PRIORITY_ORDERS = 0
+PRIORITY_BARS = 1
+PRIORITY_READS = 2
+
+PRIORITY_NAMES = ("orders", "bars", "reads")
+
+# Fraction of the burst each class must leave untouched for the classes above it
+DEFAULT_RESERVES = (0.0, 0.1, 0.3)
+
+# Seconds a Redis-backed bucket limits locally after a Redis error before retrying Redis
+REDIS_LIMITER_RETRY_SECONDS = 5.0
+
+
+class RateBudgetExceeded(Exception):
+    """Raised when no token became available within the caller's timeout."""
+
+
+class TokenBucket:
+    """Thread-safe bucket refilled at `rate` tokens per second, holding up to `burst`.
+
+    A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, reserves: Sequence[float] = DEFAULT_RESERVES):
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.floors = [fraction * self.burst for fraction in reserves]
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting = [0] * len(self.floors)
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float):
+        """Add the tokens earned since the last refill."""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _wait_time(self, priority: int, now: float) -> float:
+        """Seconds until `priority` may take a token (0 if it may now). Caller holds the lock."""
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if any(self._waiting[:priority]):
+            # A more important caller is queued: let it go first
+            return 1.0 / self.rate
+        floor = self.floors[priority]
+        if self._tokens - 1 >= floor:
+            return 0.0
+        return (floor + 1 - self._tokens) / self.rate
+
+    def acquire(self, priority: int = PRIORITY_ORDERS, timeout: Optional[float] = None) -> bool:
+        """Take a token, waiting at most `timeout` seconds (forever if None)."""
+        if self.rate <= 0:
+            return True
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._wait_time(priority, now)
+                    if wait <= 0:
+                        self._tokens -= 1
+                        break
+                    if deadline is not None and now + wait > deadline:
+                        BROKER_THROTTLED_TOTAL.labels(priority=PRIORITY_NAMES[priority]).inc()
+                        return False
+                    self._cond.wait(wait)
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+        BROKER_WAIT_SECONDS.labels(priority=PRIORITY_NAMES[priority]).observe(time.monotonic() - start)
+        return True
+
+    def penalize(self, seconds: float):
+        """Empty the bucket and hold every caller for `seconds` (after a 429)."""
+        with self._cond:
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+# Atomically refill and take a token; returns the seconds to wait (0 when taken).
+# KEYS[1] bucket hash; ARGV: rate, burst, floor, penalty seconds (0 = take a token)
+_REDIS_BUCKET_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local floor, penalty = tonumber(ARGV[3]), tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated', 'blocked_until')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+local blocked = tonumber(state[3]) or 0
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if penalty > 0 then
+    tokens = 0
+    blocked = math.max(blocked, now + penalty)
+elseif now < blocked then
+    wait = blocked - now
+elseif tokens - 1 >= floor then
+    tokens = tokens - 1
+else
+    wait = (floor + 1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now, 'blocked_until', blocked)
+redis.call('EXPIRE', KEYS[1], 3600)
+return tostring(wait)
+"""
+
+
+class RedisTokenBucket(TokenBucket):
+    """Token bucket kept in Redis so every process shares one broker quota.
+
+    Priority reserves apply across processes; queueing order between waiters
+    applies only within a process. While Redis is unavailable the local
+    bucket is used, and Redis is retried every REDIS_LIMITER_RETRY_SECONDS.
+    """
+
+    def __init__(
+        self, redis, rate: float, burst: int = 1,
+        reserves: Sequence[float] = DEFAULT_RESERVES, key: str = "rate_limit:broker"
+    ):
+        """Initialize against a Redis connection."""
+        super().__init__(rate, burst, reserves)
+        self.key = key
+        self._script = redis.register_script(_REDIS_BUCKET_SCRIPT)
+        # While set, Redis failed recently: limit locally until this monotonic time
+        self._retry_at: Optional[float] = None
+
+    def _remote(self, floor: float, penalty: float = 0.0) -> Optional[float]:
+        """Run the bucket script; None if Redis failed and the local bucket should be used."""
+        retry_at = self._retry_at
+        if retry_at is not None and time.monotonic() < retry_at:
+            return None
+        try:
+            wait = float(self._script(keys=[self.key], args=[self.rate, self.burst, floor, penalty]))
+        except Exception as e:
+            if retry_at is None:
+                logger.warning("⚠️ Redis rate limiter unavailable, limiting locally: %s", e)
+            self._retry_at = time.monotonic() + REDIS_LIMITER_RETRY_SECONDS
+            return None
+        if retry_at is not None:
+            logger.info("✅ Redis rate limiter reachable again, sharing the broker quota")
+            self._retry_at = None
+        return wait
+
+    def acquire(self, priority: int = PRIORITY_ORDERS, timeout: Optional[float] = None) -> bool:
+        """Take a token from the shared bucket, waiting at most `timeout` seconds."""
+        if self.rate <= 0:
+            return True
+        start = time.monotonic()
+        while True:
+            wait = self._remote(self.floors[priority])
+            if wait is None:
+                return super().acquire(priority, timeout)
+            if wait <= 0:
+                BROKER_WAIT_SECONDS.labels(priority=PRIORITY_NAMES[priority]).observe(
+                    time.monotonic() - start
+                )
+                return True
+            if timeout is not None and time.monotonic() + wait > start + timeout:
+                BROKER_THROTTLED_TOTAL.labels(priority=PRIORITY_NAMES[priority]).inc()
+                return False
+            time.sleep(wait)
+
+    def penalize(self, seconds: float):
+        """Hold every process sharing the bucket for `seconds`."""
+        if self._remote(0.0, penalty=seconds) is None:
+            super().penalize(seconds)
+
+
+def create_broker_limiter() -> TokenBucket:
+    """Build the broker limiter from the environment.
+
+    BROKER_RATE_LIMIT is requests per minute (Alpaca allows 200; the simulator
+    is unlimited unless set), BROKER_RATE_BURST the bucket size and
+    BROKER_RATE_LIMITER "local" or "redis".
+    """
+    simulated = os.getenv("BROKER_BACKEND", "alpaca").lower() == "simulator"
+    per_minute = float(os.getenv("BROKER_RATE_LIMIT", "0" if simulated else "200"))
+    burst = int(os.getenv("BROKER_RATE_BURST", "20"))
+    rate = per_minute / 60.0
+
+    if os.getenv("BROKER_RATE_LIMITER", "local").lower() == "redis":
+        from core.clients.redis_messaging_client import redis_client  # pylint: disable=import-outside-toplevel
+
+        return RedisTokenBucket(redis_client.redis, rate, burst)
+    return TokenBucket(rate, burst)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_broker_limiter() -> TokenBucket:
+    """Return the shared broker rate limiter."""
+    global _limiter  # pylint: disable=global-statement
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = create_broker_limiter()
+    return _limiter
@@ -2,27 +2,50 @@
 Redis client for pub/sub messaging between services.
 """
 
-import json
 import logging
 import os
+import secrets
 from datetime import datetime
 
 import redis
 
+from core.codec import dumps, loads
+from core.monitoring.metrics import MESSAGES_PUBLISHED_TOTAL
+
 logger = logging.getLogger(__name__)
 
+# Key holding the latest position ledger snapshot
+PORTFOLIO_SNAPSHOT_KEY = "portfolio:snapshot"
+# Set of strategies whose orders the risk gate blocks
+KILLED_STRATEGIES_KEY = "risk:killed_strategies"
+# Prefix of keys holding a resource's current version token (see services/api/http_cache.py)
+VERSION_KEY_PREFIX = "version:"
+
 class RedisClient:
     """Redis client for pub/sub messaging between services."""
     def __init__(self):
-        """Initialize Redis client."""
-        redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
-        self.redis = redis.from_url(redis_url, decode_responses=True)
-        logger.info("📡 Redis client initialized: %s", redis_url)
+        """Initialize Redis client; the connection is created on first use."""
+        self._redis = None
+
+    @property
+    def redis(self):
+        """The underlying redis-py client, created on first access."""
+        if self._redis is None:
+            redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
+            self._redis = redis.from_url(redis_url, decode_responses=True)
+            logger.info("📡 Redis client initialized: %s", redis_url)
+        return self._redis
+
+    @redis.setter
+    def redis(self, client):
+        """Replace the underlying client (e.g. with a local stand-in)."""
+        self._redis = client
 
     def publish_trade(
-        self, symbol: str, action: str, price: float, timestamp: str, strategy: str
+        self, symbol: str, action: str, price: float, timestamp: str, strategy: str,
+        status: str = "filled"
     ) -> bool:
-        """Publish a trade message to Redis."""
+        """Publish a trade message to Redis (`status` is the order's, e.g. "new" at price 0)."""
         try:
             message = {
                 "type": "trade",
@@ -30,10 +53,12 @@ class RedisClient:
                 "action": action,
                 "price": price,
                 "timestamp": timestamp,
-                "strategy": strategy
+                "strategy": strategy,
+                "status": status
             }
 
-            result = self.redis.publish("trading_events", json.dumps(message))
+            result = self.redis.publish("trading_events", dumps(message))
+            MESSAGES_PUBLISHED_TOTAL.labels(type="trade").inc()
             logger.info(
                 "📡 Published trade to Redis: %s (subscribers: %d)", message, result
             )
@@ -52,7 +77,8 @@ class RedisClient:
                 "timestamp": datetime.now().isoformat()
             }
 
-            result = self.redis.publish("trading_events", json.dumps(message))
+            result = self.redis.publish("trading_events", dumps(message))
+            MESSAGES_PUBLISHED_TOTAL.labels(type="status").inc()
             logger.info(
                 "📡 Published status to Redis: %s (subscribers: %d)", message, result
             )
@@ -71,7 +97,8 @@ class RedisClient:
                 "timestamp": datetime.now().isoformat()
             }
 
-            result = self.redis.publish("trading_events", json.dumps(message))
+            result = self.redis.publish("trading_events", dumps(message))
+            MESSAGES_PUBLISHED_TOTAL.labels(type="strategy_change").inc()
             logger.info(
                 "📡 Published strategy change to Redis: %s (subscribers: %d)", message, result
             )
@@ -81,6 +108,122 @@ class RedisClient:
             logger.error("❌ Failed to publish strategy change to Redis: %s", e)
             return False
 
+    def publish_fill(
+        self, order_id: str, symbol: str, side: str, qty: float,
+        price: float, status: str, timestamp: str
+    ) -> bool:
+        """Publish an order's final fill (or cancel/reject) to Redis."""
+        try:
+            message = {
+                "type": "fill",
+                "order_id": order_id,
+                "symbol": symbol,
+                "side": side,
+                "qty": qty,
+                "price": price,
+                "status": status,
+                "timestamp": timestamp
+            }
+
+            result = self.redis.publish("trading_events", dumps(message))
+            MESSAGES_PUBLISHED_TOTAL.labels(type="fill").inc()
+            logger.info("📡 Published fill to Redis: %s (subscribers: %d)", message, result)
+            return True
+
+        except Exception as e:
+            logger.error("❌ Failed to publish fill to Redis: %s", e)
+            return False
+
+    def publish_performance(
+        self, strategy: str, equity: float, realized_pnl: float,
+        unrealized_pnl: float, timestamp: str
+    ) -> bool:
+        """Publish a strategy's virtual book performance to Redis."""
+        try:
+            message = {
+                "type": "performance",
+                "strategy": strategy,
+                "equity": equity,
+                "realized_pnl": realized_pnl,
+                "unrealized_pnl": unrealized_pnl,
+                "timestamp": timestamp
+            }
+
+            self.redis.publish("trading_events", dumps(message))
+            MESSAGES_PUBLISHED_TOTAL.labels(type="performance").inc()
+            return True
+
+        except Exception as e:
+            logger.error("❌ Failed to publish performance to Redis: %s", e)
+            return False
+
+    def publish_portfolio(self, snapshot: dict) -> bool:
+        """Store the latest position ledger snapshot and publish it to Redis."""
+        try:
+            payload = dumps({"type": "portfolio", **snapshot})
+            self.redis.set(PORTFOLIO_SNAPSHOT_KEY, payload)
+            self.redis.publish("trading_events", payload)
+            MESSAGES_PUBLISHED_TOTAL.labels(type="portfolio").inc()
+            return True
+
+        except Exception as e:
+            logger.error("❌ Failed to publish portfolio to Redis: %s", e)
+            return False
+
+    def get_portfolio(self, raw: bool = False):
+        """The latest position ledger snapshot (its JSON text if `raw`), or None if none was published."""
+        try:
+            payload = self.redis.get(PORTFOLIO_SNAPSHOT_KEY)
+        except Exception as e:
+            logger.error("❌ Failed to read portfolio from Redis: %s", e)
+            return None
+        if not payload or raw:
+            return payload or None
+        return loads(payload)
+
+    def set_strategy_killed(self, strategy: str, killed: bool) -> bool:
+        """Turn a strategy's risk kill switch on or off."""
+        try:
+            if killed:
+                self.redis.sadd(KILLED_STRATEGIES_KEY, strategy)
+            else:
+                self.redis.srem(KILLED_STRATEGIES_KEY, strategy)
+            return True
+        except Exception as e:
+            logger.error("❌ Failed to update kill switch for %s: %s", strategy, e)
+            return False
+
+    def killed_strategies(self):
+        """Strategies with their kill switch on, or None if Redis cannot be read."""
+        try:
+            return set(self.redis.smembers(KILLED_STRATEGIES_KEY))
+        except Exception as e:
+            logger.error("❌ Failed to read kill switches from Redis: %s", e)
+            return None
+
+    def touch_version(self, resource: str) -> bool:
+        """Give a resource a new version token after its content changed."""
+        try:
+            self.redis.set(VERSION_KEY_PREFIX + resource, secrets.token_hex(8))
+            return True
+        except Exception as e:
+            logger.error("❌ Failed to update %s version in Redis: %s", resource, e)
+            return False
+
+    def get_version(self, resource: str):
+        """A resource's current version token (created if missing), or None if Redis cannot be read."""
+        key = VERSION_KEY_PREFIX + resource
+        try:
+            version = self.redis.get(key)
+            if version is None:
+                # Never touched (or Redis was reset): start from a token no client can hold
+                self.redis.set(key, secrets.token_hex(8), nx=True)
+                version = self.redis.get(key)
+            return version
+        except Exception as e:
+            logger.error("❌ Failed to read %s version from Redis: %s", resource, e)
+            return None
+
     def subscribe_to_events(self):
         """Subscribe to trading events channel."""
         pubsub = self.redis.pubsub()
@@ -0,0 +1,336 @@
+"""
+In-process market simulator used as a stand-in for the Alpaca REST client.
+
+Replays historical bars on a simulated clock, fills market orders against the
+current bar with configurable slippage, and keeps account, position and
+activity state in memory. It exposes the subset of the `alpaca_trade_api.REST`
+interface used by `alpaca_trading_client`, so it can be swapped in with
+BROKER_BACKEND=simulator.
+"""
+import bisect
+import heapq
+import itertools
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.market_data.historical_bars import load_bars_csv
+
+logger = logging.getLogger(__name__)
+
+
+class SimEntity:
+    """Minimal stand-in for alpaca_trade_api entities (attribute access + `_raw`)."""
+
+    def __init__(self, raw: Dict):
+        """Wrap a raw dict."""
+        self._raw = raw
+
+    def __getattr__(self, name):
+        """Expose raw keys as attributes."""
+        try:
+            return self.__dict__["_raw"][name]
+        except KeyError as e:
+            raise AttributeError(name) from e
+
+
+class SimBarSet:
+    """Stand-in for a BarSet; builds the DataFrame only when `.df` is accessed."""
+
+    def __init__(self, rows: List[Dict]):
+        """Wrap bar rows."""
+        self.rows = rows
+
+    @property
+    def df(self):
+        """Bars as a timestamp-indexed DataFrame, like the Alpaca SDK returns."""
+        from pandas import DataFrame, to_datetime  # pylint: disable=import-outside-toplevel
+
+        df = DataFrame(self.rows, columns=["timestamp", "open", "high", "low", "close", "volume"])
+        if not df.empty:
+            df["timestamp"] = to_datetime(df["timestamp"], utc=True)
+        return df.set_index("timestamp")
+
+
+def _parse_ts(value: str) -> float:
+    """Parse an ISO-8601 timestamp into epoch seconds."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+class SimulationClock:
+    """Market clock that runs `speed` times faster than wall time from a start point."""
+
+    def __init__(self, start: float, speed: float = 1.0):
+        """Start the clock at `start` (epoch seconds)."""
+        self.start = start
+        self.speed = speed
+        self._wall_start = time.monotonic()
+
+    def now(self) -> float:
+        """Current simulated time in epoch seconds."""
+        return self.start + (time.monotonic() - self._wall_start) * self.speed
+
+
+class SimulatedBroker:
+    """Replay-driven broker simulator with fills, slippage and account state."""
+
+    def __init__(
+        self,
+        bars: List[Dict],
+        speed: float = 60.0,
+        starting_cash: float = 100000.0,
+        slippage_bps: float = 5.0,
+        fill_delay: float = 0.0,
+    ):
+        """Initialize the simulator with historical bars sorted by timestamp.
+
+        With `fill_delay` > 0, market orders are accepted and filled that many
+        wall-clock seconds later, like a live broker, instead of on submission.
+        """
+        self._lock = threading.Lock()
+        self._bars: Dict[str, List[Dict]] = {}
+        self._times: Dict[str, List[float]] = {}
+        for row in bars:
+            symbol = row["symbol"]
+            row = {
+                "timestamp": row["timestamp"],
+                "open": float(row["open"]),
+                "high": float(row["high"]),
+                "low": float(row["low"]),
+                "close": float(row["close"]),
+                "volume": float(row.get("volume") or 0),
+            }
+            self._bars.setdefault(symbol, []).append(row)
+        for symbol, rows in self._bars.items():
+            rows.sort(key=lambda r: r["timestamp"])
+            self._times[symbol] = [_parse_ts(r["timestamp"]) for r in rows]
+
+        first = min((times[0] for times in self._times.values() if times), default=time.time())
+        self.clock = SimulationClock(first, speed)
+        self.slippage_bps = slippage_bps
+        self.fill_delay = fill_delay
+        # (due monotonic time, order id) of delayed fills, run by one thread
+        self._due: List[Tuple[float, str]] = []
+        self._due_ready = threading.Condition()
+        self._fill_thread: Optional[threading.Thread] = None
+        self._update_handlers: List[Callable[[Dict], None]] = []
+        self.cash = starting_cash
+        self.positions: Dict[str, Dict] = {}
+        self.orders: Dict[str, Dict] = {}
+        self.activities: List[Dict] = []
+        self._order_seq = itertools.count(1)
+        logger.info(
+            "🧪 Simulated broker ready: %d symbols, speed %.0fx, cash $%.2f",
+            len(self._bars), speed, starting_cash
+        )
+
+    @classmethod
+    def from_csv(cls, path: str, **kwargs) -> "SimulatedBroker":
+        """Build a simulator from a CSV of bars (symbol,timestamp,open,high,low,close,volume)."""
+        return cls(load_bars_csv(path), **kwargs)
+
+    def seek(self, timestamp: float, speed: Optional[float] = None):
+        """Move the simulated clock to `timestamp` (epoch seconds)."""
+        self.clock = SimulationClock(timestamp, self.clock.speed if speed is None else speed)
+
+    # ---------- Market data ----------
+
+    def _visible_index(self, symbol: str) -> int:
+        """Number of bars for a symbol that have closed on the simulated clock."""
+        return bisect.bisect_right(self._times.get(symbol, []), self.clock.now())
+
+    def last_price(self, symbol: str) -> Optional[float]:
+        """Close of the latest visible bar, or None if no bar has been replayed yet."""
+        index = self._visible_index(symbol)
+        if index == 0:
+            return None
+        return self._bars[symbol][index - 1]["close"]
+
+    def get_bars(self, symbol, timeframe=None, start=None, end=None, **_):
+        """Return visible bars within [start, end]; the timeframe is that of the data file."""
+        times = self._times.get(symbol, [])
+        hi = self._visible_index(symbol)
+        if end:
+            hi = min(hi, bisect.bisect_right(times, _parse_ts(end)))
+        lo = bisect.bisect_left(times, _parse_ts(start)) if start else 0
+        return SimBarSet(self._bars.get(symbol, [])[lo:hi])
+
+    def get_crypto_bars(self, symbol, timeframe=None, start=None, end=None, **kwargs):
+        """Crypto bars are served from the same replay data."""
+        return self.get_bars(symbol, timeframe, start=start, end=end, **kwargs)
+
+    def list_assets(self, status=None, asset_class=None):  # pylint: disable=unused-argument
+        """Every symbol in the replay data, as tradable assets."""
+        return [
+            SimEntity({"symbol": symbol, "class": "us_equity", "status": "active", "tradable": True})
+            for symbol in sorted(self._bars)
+        ]
+
+    # ---------- Trading ----------
+
+    def subscribe_trade_updates(self, handler: Callable[[Dict], None]):
+        """Call `handler(order)` on every order event, like the trade update stream."""
+        self._update_handlers.append(handler)
+
+    def _emit(self, order: Dict, event: str):
+        """Send an order event to trade update subscribers."""
+        for handler in list(self._update_handlers):
+            try:
+                handler({**order, "event": event})
+            except Exception as e:
+                logger.error("❌ Trade update handler failed: %s", e)
+
+    def submit_order(self, symbol, qty, side, type="market", time_in_force="day", **_):  # pylint: disable=redefined-builtin
+        """Accept a market order and fill it now, or after `fill_delay` seconds."""
+        qty = float(qty)
+        now = datetime.fromtimestamp(self.clock.now(), timezone.utc).isoformat()
+        order = {
+            "id": str(uuid.uuid4()),
+            "client_order_id": f"sim-{next(self._order_seq)}",
+            "symbol": symbol,
+            "qty": str(qty),
+            "side": side,
+            "type": type,
+            "time_in_force": time_in_force,
+            "submitted_at": now,
+            "status": "accepted",
+            "filled_qty": "0",
+            "filled_avg_price": None,
+        }
+        with self._lock:
+            self.orders[order["id"]] = order
+
+        if self.fill_delay > 0:
+            self._schedule_fill(order["id"])
+            return SimEntity(dict(order))
+        return SimEntity(self._fill(order["id"]))
+
+    def _schedule_fill(self, order_id: str):
+        """Queue an order to fill `fill_delay` seconds from now, starting the fill thread if needed."""
+        with self._due_ready:
+            heapq.heappush(self._due, (time.monotonic() + self.fill_delay, order_id))
+            if self._fill_thread is None:
+                self._fill_thread = threading.Thread(
+                    target=self._run_fills, name="sim-fills", daemon=True
+                )
+                self._fill_thread.start()
+            self._due_ready.notify()
+
+    def _run_fills(self):
+        """Fill queued orders as they come due."""
+        while True:
+            with self._due_ready:
+                while not self._due or self._due[0][0] > time.monotonic():
+                    self._due_ready.wait(self._due[0][0] - time.monotonic() if self._due else None)
+                now = time.monotonic()
+                due = []
+                while self._due and self._due[0][0] <= now:
+                    due.append(heapq.heappop(self._due)[1])
+            for order_id in due:
+                try:
+                    self._fill(order_id)
+                except Exception as e:
+                    logger.error("❌ Simulated fill failed for %s: %s", order_id, e)
+
+    def _fill(self, order_id: str) -> Dict:
+        """Fill an accepted order at the current price plus slippage, or reject it."""
+        with self._lock:
+            order = self.orders[order_id]
+            symbol, side, qty = order["symbol"], order["side"], float(order["qty"])
+        price = self.last_price(symbol)
+        now = datetime.fromtimestamp(self.clock.now(), timezone.utc).isoformat()
+
+        if price is None:
+            with self._lock:
+                order.update(status="rejected")
+                snapshot = dict(order)
+            self._emit(snapshot, "rejected")
+            return snapshot
+
+        slip = price * self.slippage_bps / 10000.0
+        fill_price = price + slip if side == "buy" else price - slip
+        signed_qty = qty if side == "buy" else -qty
+
+        with self._lock:
+            self._apply_fill(symbol, signed_qty, fill_price)
+            order.update(
+                status="filled", filled_qty=str(qty),
+                filled_avg_price=str(round(fill_price, 4)), filled_at=now
+            )
+            self.activities.append({
+                "id": order["id"], "activity_type": "FILL", "symbol": symbol,
+                "side": side, "qty": str(qty), "price": str(round(fill_price, 4)),
+                "transaction_time": now, "order_id": order["id"],
+            })
+            snapshot = dict(order)
+        self._emit(snapshot, "fill")
+        return snapshot
+
+    def _apply_fill(self, symbol: str, signed_qty: float, price: float):
+        """Update cash and the position for a fill (caller holds the lock)."""
+        self.cash -= signed_qty * price
+        position = self.positions.get(symbol, {"qty": 0.0, "avg_entry_price": 0.0})
+        old_qty = position["qty"]
+        new_qty = old_qty + signed_qty
+        if new_qty == 0:
+            self.positions.pop(symbol, None)
+            return
+        if old_qty == 0 or (old_qty > 0) != (new_qty > 0):
+            # Opening or flipping: entry price resets to this fill
+            position["avg_entry_price"] = price
+        elif abs(new_qty) > abs(old_qty):
+            position["avg_entry_price"] = (
+                position["avg_entry_price"] * old_qty + price * signed_qty
+            ) / new_qty
+        position["qty"] = new_qty
+        self.positions[symbol] = position
+
+    def get_order(self, order_id):
+        """Look up an order by id; None if there is no such order."""
+        with self._lock:
+            order = self.orders.get(order_id)
+            return SimEntity(dict(order)) if order is not None else None
+
+    # ---------- Account ----------
+
+    def list_positions(self):
+        """Current positions marked to the latest visible price."""
+        with self._lock:
+            snapshot = {s: dict(p) for s, p in self.positions.items()}
+        result = []
+        for symbol, position in snapshot.items():
+            price = self.last_price(symbol) or position["avg_entry_price"]
+            qty = position["qty"]
+            result.append(SimEntity({
+                "symbol": symbol,
+                "qty": str(qty),
+                "side": "long" if qty > 0 else "short",
+                "avg_entry_price": str(position["avg_entry_price"]),
+                "current_price": str(price),
+                "market_value": str(qty * price),
+                "unrealized_pl": str((price - position["avg_entry_price"]) * qty),
+            }))
+        return result
+
+    def get_account(self):
+        """Account summary with equity marked to the latest visible prices."""
+        market_value = sum(float(p.market_value) for p in self.list_positions())
+        equity = self.cash + market_value
+        return SimEntity({
+            "id": "simulated-account",
+            "status": "ACTIVE",
+            "currency": "USD",
+            "cash": str(round(self.cash, 2)),
+            "equity": str(round(equity, 2)),
+            "portfolio_value": str(round(equity, 2)),
+            "buying_power": str(round(max(self.cash, 0.0), 2)),
+            "crypto_status": "ACTIVE",
+        })
+
+    def get_activities(self, *_, **__):
+        """Fill activities, most recent first."""
+        with self._lock:
+            return [SimEntity(dict(a)) for a in reversed(self.activities)]
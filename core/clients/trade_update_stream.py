@@ -0,0 +1,105 @@
+"""
+Streaming client for broker order events (fills, cancels, rejections).
+
+Speaks the Alpaca trading WebSocket protocol (`trade_updates` stream), so
+order state arrives as it changes instead of being polled over REST.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Callable, Dict, Optional
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+TRADE_STREAM_URL = os.getenv("ALPACA_TRADE_STREAM_URL")
+
+UpdateHandler = Callable[[Dict], None]
+ConnectionHandler = Callable[[bool], None]
+
+
+def trade_stream_url() -> str:
+    """Trade-update stream URL for the configured REST endpoint (paper or live)."""
+    if TRADE_STREAM_URL:
+        return TRADE_STREAM_URL
+    base = os.getenv("APCA_API_BASE_URL", "https://paper-api.alpaca.markets")
+    return base.rstrip("/").replace("https://", "wss://").replace("http://", "ws://") + "/stream"
+
+
+def normalize_update(data: Dict) -> Dict:
+    """Flatten a trade update into the order dict, tagged with its event."""
+    order = dict(data.get("order", {}))
+    order["event"] = data.get("event")
+    return order
+
+
+class TradeUpdateStream:
+    """WebSocket client that hands every order update to a handler."""
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        key: Optional[str] = None,
+        secret: Optional[str] = None,
+        reconnect_delay: float = 5.0,
+    ):
+        """Initialize the stream client."""
+        self.url = url or trade_stream_url()
+        self.key = key or os.getenv("ALPACA_API_KEY")
+        self.secret = secret or os.getenv("ALPACA_SECRET_KEY")
+        self.reconnect_delay = reconnect_delay
+        self._stopped = False
+
+    def stop(self):
+        """Stop the stream after the current message."""
+        self._stopped = True
+
+    async def _handshake(self, ws):
+        """Authenticate and listen to trade updates."""
+        await ws.send(json.dumps({"action": "auth", "key": self.key, "secret": self.secret}))
+        await ws.send(json.dumps({"action": "listen", "data": {"streams": ["trade_updates"]}}))
+
+    async def run(self, on_update: UpdateHandler, on_connection: Optional[ConnectionHandler] = None):
+        """Consume order updates until stopped, reconnecting on connection loss.
+
+        `on_connection(True/False)` reports when updates start and stop flowing,
+        so callers can fall back to polling while disconnected.
+        """
+        self._stopped = False
+        while not self._stopped:
+            try:
+                async with websockets.connect(self.url) as ws:
+                    logger.info("🔌 Connected to trade update stream: %s", self.url)
+                    await self._handshake(ws)
+                    async for raw in ws:
+                        # The trading stream sends JSON in binary frames
+                        message = json.loads(raw.decode() if isinstance(raw, bytes) else raw)
+                        stream = message.get("stream")
+                        if stream == "trade_updates":
+                            on_update(normalize_update(message.get("data", {})))
+                        elif stream == "listening" and on_connection is not None:
+                            on_connection(True)
+                        elif stream == "authorization" and message["data"].get("status") != "authorized":
+                            logger.error("❌ Trade update stream authorization failed")
+                        if self._stopped:
+                            break
+                if self._stopped:
+                    break
+                logger.warning(
+                    "⚠️ Trade update stream closed by the server, reconnecting in %.1fs",
+                    self.reconnect_delay
+                )
+            except (OSError, websockets.ConnectionClosed) as e:
+                if self._stopped:
+                    break
+                logger.warning(
+                    "⚠️ Trade update stream disconnected (%s), retrying in %.1fs",
+                    e, self.reconnect_delay
+                )
+            finally:
+                if on_connection is not None:
+                    on_connection(False)
+            await asyncio.sleep(self.reconnect_delay)
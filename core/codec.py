@@ -0,0 +1,91 @@
+"""
+JSON codec shared by every service.
+
+Redis messages, shard queue tasks, WebSocket frames and API responses are all
+encoded here, with orjson when it is installed (JSON_CODEC=auto) and the
+stdlib `json` module otherwise or when JSON_CODEC=json. `dumps` returns UTF-8
+bytes, which Redis, ASGI bodies and WebSocket frames take as is, so an event
+is encoded once by its publisher and forwarded without being re-encoded.
+
+Both backends write compact JSON and encode datetimes, dates and times as ISO
+8601, sets as lists and numpy values as plain numbers or lists.
+"""
+import json
+import logging
+import os
+from typing import Any, Union
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is always available
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# "auto" uses orjson when installed; "json" forces the stdlib encoder
+JSON_CODEC = os.getenv("JSON_CODEC", "auto").lower()
+
+
+def _default(obj):
+    """Encode types neither backend handles natively."""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):
+        # numpy arrays and scalars
+        return obj.tolist()
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None and JSON_CODEC != "json":
+    CODEC = "orjson"
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(obj: Any) -> bytes:
+        """Encode an object as compact UTF-8 JSON."""
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+    def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        """Decode JSON from bytes or text."""
+        return orjson.loads(data)
+
+    JSONDecodeError = orjson.JSONDecodeError
+else:
+    CODEC = "json"
+    _encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=_default)
+
+    def dumps(obj: Any) -> bytes:
+        """Encode an object as compact UTF-8 JSON."""
+        return _encoder.encode(obj).encode()
+
+    def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        """Decode JSON from bytes or text."""
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+    JSONDecodeError = json.JSONDecodeError
+
+logger.debug("JSON codec: %s", CODEC)
+
+
+def as_text(message: Union[bytes, str, Any]) -> str:
+    """A message as JSON text for a WebSocket text frame; pre-encoded messages are not re-encoded."""
+    if isinstance(message, str):
+        return message
+    if isinstance(message, (bytes, bytearray)):
+        return message.decode()
+    return dumps(message).decode()
+
+
+class CodecJSONResponse(JSONResponse):
+    """JSON response rendered by the shared codec."""
+
+    def render(self, content: Any) -> bytes:
+        """Encode the response body."""
+        return dumps(content)
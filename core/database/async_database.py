@@ -0,0 +1,66 @@
+"""Async database engine and sessions for request handlers.
+
+The API reads and writes the database from its event loop through this
+engine instead of holding a threadpool worker per query. It points at the
+same database as `DATABASE_URL` through the dialect's async driver (aiosqlite
+for SQLite, asyncpg for PostgreSQL); ASYNC_DATABASE_URL overrides the derived
+URL. The engine is created on first use, so importing this module needs
+neither driver, and tables are still created by the synchronous `init_db()`.
+"""
+import logging
+import os
+import threading
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from core.database.database_manager import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+# Async driver for each sync dialect name
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def async_url(url: str) -> str:
+    """The URL of the same database through its async driver (unchanged if unknown)."""
+    scheme, separator, rest = url.partition("://")
+    driver = ASYNC_DRIVERS.get(scheme.split("+")[0])
+    return driver + separator + rest if driver and separator else url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_url(DATABASE_URL)
+
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker] = None
+_engine_lock = threading.Lock()
+
+
+def get_async_engine() -> AsyncEngine:
+    """Return the shared async engine, creating it on first use."""
+    global _engine, _sessionmaker  # pylint: disable=global-statement
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_async_engine(ASYNC_DATABASE_URL)
+                # Objects stay readable after commit; async sessions cannot lazy-load them
+                _sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+                _engine = engine
+                logger.info("🗄️ Async database engine: %s", engine.url.render_as_string())
+    return _engine
+
+
+def async_session() -> AsyncSession:
+    """A new async session; use as `async with async_session() as session:`."""
+    get_async_engine()
+    return _sessionmaker()
+
+
+async def dispose_async_engine():
+    """Close the async engine's pooled connections (e.g. on shutdown)."""
+    if _engine is not None:
+        await _engine.dispose()
@@ -1,20 +1,21 @@
-"""Database configuration and session management."""
+"""Database configuration and session management.
+
+Creating the engine does not connect; call `init_db()` from a service's
+startup hook to create the shared directory and tables.
+"""
+import logging
 import os
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 # Load .env file and override existing variables
 load_dotenv(override=True)
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./trading.db")
-print(f"Using database: {DATABASE_URL}")
+logger = logging.getLogger(__name__)
 
-# Create shared directory if using shared database path
-if "shared" in DATABASE_URL:
-    shared_dir = os.path.join(os.getcwd(), "shared")
-    os.makedirs(shared_dir, exist_ok=True)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./trading.db")
 
 # Use appropriate connection args for SQLite
 connect_args = {"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
@@ -23,6 +24,39 @@ engine = create_engine(DATABASE_URL, connect_args=connect_args)
 SessionLocal = sessionmaker(bind=engine)
 Base = declarative_base()
 
+def init_db():
+    """Create the shared directory (if used) and all tables."""
+    # Create shared directory if using shared database path
+    if "shared" in DATABASE_URL:
+        shared_dir = os.path.join(os.getcwd(), "shared")
+        os.makedirs(shared_dir, exist_ok=True)
+
+    from core.database import trading_models  # pylint: disable=import-outside-toplevel,unused-import
+
+    Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    logger.info("🗄️ Using database: %s", DATABASE_URL)
+
+def _add_missing_columns():
+    """Add columns introduced after a table was first created.
+
+    `create_all` only creates missing tables, so nullable columns added to
+    existing models are appended here with ALTER TABLE.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                    ))
+                    logger.info("🗄️ Added column %s.%s", table.name, column.name)
+
 def get_db():
     """Get database session with proper cleanup."""
     db = SessionLocal()
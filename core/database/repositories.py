@@ -0,0 +1,77 @@
+"""Async repository functions for trades, performance and bot/strategy control.
+
+Each takes a session from `async_session()` and leaves the commit to the
+caller, so one request can group its writes in a single transaction.
+"""
+from typing import Iterable, List, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database.trading_models import BotControl, ExecutedTrade, StrategyControl, StrategyPerformance
+
+# ---------- Trades ----------
+
+async def recent_trades(session: AsyncSession, limit: int = 10) -> List[ExecutedTrade]:
+    """The latest stored trades, newest first."""
+    result = await session.execute(
+        select(ExecutedTrade).order_by(ExecutedTrade.created_at.desc()).limit(limit)
+    )
+    return list(result.scalars())
+
+
+def add_trades(session: AsyncSession, trades: Iterable[ExecutedTrade]):
+    """Stage trades for insertion."""
+    session.add_all(list(trades))
+
+# ---------- Performance ----------
+
+def add_performance(session: AsyncSession, strategy: str, portfolio_value: float) -> StrategyPerformance:
+    """Stage a performance record for a strategy."""
+    performance = StrategyPerformance(strategy=strategy, portfolio_value=portfolio_value)
+    session.add(performance)
+    return performance
+
+
+async def performance_history(session: AsyncSession, strategy: str, limit: int = 100) -> List[StrategyPerformance]:
+    """A strategy's latest performance records, newest first."""
+    result = await session.execute(
+        select(StrategyPerformance)
+        .filter_by(strategy=strategy)
+        .order_by(StrategyPerformance.date.desc())
+        .limit(limit)
+    )
+    return list(result.scalars())
+
+# ---------- Bot & Strategy Control ----------
+
+async def bot_running(session: AsyncSession) -> bool:
+    """Whether the bot is running (True until a state is stored)."""
+    control = (await session.execute(select(BotControl).limit(1))).scalar_one_or_none()
+    return True if control is None else bool(control.is_running)
+
+
+async def set_bot_running(session: AsyncSession, running: bool):
+    """Store the bot's running state."""
+    control = (await session.execute(select(BotControl).limit(1))).scalar_one_or_none()
+    if control is None:
+        session.add(BotControl(is_running=running))
+    else:
+        control.is_running = running
+
+
+async def active_strategies(session: AsyncSession) -> Set[str]:
+    """Registry names of the strategies marked active."""
+    result = await session.execute(select(StrategyControl.name).filter_by(is_active=True))
+    return set(result.scalars())
+
+
+async def set_strategy_active(session: AsyncSession, name: str, active: bool):
+    """Mark a strategy active or inactive, creating its control row if needed."""
+    control = (
+        await session.execute(select(StrategyControl).filter_by(name=name))
+    ).scalar_one_or_none()
+    if control is None:
+        session.add(StrategyControl(name=name, is_active=active))
+    else:
+        control.is_active = active
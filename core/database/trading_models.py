@@ -16,6 +16,12 @@ class ExecutedTrade(Base):
     signal = Column(String)
     strategy = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Broker order this trade was submitted in (shared by netted intents)
+    order_id = Column(String, index=True)
+    # Order status: accepted/new until the fill is reconciled, then filled/canceled/...
+    status = Column(String)
+    # Risk gate reason when status is "blocked"; set on submission, not stored
+    block_reason = None
 
 class BotControl(Base):
     """Model for bot control state."""
@@ -0,0 +1,65 @@
+"""
+Per-symbol bar history cache.
+
+The first request for a (symbol, timeframe) downloads the full warm-up history;
+later requests only fetch bars since the last cached one and append them, so
+each tick costs one small incremental request instead of a full download.
+"""
+import logging
+import threading
+from datetime import timedelta
+from typing import Dict, Tuple
+
+from core.clients.alpaca_trading_client import get_bars_frame
+
+logger = logging.getLogger(__name__)
+
+
+class BarCache:
+    """Caches timestamp-indexed bar frames per (symbol, timeframe, market type)."""
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._lock = threading.Lock()
+        self._frames: Dict[Tuple[str, str, str], object] = {}
+        self._days: Dict[Tuple[str, str, str], int] = {}
+
+    def get_frame(self, symbol: str, timeframe, days: int, market_type: str = "stock"):
+        """Return at least `days` calendar days of bars, fetching only what is missing."""
+        from pandas import concat  # pylint: disable=import-outside-toplevel
+
+        key = (symbol, str(timeframe), market_type)
+        with self._lock:
+            cached = self._frames.get(key)
+            cached_days = self._days.get(key, 0)
+
+        if cached is None or cached.empty or days > cached_days:
+            # Warm-up (or a longer lookback than cached): full history once
+            frame = get_bars_frame(symbol, timeframe, days, market_type)
+            if frame is None:
+                return cached
+            logger.info("🗄️ Warmed up %s %s cache with %d bars", symbol, key[1], len(frame))
+        else:
+            # Refetch from the last cached bar: it may have been partial
+            update = get_bars_frame(symbol, timeframe, days, market_type, start=cached.index[-1])
+            if update is None or update.empty:
+                return cached
+            frame = concat([cached[cached.index < update.index[0]], update])
+            frame = frame[~frame.index.duplicated(keep="last")]
+            keep_days = max(days, cached_days)
+            frame = frame[frame.index >= frame.index[-1] - timedelta(days=keep_days)]
+
+        with self._lock:
+            self._frames[key] = frame
+            self._days[key] = max(days, cached_days)
+        return frame
+
+    def clear(self):
+        """Drop all cached history."""
+        with self._lock:
+            self._frames.clear()
+            self._days.clear()
+
+
+# Global bar cache instance
+bar_cache = BarCache()
@@ -0,0 +1,125 @@
+"""
+Columnar bar container.
+
+`Bars` holds a run of bars as one NumPy array per column plus a datetime64
+timestamp array, instead of one dict per bar. Slicing returns a view over the
+same arrays, `bars["close"]` is a column without copying, and `bars.df` is a
+DataFrame over the same data. It is also a read-only sequence of bar dicts
+(`bars[-1]["close"]`, iteration, `len`), so code written for `List[Dict]`
+keeps working while hot paths use the columns directly.
+"""
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+# Columns stored as float64 so indicators can use them as-is
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+def _to_datetime(value: np.datetime64) -> datetime:
+    """A datetime64[ns] as an aware UTC datetime."""
+    return datetime.fromtimestamp(value.astype("datetime64[ns]").astype(np.int64) / 1e9, timezone.utc)
+
+
+class Bars(Sequence):
+    """Bars of one symbol and timeframe, oldest first, stored by column."""
+
+    __slots__ = ("timestamps", "columns")
+
+    def __init__(self, timestamps: np.ndarray, columns: Dict[str, np.ndarray]):
+        """Wrap a datetime64[ns] (UTC) timestamp array and equal-length column arrays."""
+        self.timestamps = timestamps
+        self.columns = columns
+
+    @classmethod
+    def empty(cls) -> "Bars":
+        """No bars."""
+        return cls(
+            np.empty(0, dtype="datetime64[ns]"),
+            {name: np.empty(0) for name in PRICE_COLUMNS},
+        )
+
+    @classmethod
+    def from_frame(cls, frame) -> "Bars":
+        """Bars from a timestamp-indexed DataFrame, sharing its memory where the dtypes allow."""
+        index = frame.index
+        if getattr(index, "tz", None) is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        columns = {}
+        for name in frame.columns:
+            dtype = np.float64 if name in PRICE_COLUMNS else None
+            columns[name] = frame[name].to_numpy(dtype=dtype, copy=False)
+        return cls(index.to_numpy(dtype="datetime64[ns]"), columns)
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> "Bars":
+        """Bars from bar dicts with a `timestamp` (datetime or ISO-8601 string) and OHLCV."""
+        if not records:
+            return cls.empty()
+        stamps = []
+        for record in records:
+            value = record["timestamp"]
+            if isinstance(value, str):
+                value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            if value.tzinfo is not None:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            stamps.append(value)
+        columns = {
+            name: np.fromiter((float(r.get(name, 0) or 0) for r in records), np.float64, len(records))
+            for name in PRICE_COLUMNS
+        }
+        return cls(np.array(stamps, dtype="datetime64[ns]"), columns)
+
+    def __len__(self) -> int:
+        """Number of bars."""
+        return len(self.timestamps)
+
+    def __getitem__(self, key):
+        """A column by name, a bar dict by position, or a zero-copy Bars view by slice."""
+        if isinstance(key, str):
+            return self.columns[key]
+        if isinstance(key, slice):
+            return Bars(self.timestamps[key], {name: col[key] for name, col in self.columns.items()})
+        return self.bar(key)
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Bar dicts, oldest first."""
+        for i in range(len(self)):
+            yield self.bar(i)
+
+    def __repr__(self) -> str:
+        """Size and time span."""
+        if not len(self):
+            return "Bars(0)"
+        return f"Bars({len(self)}, {self.timestamps[0]} .. {self.timestamps[-1]})"
+
+    def bar(self, position: int) -> Dict:
+        """One bar as a dict, with an aware UTC datetime under `timestamp`."""
+        record = {"timestamp": _to_datetime(self.timestamps[position])}
+        for name, col in self.columns.items():
+            value = col[position]
+            record[name] = value.item() if isinstance(value, np.generic) else value
+        return record
+
+    def tail(self, count: int) -> "Bars":
+        """The last `count` bars (a view)."""
+        return self[max(0, len(self) - count):]
+
+    @property
+    def last_close(self) -> Optional[float]:
+        """Close of the latest bar, if any."""
+        return float(self.columns["close"][-1]) if len(self) else None
+
+    @property
+    def df(self):
+        """A timestamp-indexed DataFrame over the same arrays."""
+        from pandas import DataFrame, DatetimeIndex  # pylint: disable=import-outside-toplevel
+
+        index = DatetimeIndex(self.timestamps, name="timestamp").tz_localize("UTC")
+        return DataFrame(self.columns, index=index, copy=False)
+
+    def to_records(self) -> List[Dict]:
+        """Bars as a list of dicts."""
+        return list(self)
@@ -0,0 +1,11 @@
+"""Loading recorded historical bars for replay and simulation."""
+import csv
+from typing import Dict, List
+
+
+def load_bars_csv(path: str) -> List[Dict]:
+    """Load bars (symbol,timestamp,open,high,low,close,volume) sorted by timestamp."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    rows.sort(key=lambda row: row["timestamp"])
+    return rows
@@ -0,0 +1,156 @@
+"""
+Technical indicators on NumPy arrays.
+
+Every function takes contiguous float64 arrays, either one series (1-D) or a
+batch of equal-length series, one per row (2-D), and works along the last
+axis. Outputs have the input's shape, with NaN where the window is not yet
+full, and match the pandas rolling/ewm and `ta` definitions the strategies
+used before (see `python -m benchmarks.indicators` for the parity check).
+"""
+import math
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from core.market_data.bars import Bars
+
+# Largest factor an EMA block may grow its weights by before rebasing
+_EWM_MAX_GROWTH = 1e100
+
+
+def as_array(values) -> np.ndarray:
+    """`values` as a C-contiguous float64 array (no copy when it already is one)."""
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _rolling(values: np.ndarray, window: int, reduce) -> np.ndarray:
+    """Apply `reduce(windows, axis=-1)` over trailing windows, NaN until the first is full."""
+    out = np.full(values.shape, np.nan)
+    if 0 < window <= values.shape[-1]:
+        out[..., window - 1:] = reduce(sliding_window_view(values, window, axis=-1), axis=-1)
+    return out
+
+
+def _ewm(values: np.ndarray, alpha: float, initial: np.ndarray) -> np.ndarray:
+    """y[t] = alpha * x[t] + (1 - alpha) * y[t-1] along the last axis, from y[-1] = `initial`.
+
+    Solved in closed form with cumulative sums over blocks short enough that
+    the (1 - alpha)^-t weights stay in range, so it is vectorized over time
+    as well as over rows.
+    """
+    decay = 1.0 - alpha
+    n = values.shape[-1]
+    out = np.empty(values.shape)
+    if decay <= 0.0:
+        out[...] = values
+        return out
+    block = max(1, min(n, int(math.log(_EWM_MAX_GROWTH) / -math.log(decay)))) if decay < 1.0 else n
+    carry = np.asarray(initial, dtype=np.float64)
+    for start in range(0, n, block):
+        chunk = values[..., start:start + block]
+        growth = decay ** -np.arange(1, chunk.shape[-1] + 1)
+        out[..., start:start + block] = (
+            carry[..., None] + alpha * np.cumsum(chunk * growth, axis=-1)
+        ) / growth
+        carry = out[..., start + chunk.shape[-1] - 1]
+    return out
+
+
+def sma(values, window: int) -> np.ndarray:
+    """Simple moving average (pandas `rolling(window).mean()`)."""
+    return _rolling(as_array(values), window, np.mean)
+
+
+def ema(values, span: int, min_periods: int = 0) -> np.ndarray:
+    """Exponential moving average (pandas `ewm(span=span, adjust=False).mean()`)."""
+    values = as_array(values)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1]:
+        out[..., 0] = values[..., 0]
+        out[..., 1:] = _ewm(values[..., 1:], 2.0 / (span + 1), values[..., 0])
+        out[..., :max(0, min_periods - 1)] = np.nan
+    return out
+
+
+def rsi(close, window: int = 14) -> np.ndarray:
+    """Wilder's relative strength index, 0-100 (`ta.momentum.RSIIndicator`)."""
+    close = as_array(close)
+    out = np.full(close.shape, np.nan)
+    if close.shape[-1] < window or window < 1:
+        return out
+    diff = np.zeros(close.shape)
+    diff[..., 1:] = np.diff(close, axis=-1)
+    alpha = 1.0 / window
+    up = np.maximum(diff, 0.0)
+    down = np.maximum(-diff, 0.0)
+    # The first bar has no change (0 up, 0 down), which also seeds both averages at 0
+    zero = np.zeros(close.shape[:-1])
+    avg_up = _ewm(up, alpha, zero)
+    avg_down = _ewm(down, alpha, zero)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = np.where(avg_down == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_up / avg_down))
+    out[..., window - 1:] = values[..., window - 1:]
+    return out
+
+
+def macd(
+    close, fast: int = 12, slow: int = 26, signal: int = 9
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal line and histogram (`ta.trend.MACD`)."""
+    close = as_array(close)
+    line = ema(close, fast, min_periods=fast) - ema(close, slow, min_periods=slow)
+    signal_line = np.full(close.shape, np.nan)
+    if close.shape[-1] >= slow:
+        # The signal EMA starts at the first complete MACD value
+        signal_line[..., slow - 1:] = ema(line[..., slow - 1:], signal, min_periods=signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close, window: int = 20, deviations: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Middle, upper and lower Bollinger bands (`ta.volatility.BollingerBands`, population std)."""
+    close = as_array(close)
+    middle = sma(close, window)
+    std = _rolling(close, window, np.std)
+    return middle, middle + deviations * std, middle - deviations * std
+
+
+def true_range(high, low, close) -> np.ndarray:
+    """Per-bar true range; the first bar has no previous close and uses high - low."""
+    high, low, close = as_array(high), as_array(low), as_array(close)
+    out = high - low
+    previous = close[..., :-1]
+    out[..., 1:] = np.maximum(
+        out[..., 1:],
+        np.maximum(np.abs(high[..., 1:] - previous), np.abs(low[..., 1:] - previous)),
+    )
+    return out
+
+
+def atr(high, low, close, window: int = 14) -> np.ndarray:
+    """Wilder's average true range, seeded with the mean of the first window (`ta`)."""
+    ranges = true_range(high, low, close)
+    out = np.full(ranges.shape, np.nan)
+    if window < 1 or ranges.shape[-1] < window:
+        return out
+    seed = ranges[..., :window].mean(axis=-1)
+    out[..., window - 1] = seed
+    out[..., window:] = _ewm(ranges[..., window:], 1.0 / window, seed)
+    return out
+
+
+def rolling_max(values, window: int) -> np.ndarray:
+    """Highest value over the trailing window (pandas `rolling(window).max()`)."""
+    return _rolling(as_array(values), window, np.max)
+
+
+def rolling_min(values, window: int) -> np.ndarray:
+    """Lowest value over the trailing window (pandas `rolling(window).min()`)."""
+    return _rolling(as_array(values), window, np.min)
+
+
+def column(bars, key: str) -> np.ndarray:
+    """One field of `Bars` (without copying) or of a list of bar dicts as a float64 array."""
+    if isinstance(bars, Bars):
+        return as_array(bars[key])
+    return np.fromiter((bar[key] for bar in bars), dtype=np.float64, count=len(bars))
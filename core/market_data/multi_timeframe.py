@@ -0,0 +1,90 @@
+"""Fetch exactly the bars each timeframe needs, deriving intraday timeframes from 1-minute data."""
+import logging
+from typing import TYPE_CHECKING, Callable, Dict, List
+
+from core.market_data.bar_cache import bar_cache
+from core.market_data.timeframes import (
+    BASE_TIMEFRAME, alpaca_timeframe, calendar_days_for, derivable_from_minutes, resample_frame
+)
+
+if TYPE_CHECKING:
+    from core.market_data.bars import Bars
+
+logger = logging.getLogger(__name__)
+
+# Called with (symbol, timeframe, Bars) for every history fetched from the bar cache
+_listeners: List[Callable[[str, str, "Bars"], None]] = []
+
+
+def add_bar_listener(listener: Callable[[str, str, "Bars"], None]):
+    """Call `listener(symbol, timeframe, bars)` with each bar history fetched (e.g. to share it)."""
+    _listeners.append(listener)
+
+
+def _notify(symbol: str, timeframe: str, df):
+    """Hand the tail of a fetched history to the listeners; their errors never fail the fetch.
+
+    Listeners get at most the SHARED_BARS_CAPACITY bars the shared store keeps,
+    not the whole cached history.
+    """
+    if not _listeners or df is None or df.empty:
+        return
+    # pylint: disable=import-outside-toplevel
+    from core.market_data.bars import Bars
+    from core.market_data.shared_bars import SHARED_BARS_CAPACITY
+
+    bars = Bars.from_frame(df.tail(SHARED_BARS_CAPACITY))
+    for listener in _listeners:
+        try:
+            listener(symbol, timeframe, bars)
+        except Exception as e:
+            logger.error("❌ Bar listener failed for %s %s: %s", symbol, timeframe, e)
+
+
+def _bars(df, count: int) -> "Bars":
+    """The last `count` rows of a DataFrame as Bars, sharing its memory (empty if missing)."""
+    from core.market_data.bars import Bars  # pylint: disable=import-outside-toplevel
+
+    if df is None or df.empty:
+        return Bars.empty()
+    return Bars.from_frame(df).tail(count)
+
+
+def fetch_timeframes(
+    symbol: str, requirements: Dict[str, int], market_type: str = "stock"
+) -> Dict[str, "Bars"]:
+    """Fetch the last N bars for each requested timeframe ({timeframe: N}).
+
+    Timeframes whose history fits in a short minute-bar window share a single
+    1-minute history and are resampled locally; longer histories (such as 200
+    daily bars) use their native timeframe. Both go through the bar cache, so
+    only the first call per symbol downloads the full lookback.
+    """
+    result: Dict[str, "Bars"] = {}
+    derived = {tf: n for tf, n in requirements.items() if derivable_from_minutes(tf, n)}
+
+    if derived:
+        days = max(calendar_days_for(tf, n) for tf, n in derived.items())
+        minutes = bar_cache.get_frame(symbol, alpaca_timeframe(BASE_TIMEFRAME), days, market_type)
+        _notify(symbol, BASE_TIMEFRAME, minutes)
+        for timeframe, count in derived.items():
+            if minutes is None or minutes.empty:
+                result[timeframe] = _bars(None, count)
+            else:
+                result[timeframe] = _bars(resample_frame(minutes, timeframe), count)
+
+    for timeframe, count in requirements.items():
+        if timeframe in derived:
+            continue
+        frame = bar_cache.get_frame(
+            symbol, alpaca_timeframe(timeframe), calendar_days_for(timeframe, count), market_type
+        )
+        _notify(symbol, timeframe, frame)
+        result[timeframe] = _bars(frame, count)
+
+    return result
+
+
+def fetch_bars(symbol: str, timeframe: str, lookback: int, market_type: str = "stock") -> "Bars":
+    """Fetch the last `lookback` bars of a single timeframe."""
+    return fetch_timeframes(symbol, {timeframe: lookback}, market_type)[timeframe]
@@ -0,0 +1,354 @@
+"""
+Recent bars in shared memory, written by the trading process and read by the others.
+
+Each (symbol, timeframe) the trading service fetches gets a fixed-size ring
+of bars in its own POSIX shared-memory segment, listed in a directory
+segment. The API and WebSocket services map the same segments, so latest
+prices and recent bars cost them a memory read instead of a broker call.
+
+There is exactly one writer per host: the first process to take the writer
+lock. Writes bump a sequence counter to an odd value while in progress and
+readers retry until they copy a consistent snapshot (a seqlock), so readers
+never block the writer. Segments outlive their writer, so a restarted writer
+picks up where the last one stopped and readers keep their mappings. The
+services must share an IPC namespace (see infrastructure/docker-compose.yml).
+"""
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from core.market_data.bars import PRICE_COLUMNS, Bars
+from core.market_data.timeframes import timeframe_minutes
+
+logger = logging.getLogger(__name__)
+
+SHARED_BARS_ENABLED = os.getenv("SHARED_BARS", "true").lower() in ("1", "true", "yes")
+SHARED_BARS_PREFIX = os.getenv("SHARED_BARS_PREFIX", "ascent_bars")
+# Bars kept per (symbol, timeframe)
+SHARED_BARS_CAPACITY = int(os.getenv("SHARED_BARS_CAPACITY", "512"))
+# Most (symbol, timeframe) rings the directory can list
+SHARED_BARS_MAX_RINGS = int(os.getenv("SHARED_BARS_MAX_RINGS", "1024"))
+
+BAR_DTYPE = np.dtype([("timestamp", "<i8")] + [(name, "<f8") for name in PRICE_COLUMNS])
+
+# int64 header fields of a ring
+_SEQ, _CAPACITY, _HEAD, _LAST_TS, _MINUTES = range(5)
+# int64 header fields of the directory
+_COUNT, _EPOCH = 1, 2
+_HEADER_SLOTS = 8
+_HEADER_BYTES = _HEADER_SLOTS * 8
+_KEY_DTYPE = np.dtype("S32")
+
+# Reader attempts before giving up on a ring that is being rewritten
+_READ_RETRIES = 100
+
+
+def _segment_name(key: str) -> str:
+    """Shared-memory name for a ring key ("AAPL:1Min"): POSIX names allow no slashes."""
+    return f"{SHARED_BARS_PREFIX}_{re.sub(r'[^A-Za-z0-9]', '_', key)}"
+
+
+def _attach(name: str) -> Optional[shared_memory.SharedMemory]:
+    """Map an existing segment without handing it to the resource tracker, or None."""
+    try:
+        segment = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return None
+    # Attaching registers the segment, and the tracker would unlink it when this process exits
+    resource_tracker.unregister(segment._name, "shared_memory")  # pylint: disable=protected-access
+    return segment
+
+
+def _create(name: str, size: int) -> shared_memory.SharedMemory:
+    """Create (or replace a differently sized) segment that outlives this process."""
+    try:
+        segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+    except FileExistsError:
+        segment = _attach(name)
+        if segment is not None and segment.size >= size:
+            return segment
+        if segment is not None:
+            segment.close()
+            segment.unlink()
+        segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+    resource_tracker.unregister(segment._name, "shared_memory")  # pylint: disable=protected-access
+    return segment
+
+
+class BarRing:
+    """A ring of the most recent bars of one symbol and timeframe in a shared-memory segment."""
+
+    def __init__(self, segment: shared_memory.SharedMemory, writable: bool = False):
+        """Wrap a mapped segment; readers get read-only array views."""
+        self.segment = segment
+        self.header = np.ndarray((_HEADER_SLOTS,), np.int64, buffer=segment.buf)
+        capacity = int(self.header[_CAPACITY])
+        self.data = np.ndarray((capacity,), BAR_DTYPE, buffer=segment.buf, offset=_HEADER_BYTES)
+        if not writable:
+            self.header.flags.writeable = False
+            self.data.flags.writeable = False
+
+    @staticmethod
+    def size_for(capacity: int) -> int:
+        """Segment bytes for a ring of `capacity` bars."""
+        return _HEADER_BYTES + capacity * BAR_DTYPE.itemsize
+
+    @classmethod
+    def create(cls, name: str, capacity: int, minutes: int) -> "BarRing":
+        """Create an empty ring, or reuse an existing one of the same capacity and timeframe.
+
+        A ring left mid-write (odd `_SEQ`) by a writer that died is emptied
+        too, since its bars may be torn. Only the single writer calls this.
+        """
+        segment = _create(name, cls.size_for(capacity))
+        header = np.ndarray((_HEADER_SLOTS,), np.int64, buffer=segment.buf)
+        seq = int(header[_SEQ])
+        if header[_CAPACITY] != capacity or header[_MINUTES] != minutes or seq & 1:
+            # Odd while resetting so readers retry, then even and newer than any they saw
+            header[_SEQ] = seq | 1
+            header[_SEQ + 1:] = 0
+            header[_CAPACITY] = capacity
+            header[_MINUTES] = minutes
+            header[_SEQ] = (seq | 1) + 1
+        return cls(segment, writable=True)
+
+    def write(self, bars: Bars):
+        """Append bars newer than the ring's latest; a bar with the latest timestamp replaces it."""
+        if not len(bars):
+            return
+        stamps = bars.timestamps.astype("datetime64[ns]").astype(np.int64)
+        header, capacity = self.header, len(self.data)
+        head = int(header[_HEAD])
+        if head:
+            start = int(np.searchsorted(stamps, header[_LAST_TS], side="left"))
+            if start == len(stamps):
+                return
+            if stamps[start] == header[_LAST_TS]:
+                head -= 1
+        else:
+            start = 0
+        stamps = stamps[start:][-capacity:]
+        count = len(stamps)
+        first = len(bars) - count
+        positions = (head + np.arange(count)) % capacity
+
+        header[_SEQ] += 1
+        self.data["timestamp"][positions] = stamps
+        for name in PRICE_COLUMNS:
+            values = bars.columns.get(name)
+            self.data[name][positions] = values[first:] if values is not None else np.nan
+        header[_HEAD] = head + count
+        header[_LAST_TS] = stamps[-1]
+        header[_SEQ] += 1
+
+    def read(self, limit: Optional[int] = None) -> Optional[Bars]:
+        """Copy of the last `limit` bars (all when None), or None if the ring kept changing."""
+        header, capacity = self.header, len(self.data)
+        for _ in range(_READ_RETRIES):
+            seq = header[_SEQ]
+            if seq & 1:
+                time.sleep(0)
+                continue
+            head = int(header[_HEAD])
+            count = min(head, capacity) if limit is None else min(limit, head, capacity)
+            rows = self.data[(head - count + np.arange(count)) % capacity]
+            if header[_SEQ] == seq:
+                return Bars(
+                    rows["timestamp"].astype("datetime64[ns]"),
+                    {name: np.ascontiguousarray(rows[name]) for name in PRICE_COLUMNS},
+                )
+        return None
+
+    @property
+    def minutes(self) -> int:
+        """Bar timeframe in minutes."""
+        return int(self.header[_MINUTES])
+
+    def close(self):
+        """Unmap the segment (it stays available to other processes)."""
+        self.header = self.data = None
+        self.segment.close()
+
+
+class SharedBarStore:
+    """The directory of rings plus the rings themselves, as the writer or as a reader."""
+
+    def __init__(self, writable: bool = False):
+        """Map the directory (creating it when writable); readers tolerate it not existing yet."""
+        self.writable = writable
+        self._lock = threading.Lock()
+        self._rings: Dict[str, BarRing] = {}
+        self._epoch = None
+        self.directory = None
+        self.keys = None
+        if writable:
+            segment = _create(
+                f"{SHARED_BARS_PREFIX}_directory",
+                _HEADER_BYTES + SHARED_BARS_MAX_RINGS * _KEY_DTYPE.itemsize,
+            )
+            self._map_directory(segment)
+            # Rings may be recreated with a new size; tell readers to remap
+            self.directory[_EPOCH] += 1
+            self._load_keys()
+
+    def _map_directory(self, segment: shared_memory.SharedMemory):
+        """View the directory header and key table."""
+        self.directory = np.ndarray((_HEADER_SLOTS,), np.int64, buffer=segment.buf)
+        slots = (segment.size - _HEADER_BYTES) // _KEY_DTYPE.itemsize
+        self.keys = np.ndarray((slots,), _KEY_DTYPE, buffer=segment.buf, offset=_HEADER_BYTES)
+        self._segment = segment
+
+    def _load_keys(self) -> List[str]:
+        """Ring keys currently listed."""
+        return [key.decode() for key in self.keys[:int(self.directory[_COUNT])]]
+
+    def _ensure_directory(self) -> bool:
+        """Readers: map the directory once a writer has created it; drop stale rings on a new epoch."""
+        if self.directory is None:
+            segment = _attach(f"{SHARED_BARS_PREFIX}_directory")
+            if segment is None:
+                return False
+            self._map_directory(segment)
+        epoch = int(self.directory[_EPOCH])
+        if epoch != self._epoch:
+            for ring in self._rings.values():
+                ring.close()
+            self._rings.clear()
+            self._epoch = epoch
+        return True
+
+    def _ring(self, key: str) -> Optional[BarRing]:
+        """A mapped ring by key, or None if it does not exist."""
+        ring = self._rings.get(key)
+        if ring is None:
+            segment = _attach(_segment_name(key))
+            if segment is None:
+                return None
+            ring = self._rings[key] = BarRing(segment)
+        return ring
+
+    def publish(self, symbol: str, timeframe: str, bars: Bars):
+        """Writer: append a symbol's bars of `timeframe` to its ring, creating it on first use."""
+        key = f"{symbol}:{timeframe}"
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is None:
+                count = int(self.directory[_COUNT])
+                listed = key in self._load_keys()
+                if not listed and count >= len(self.keys):
+                    logger.warning("⚠️ Shared bar directory full, not publishing %s", key)
+                    return
+                ring = BarRing.create(
+                    _segment_name(key), SHARED_BARS_CAPACITY, timeframe_minutes(timeframe)
+                )
+                self._rings[key] = ring
+                if not listed:
+                    self.keys[count] = key.encode()
+                    self.directory[_COUNT] = count + 1
+            ring.write(bars)
+
+    def symbols(self) -> List[str]:
+        """Symbols with at least one ring."""
+        with self._lock:
+            if not self._ensure_directory():
+                return []
+            return sorted({key.split(":", 1)[0] for key in self._load_keys()})
+
+    def bars(self, symbol: str, timeframe: str, limit: Optional[int] = None) -> Optional[Bars]:
+        """Recent bars of a symbol and timeframe, or None if none are published."""
+        with self._lock:
+            if not self._ensure_directory():
+                return None
+            ring = self._ring(f"{symbol}:{timeframe}")
+            return ring.read(limit) if ring is not None else None
+
+    def latest_prices(self) -> Dict[str, Dict]:
+        """Latest close per symbol across its timeframes: {symbol: {price, timestamp, timeframe}}."""
+        with self._lock:
+            if not self._ensure_directory():
+                return {}
+            latest: Dict[str, Dict] = {}
+            for key in self._load_keys():
+                symbol, timeframe = key.split(":", 1)
+                ring = self._ring(key)
+                bars = ring.read(1) if ring is not None else None
+                if not bars:
+                    continue
+                bar = bars.bar(-1)
+                current = latest.get(symbol)
+                if current is None or bar["timestamp"] > current["timestamp"]:
+                    latest[symbol] = {
+                        "price": bar["close"], "timestamp": bar["timestamp"], "timeframe": timeframe
+                    }
+            return latest
+
+
+def _take_writer_lock():
+    """Hold an exclusive lock for this process's lifetime; False if another process has it."""
+    import fcntl  # pylint: disable=import-outside-toplevel
+
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    handle = open(os.path.join(directory, f"{SHARED_BARS_PREFIX}.lock"), "a+", encoding="utf-8")  # pylint: disable=consider-using-with
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    # Keep the handle (and the lock) until exit
+    _take_writer_lock.handle = handle
+    return True
+
+
+_writer = None
+_reader = None
+_store_lock = threading.Lock()
+
+
+def get_bar_writer() -> Optional[SharedBarStore]:
+    """This process's writer store, or None if disabled, unavailable or owned by another process."""
+    global _writer  # pylint: disable=global-statement
+    if not SHARED_BARS_ENABLED:
+        return None
+    with _store_lock:
+        if _writer is None:
+            try:
+                if not _take_writer_lock():
+                    logger.warning("⚠️ Another process is writing shared bars; not publishing")
+                    _writer = False
+                else:
+                    _writer = SharedBarStore(writable=True)
+                    logger.info("🧠 Publishing recent bars to shared memory (%s_*)", SHARED_BARS_PREFIX)
+            except (ImportError, OSError) as e:
+                logger.warning("⚠️ Shared bars unavailable: %s", e)
+                _writer = False
+    return _writer or None
+
+
+def get_bar_reader() -> Optional[SharedBarStore]:
+    """The shared reader store, or None if shared bars are disabled."""
+    global _reader  # pylint: disable=global-statement
+    if not SHARED_BARS_ENABLED:
+        return None
+    with _store_lock:
+        if _reader is None:
+            _reader = SharedBarStore()
+    return _reader
+
+
+def share_fetched_bars() -> bool:
+    """Publish every bar history this process fetches to shared memory; False if it cannot."""
+    # pylint: disable=import-outside-toplevel
+    from core.market_data.multi_timeframe import add_bar_listener
+
+    writer = get_bar_writer()
+    if writer is None:
+        return False
+    add_bar_listener(writer.publish)
+    return True
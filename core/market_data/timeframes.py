@@ -0,0 +1,184 @@
+"""
+Bar timeframes and in-memory resampling.
+
+Intraday data is fetched once as 1-minute bars and every coarser timeframe is
+derived locally: `resample_frame` for a fetched history (vectorized pandas) and
+`BarAggregator` for a live stream of minute bars (incremental, O(1) per bar).
+"""
+import math
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from core.market_data.trading_calendar import MARKET_TZ, get_calendar
+
+# Minutes per bar for every supported timeframe
+TIMEFRAMES: Dict[str, int] = {
+    "1Min": 1,
+    "5Min": 5,
+    "15Min": 15,
+    "1Hour": 60,
+    "1Day": 1440,
+}
+
+BASE_TIMEFRAME = "1Min"
+
+# Regular US equity session length
+SESSION_MINUTES = 390
+
+# Longest minute-bar history worth fetching to derive coarser bars; beyond this
+# (e.g. 200 daily bars) the timeframe is requested from the broker directly
+MAX_MINUTE_HISTORY_DAYS = 10
+
+_PANDAS_RULES = {"1Min": "1min", "5Min": "5min", "15Min": "15min", "1Hour": "1h", "1Day": "1D"}
+
+_OHLCV_AGG = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+
+
+def timeframe_minutes(timeframe: str) -> int:
+    """Minutes per bar, raising ValueError for unknown timeframes."""
+    try:
+        return TIMEFRAMES[timeframe]
+    except KeyError as e:
+        raise ValueError(f"Unsupported timeframe: {timeframe}") from e
+
+
+def alpaca_timeframe(timeframe: str):
+    """Convert a timeframe name into an Alpaca SDK TimeFrame."""
+    from alpaca_trade_api.rest import TimeFrame, TimeFrameUnit  # pylint: disable=import-outside-toplevel
+
+    minutes = timeframe_minutes(timeframe)
+    if minutes == TIMEFRAMES["1Day"]:
+        return TimeFrame.Day
+    if minutes % 60 == 0:
+        return TimeFrame(minutes // 60, TimeFrameUnit.Hour)
+    return TimeFrame(minutes, TimeFrameUnit.Minute)
+
+
+def calendar_days_for(timeframe: str, bars: int) -> int:
+    """Calendar days of history that contain at least `bars` bars of `timeframe`.
+
+    Counted back from today on the broker's clock, so a simulation or replay
+    sizes its windows from its own date.
+    """
+    from core.clients.alpaca_trading_client import market_now  # pylint: disable=import-outside-toplevel
+
+    minutes = timeframe_minutes(timeframe)
+    bars_per_day = 1 if minutes >= TIMEFRAMES["1Day"] else max(1, SESSION_MINUTES // minutes)
+    trading_days = math.ceil(bars / bars_per_day)
+    return _calendar_days(market_now().astimezone(MARKET_TZ).date(), trading_days)
+
+
+@lru_cache(maxsize=256)
+def _calendar_days(today: date, trading_days: int) -> int:
+    """Calendar days up to `today` holding `trading_days` completed sessions plus today's."""
+    return get_calendar().days_spanning(trading_days, today - timedelta(days=1)) + 1
+
+
+def derivable_from_minutes(timeframe: str, bars: int) -> bool:
+    """Whether `bars` bars of `timeframe` fit in the minute history we are willing to fetch."""
+    return calendar_days_for(timeframe, bars) <= MAX_MINUTE_HISTORY_DAYS
+
+
+def resample_frame(df, timeframe: str):
+    """Resample a timestamp-indexed OHLCV DataFrame of finer bars into `timeframe`."""
+    if timeframe == BASE_TIMEFRAME or df.empty:
+        return df
+    columns = {col: agg for col, agg in _OHLCV_AGG.items() if col in df.columns}
+    resampled = df.resample(_PANDAS_RULES[timeframe], label="left", closed="left").agg(columns)
+    return resampled.dropna(subset=["close"])
+
+
+def epoch_seconds(timestamp) -> float:
+    """Epoch seconds for a datetime, pandas Timestamp or ISO-8601 string."""
+    if isinstance(timestamp, str):
+        return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+    return timestamp.timestamp()
+
+
+class BarAggregator:
+    """Incrementally folds 1-minute bars into bars of a coarser timeframe.
+
+    Intraday bars are clock-aligned; daily bars cover one session day in
+    MARKET_TZ (stamped at its local midnight, like the broker's) and close at
+    the session's close, early closes included.
+    """
+
+    def __init__(self, timeframe: str):
+        """Initialize the aggregator for one symbol and timeframe."""
+        self.timeframe = timeframe
+        self.seconds = timeframe_minutes(timeframe) * 60
+        self.daily = timeframe_minutes(timeframe) >= TIMEFRAMES["1Day"]
+        self._bucket: Optional[float] = None
+        self._end: Optional[float] = None
+        self._current: Optional[Dict] = None
+
+    def _bounds(self, epoch: float) -> Optional[Tuple[float, float]]:
+        """Start and close (epoch seconds) of the bar containing `epoch`; None on a day without a session."""
+        if not self.daily:
+            start = epoch - (epoch % self.seconds)
+            return start, start + self.seconds
+        day = datetime.fromtimestamp(epoch, MARKET_TZ).date()
+        session = get_calendar().session(day)
+        if session is None:
+            return None
+        return datetime(day.year, day.month, day.day, tzinfo=MARKET_TZ).timestamp(), session[1].timestamp()
+
+    def resume(self, bar: Dict, now: float) -> bool:
+        """Continue `bar` (e.g. the last one fetched) if it is still forming at epoch `now`.
+
+        Returns whether it was taken over; the caller then leaves it out of
+        its history, since the aggregator emits it once it closes.
+        """
+        bounds = self._bounds(epoch_seconds(bar["timestamp"]))
+        if self.seconds == 60 or bounds is None or bounds[1] <= now:
+            return False
+        self._bucket, self._end = bounds
+        self._current = {
+            "symbol": bar.get("symbol"),
+            "timestamp": datetime.fromtimestamp(self._bucket, timezone.utc).isoformat(),
+            **{name: bar[name] for name in _OHLCV_AGG if name in bar},
+        }
+        return True
+
+    def update(self, bar: Dict) -> List[Dict]:
+        """Fold a minute bar in; return any bars completed by it (oldest first)."""
+        if self.seconds == 60:
+            return [bar]
+
+        completed = []
+        epoch = epoch_seconds(bar["timestamp"])
+        bounds = self._bounds(epoch)
+        if bounds is None or epoch >= bounds[1]:
+            # No session that day, or after its close: not part of a daily bar
+            return completed
+        bucket, end = bounds
+
+        if self._current is not None and bucket != self._bucket:
+            completed.append(self._current)
+            self._current = None
+
+        if self._current is None:
+            self._bucket, self._end = bucket, end
+            self._current = {
+                "symbol": bar.get("symbol"),
+                "timestamp": datetime.fromtimestamp(bucket, timezone.utc).isoformat(),
+                "open": bar["open"],
+                "high": bar["high"],
+                "low": bar["low"],
+                "close": bar["close"],
+                "volume": bar.get("volume", 0),
+            }
+        else:
+            current = self._current
+            current["high"] = max(current["high"], bar["high"])
+            current["low"] = min(current["low"], bar["low"])
+            current["close"] = bar["close"]
+            current["volume"] = current.get("volume", 0) + bar.get("volume", 0)
+
+        # A minute bar stamped at the last minute of the bucket closes it
+        if epoch + 60 >= self._end:
+            completed.append(self._current)
+            self._current = None
+            self._bucket = self._end = None
+        return completed
@@ -0,0 +1,108 @@
+"""
+US equity trading calendar from a local dataset.
+
+Regular sessions run 09:30-16:00 America/New_York on weekdays. Holidays and
+early closes come from a CSV (`date,status,close`, status `closed` or
+`early_close`) shipped in `calendars/`, so checking the session needs no
+broker call. Dates past the end of the dataset fall back to regular weekday
+hours.
+"""
+import csv
+import logging
+import os
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+MARKET_TZ = ZoneInfo("America/New_York")
+REGULAR_OPEN = time(9, 30)
+REGULAR_CLOSE = time(16, 0)
+
+DEFAULT_CALENDAR_FILE = os.path.join(os.path.dirname(__file__), "calendars", "nyse.csv")
+
+Session = Tuple[datetime, datetime]
+
+
+class TradingCalendar:
+    """Answers whether and when the market is open."""
+
+    def __init__(self, exceptions: Dict[date, Optional[time]]):
+        """Initialize from {date: early close time, or None if closed all day}."""
+        self.exceptions = exceptions
+        self.last_date = max(exceptions) if exceptions else None
+        self._warned = False
+
+    @classmethod
+    def from_csv(cls, path: str = DEFAULT_CALENDAR_FILE) -> "TradingCalendar":
+        """Load holidays and early closes from a calendar CSV."""
+        exceptions: Dict[date, Optional[time]] = {}
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                day = date.fromisoformat(row["date"])
+                if row["status"] == "closed":
+                    exceptions[day] = None
+                else:
+                    exceptions[day] = time.fromisoformat(row["close"])
+        logger.info("📅 Loaded trading calendar with %d exceptions from %s", len(exceptions), path)
+        return cls(exceptions)
+
+    def session(self, day: date) -> Optional[Session]:
+        """Open and close (UTC) of the session on `day`, or None if the market is closed."""
+        if day.weekday() >= 5:
+            return None
+        if self.last_date is not None and day > self.last_date and not self._warned:
+            logger.warning("⚠️ Trading calendar ends %s; assuming regular hours", self.last_date)
+            self._warned = True
+
+        close = REGULAR_CLOSE
+        if day in self.exceptions:
+            close = self.exceptions[day]
+            if close is None:
+                return None
+        return (
+            datetime.combine(day, REGULAR_OPEN, MARKET_TZ).astimezone(timezone.utc),
+            datetime.combine(day, close, MARKET_TZ).astimezone(timezone.utc),
+        )
+
+    def session_at(self, moment: datetime) -> Optional[Session]:
+        """The session containing `moment` (inclusive of its close), if any."""
+        session = self.session(moment.astimezone(MARKET_TZ).date())
+        if session is not None and session[0] <= moment <= session[1]:
+            return session
+        return None
+
+    def is_open(self, moment: datetime) -> bool:
+        """Whether the regular session is open at `moment`."""
+        session = self.session_at(moment)
+        return session is not None and moment < session[1]
+
+    def days_spanning(self, sessions: int, end: date) -> int:
+        """Calendar days, counting back from `end` inclusive, that contain `sessions` sessions."""
+        days = 0
+        while sessions > 0:
+            if self.session(end - timedelta(days=days)) is not None:
+                sessions -= 1
+            days += 1
+        return days
+
+    def next_open(self, moment: datetime) -> datetime:
+        """Start of the next session opening after `moment`."""
+        day = moment.astimezone(MARKET_TZ).date()
+        for offset in range(0, 15):
+            session = self.session(day + timedelta(days=offset))
+            if session is not None and session[0] > moment:
+                return session[0]
+        raise ValueError(f"No session within two weeks of {moment}")
+
+
+_calendar = None
+
+
+def get_calendar() -> TradingCalendar:
+    """Return the shared calendar, loading TRADING_CALENDAR_FILE on first use."""
+    global _calendar  # pylint: disable=global-statement
+    if _calendar is None:
+        _calendar = TradingCalendar.from_csv(os.getenv("TRADING_CALENDAR_FILE", DEFAULT_CALENDAR_FILE))
+    return _calendar
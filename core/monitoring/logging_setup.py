@@ -0,0 +1,149 @@
+"""
+Low-overhead logging configuration shared by all services.
+
+- Records are handed to a background thread through a queue, so formatting and
+  I/O happen off the hot path.
+- INFO/DEBUG lines from hot-loop loggers (per-symbol and per-message logging)
+  are rate-limited per message template; warnings and errors always pass.
+- Output is plain text or one JSON object per line (LOG_FORMAT=json).
+- The root level comes from `railway_config.get_railway_config()['log_level']`,
+  with per-module overrides in LOG_LEVELS ("services.trading=WARNING,core.clients=DEBUG").
+"""
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+
+from railway_config import get_railway_config
+
+# Loggers that emit one line per symbol or per message
+HOT_LOOP_LOGGERS = (
+    "services.trading",
+    "core.clients.alpaca_trading_client",
+    "core.clients.redis_messaging_client",
+    "services.websocket.websocket_server",
+    "__main__",
+)
+
+TEXT_FORMAT = "[%(asctime)s] %(levelname)s %(name)s - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def __init__(self, service: Optional[str] = None):
+        """Initialize with an optional service name added to every line."""
+        super().__init__()
+        self.service = service
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Render the record, including any `extra=` fields."""
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if self.service:
+            payload["service"] = self.service
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Allow at most `limit` INFO/DEBUG records per message template per interval."""
+
+    def __init__(self, limit: int, interval: float, prefixes: Tuple[str, ...] = HOT_LOOP_LOGGERS):
+        """Initialize the limiter for loggers whose names start with one of `prefixes`."""
+        super().__init__()
+        self.limit = limit
+        self.interval = interval
+        self.prefixes = prefixes
+        self._lock = threading.Lock()
+        # (logger, template) -> [window_start, emitted, suppressed]
+        self._windows: Dict[Tuple[str, str], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Return False for records over the limit; annotate the first one after a burst."""
+        if record.levelno > logging.INFO or not record.name.startswith(self.prefixes):
+            return True
+
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} (+{suppressed} similar suppressed)"
+                return True
+            if window[1] < self.limit:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Enqueue the record as-is; the in-process queue needs no pickling."""
+        return record
+
+
+def parse_module_levels(spec: str) -> Dict[str, str]:
+    """Parse "module=LEVEL,module2=LEVEL" into a mapping."""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        if name and level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(service: Optional[str] = None):
+    """Install the queue-based handler on the root logger (idempotent)."""
+    global _listener  # pylint: disable=global-statement
+    if _listener is not None:
+        return
+
+    config = get_railway_config()
+    root = logging.getLogger()
+    root.setLevel(config["log_level"].upper())
+    for name, level in parse_module_levels(config["log_levels"]).items():
+        logging.getLogger(name).setLevel(level)
+
+    stream = logging.StreamHandler()
+    if config["log_format"] == "json":
+        stream.setFormatter(JsonFormatter(service))
+    else:
+        stream.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = _DeferredQueueHandler(log_queue)
+    if config["log_rate_limit"] > 0:
+        handler.addFilter(RateLimitFilter(config["log_rate_limit"], config["log_rate_interval"]))
+
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
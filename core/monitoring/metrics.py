@@ -0,0 +1,125 @@
+"""
+Prometheus metrics and optional OpenTelemetry spans for the trading hot path.
+
+Metrics are always collected; `/metrics` endpoints in the API and WebSocket
+services (and METRICS_PORT in the trading service) expose them. Tracing spans
+are emitted only when the `opentelemetry-api` package is installed; otherwise
+`span()` is a no-op.
+"""
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest, start_http_server
+)
+
+try:
+    from opentelemetry import trace
+    _tracer = trace.get_tracer("ascent.trading")
+except ImportError:  # Tracing is optional
+    _tracer = None
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets from 1ms to 10s, covering in-memory evaluation through slow REST calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# ---------- Histograms ----------
+# No symbol labels: a series per symbol and bucket would grow with the
+# universe. Per-symbol timings are on the tracing spans instead.
+
+BAR_FETCH_SECONDS = Histogram(
+    "trading_bar_fetch_seconds", "Time to fetch bars for a symbol",
+    buckets=LATENCY_BUCKETS
+)
+STRATEGY_EVAL_SECONDS = Histogram(
+    "trading_strategy_eval_seconds", "Time to evaluate a strategy for a symbol",
+    ["strategy"], buckets=LATENCY_BUCKETS
+)
+ORDER_SUBMIT_SECONDS = Histogram(
+    "trading_order_submit_seconds", "Time to submit an order for a symbol",
+    buckets=LATENCY_BUCKETS
+)
+DB_COMMIT_SECONDS = Histogram(
+    "trading_db_commit_seconds", "Time to commit a trading database transaction",
+    buckets=LATENCY_BUCKETS
+)
+BROKER_WAIT_SECONDS = Histogram(
+    "broker_rate_limit_wait_seconds", "Time spent waiting for a broker API token",
+    ["priority"], buckets=LATENCY_BUCKETS
+)
+TICK_SECONDS = Histogram(
+    "trading_tick_seconds", "Duration of a full trading job tick",
+    buckets=LATENCY_BUCKETS + (30.0, 60.0, 120.0)
+)
+
+# ---------- Counters ----------
+
+SIGNALS_TOTAL = Counter(
+    "trading_signals_total", "Strategy signals generated", ["strategy", "signal"]
+)
+ORDERS_TOTAL = Counter(
+    "trading_orders_total", "Orders submitted to the broker", ["side", "status"]
+)
+BROKER_THROTTLED_TOTAL = Counter(
+    "broker_throttled_total", "Broker calls dropped because the rate budget was exhausted",
+    ["priority"]
+)
+BROKER_RATE_LIMITED_TOTAL = Counter(
+    "broker_rate_limited_total", "HTTP 429 responses from the broker API"
+)
+TICKS_SKIPPED_TOTAL = Counter(
+    "trading_ticks_skipped_total", "Scheduled trading runs that did not execute", ["reason"]
+)
+TICK_SYMBOLS_TOTAL = Counter(
+    "trading_tick_symbols_total", "Symbols per tick by outcome (done, deadline, fetch_error, no_data)",
+    ["outcome"]
+)
+RISK_REJECTIONS_TOTAL = Counter(
+    "trading_risk_rejections_total", "Orders blocked by the pre-trade risk gate", ["reason"]
+)
+MESSAGES_PUBLISHED_TOTAL = Counter(
+    "redis_messages_published_total", "Messages published to Redis", ["type"]
+)
+BROADCASTS_TOTAL = Counter(
+    "websocket_broadcasts_total", "Messages broadcast to WebSocket clients"
+)
+
+# ---------- Gauges ----------
+
+WEBSOCKET_CONNECTIONS = Gauge(
+    "websocket_active_connections", "Currently connected WebSocket clients"
+)
+QUEUE_DEPTH = Gauge(
+    "queue_depth", "Items waiting in an internal queue", ["queue"]
+)
+
+
+@contextmanager
+def timed(histogram, **labels):
+    """Observe the duration of the wrapped block on a (labelled) histogram."""
+    target = histogram.labels(**labels) if labels else histogram
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        target.observe(time.perf_counter() - start)
+
+
+def span(name: str, **attributes):
+    """Start an OpenTelemetry span if tracing is installed, else a no-op context."""
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes or None)
+
+
+def metrics_payload():
+    """Render all metrics in the Prometheus text format."""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int):
+    """Expose /metrics on a standalone HTTP port (for processes without an API)."""
+    start_http_server(port)
+    logger.info("📈 Metrics server listening on port %d", port)
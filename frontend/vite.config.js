@@ -4,6 +4,10 @@ import react from '@vitejs/plugin-react';
 export default defineConfig({
   base: "/",
   plugins: [react()],
+  build: {
+    // Lists the hashed output files the API serves as immutable
+    manifest: true
+  },
   server: {
     port: 3000
   }
@@ -30,6 +30,10 @@ def get_railway_config() -> dict:
 
         # Optional settings
         'log_level': os.getenv('LOG_LEVEL', 'INFO'),
+        'log_levels': os.getenv('LOG_LEVELS', ''),
+        'log_format': os.getenv('LOG_FORMAT', 'text').lower(),
+        'log_rate_limit': int(os.getenv('LOG_RATE_LIMIT', 20)),
+        'log_rate_interval': float(os.getenv('LOG_RATE_INTERVAL', 60)),
         'workers': int(os.getenv('WORKERS', 2)),
     }
 
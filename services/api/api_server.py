@@ -1,39 +1,46 @@
 """Main FastAPI application for the trading bot API service."""
-import os
 import logging
 from contextlib import asynccontextmanager
-from datetime import datetime
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import Response
 
-from core.database.database_manager import SessionLocal, engine
+from core.codec import CodecJSONResponse
+from core.database import repositories
+from core.database.async_database import async_session, dispose_async_engine
+from core.database.database_manager import init_db
 from core.clients.alpaca_trading_client import (
-    validate_connection, get_account, get_positions, get_activities,
-    submit_market_order, get_recent_bars
+    validate_connection, get_account, get_positions, get_activities
 )
 from core.clients.redis_messaging_client import redis_client
-from core.database.trading_models import Base, ExecutedTrade, StrategyPerformance
-from services.trading.trading_engine import bot
+from core.monitoring.logging_setup import configure_logging
+from core.monitoring.metrics import metrics_payload
+from services.api.compression import CompressionMiddleware
+from services.api.http_cache import CachedRead, conditional_response, conditional_response_async, etag_for
+from services.api.static_assets import get_static_assets
+from services.trading.strategy_manager import STRATEGY_CLASSES, available_strategies
+from services.trading.trading_engine import get_bot, submit_intents
 
 # ---------- Setup ----------
 
-logging.basicConfig(level=logging.INFO)
+configure_logging("api")
 logger = logging.getLogger(__name__)
 
-Base.metadata.create_all(bind=engine)
-
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     """Application lifespan management."""
     logger.info("🚀 Starting web services...")
+    init_db()
+    # Load the frontend build into memory before the first request
+    await run_in_threadpool(get_static_assets)
     # Note: Scheduler runs in separate service
     yield
+    await dispose_async_engine()
     logger.info("🧹 Shutting down web services...")
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=CodecJSONResponse)
 
 # ---------- CORS ----------
 app.add_middleware(
@@ -44,20 +51,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ---------- Compression ----------
+# Added last so it wraps CORS and compresses every eligible response
+app.add_middleware(CompressionMiddleware)
+
+# Broker reads shared by all dashboard polls for API_READ_CACHE_SECONDS
+account_cache = CachedRead("account", get_account)
+positions_cache = CachedRead("positions", lambda: get_positions(strict=True))
+
 # ---------- Static Files ----------
 
-# Check if static directory exists
-STATIC_DIR = "/workspace/static"
-if os.path.exists(STATIC_DIR):
-    # Mount assets directory at root for Vite-generated paths
-    assets_dir = os.path.join(STATIC_DIR, "assets")
-    if os.path.exists(assets_dir):
-        app.mount("/assets", StaticFiles(directory=assets_dir), name="assets")
-        logger.info("📁 Serving assets from %s", assets_dir)
+# The frontend build is served from memory (see services/api/static_assets.py)
+
+def _static_file(path: str, request: Request) -> Response:
+    """A file of the frontend build, or 404."""
+    assets = get_static_assets()
+    response = assets.response(path, request) if assets is not None else None
+    if response is None:
+        return CodecJSONResponse(status_code=404, content={"detail": "Not Found"})
+    return response
 
-    # Mount static directory
-    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
-    logger.info("📁 Serving static files from %s", STATIC_DIR)
+@app.get("/assets/{path:path}")
+async def asset(path: str, request: Request):
+    """Serve a Vite-generated asset."""
+    return _static_file(f"assets/{path}", request)
+
+@app.get("/static/{path:path}")
+async def static_file(path: str, request: Request):
+    """Serve any file of the frontend build."""
+    return _static_file(path, request)
 
 # ---------- API Routes ----------
 
@@ -66,33 +88,77 @@ def health():
     """Health check endpoint."""
     return {"message": "API is running"}
 
+@app.get("/metrics")
+def metrics():
+    """Prometheus metrics endpoint."""
+    payload, content_type = metrics_payload()
+    return Response(content=payload, media_type=content_type)
+
 @app.get("/api/account")
-def account():
-    """Get account information."""
-    acc = get_account()
-    if acc:
-        return acc
-    return JSONResponse(status_code=500, content={"error": "Failed to fetch account info"})
+def account(request: Request):
+    """Get account information (304 if unchanged since the client's copy)."""
+    acc, etag = account_cache.get()
+    if acc is None:
+        return CodecJSONResponse(status_code=500, content={"error": "Failed to fetch account info"})
+    return conditional_response(request, etag, lambda: acc)
 
 @app.get("/api/positions")
-def positions():
-    """Get current positions."""
-    return get_positions()
+def positions(request: Request):
+    """Get current positions (304 if unchanged since the client's copy)."""
+    current, etag = positions_cache.get()
+    if current is None:
+        return []
+    return conditional_response(request, etag, lambda: current)
 
 @app.get("/api/activities")
 def activities():
     """Get recent activities."""
     return get_activities()
 
+@app.get("/api/portfolio")
+def portfolio():
+    """Latest live exposure and PnL snapshot published by the trading service."""
+    # Sent as stored: the JSON the trading service encoded is never decoded here
+    snapshot = redis_client.get_portfolio(raw=True)
+    if snapshot is None:
+        return CodecJSONResponse(status_code=404, content={"error": "No portfolio snapshot published yet"})
+    return Response(content=snapshot, media_type="application/json")
+
+@app.get("/api/risk")
+def risk_limits():
+    """Configured pre-trade risk limits and the strategies whose kill switch is on."""
+    # pylint: disable=import-outside-toplevel
+    from services.trading.risk_gate import RISK_ENABLED, RISK_KILLED_STRATEGIES, RiskLimits
+
+    limits = RiskLimits(killed=RISK_KILLED_STRATEGIES.split(","))
+    killed = limits.killed | (redis_client.killed_strategies() or set())
+    return {"enabled": RISK_ENABLED, **limits.as_dict(), "killed_strategies": sorted(killed)}
+
+@app.post("/api/risk/kill")
+def set_kill_switch(data: dict):
+    """Block (or unblock) every order from a strategy; the trading service picks it up on its next sync."""
+    strategy_name = data.get("strategy")
+    if not strategy_name:
+        return {"success": False, "error": "Missing strategy name"}
+    if strategy_name in STRATEGY_CLASSES:
+        # Orders carry the strategy's class name
+        strategy_name = STRATEGY_CLASSES[strategy_name].__name__
+    killed = bool(data.get("killed", True))
+    if not redis_client.set_strategy_killed(strategy_name, killed):
+        return CodecJSONResponse(status_code=503, content={"error": "Failed to update kill switch"})
+    return {"success": True, "strategy": strategy_name, "killed": killed}
+
 @app.get("/api/validate-alpaca")
 def validate_alpaca():
     """Validate Alpaca connection."""
     return validate_connection()
 
 @app.get("/api/status")
-def get_bot_status():
-    """Get bot status."""
-    return {"status": bot.status}
+async def get_bot_status():
+    """Get bot status as stored in the database."""
+    async with async_session() as session:
+        running = await repositories.bot_running(session)
+    return {"status": "Running" if running else "Paused"}
 
 # ---------- Bot Control Endpoints ----------
 @app.post("/api/strategy")
@@ -100,7 +166,7 @@ def change_strategy(data: dict):
     """Change trading strategy."""
     strategy_name = data.get("strategy")
     if strategy_name:
-        bot.set_strategy(strategy_name)
+        get_bot().set_strategy(strategy_name)
 
         # Publish strategy change to Redis
         redis_client.publish_strategy_change(strategy_name)
@@ -108,99 +174,134 @@ def change_strategy(data: dict):
         return {"success": True, "strategy": strategy_name}
     return {"success": False, "error": "Missing strategy name"}
 
+@app.get("/api/strategies")
+async def list_strategies():
+    """List registered strategies and whether each runs in the portfolio."""
+    async with async_session() as session:
+        active = await repositories.active_strategies(session)
+    return [{"name": name, "active": name in active} for name in available_strategies()]
+
+@app.post("/api/strategies/active")
+async def set_strategy_active(data: dict):
+    """Add a strategy to, or remove it from, the side-by-side portfolio."""
+    strategy_name = data.get("strategy")
+    if strategy_name not in available_strategies():
+        return {"success": False, "error": f"Unknown strategy: {strategy_name}"}
+
+    active = bool(data.get("active", True))
+    async with async_session() as session:
+        await repositories.set_strategy_active(session, strategy_name, active)
+        await session.commit()
+    await run_in_threadpool(redis_client.publish_strategy_change, strategy_name)
+    return {"success": True, "strategy": strategy_name, "active": active}
+
 @app.post("/api/toggle")
-def toggle_bot():
+async def toggle_bot():
     """Toggle bot running state."""
-    bot.toggle()
+    async with async_session() as session:
+        running = not await repositories.bot_running(session)
+        await repositories.set_bot_running(session, running)
+        await session.commit()
+    status = "Running" if running else "Paused"
+    logger.info("💾 Saved bot state to database: %s", status)
 
     # Publish status change to Redis
-    redis_client.publish_status(bot.status)
+    await run_in_threadpool(redis_client.publish_status, status)
 
-    return {"success": True, "status": bot.status}
+    return {"success": True, "status": status}
+
+def _refresh_risk_gate():
+    """Sync the risk gate's account state before a manual trade.
+
+    The API builds its gate without the background refresher the trading
+    service runs, so it polls the broker only when a trade is placed.
+    """
+    from services.trading.risk_gate import get_risk_gate  # pylint: disable=import-outside-toplevel
+
+    gate = get_risk_gate(background=False)
+    if gate is None:
+        return
+    try:
+        gate.cache.refresh()
+    except Exception as e:
+        logger.error("❌ Risk cache refresh error: %s", e)
 
 @app.post("/api/execute_trade")
-def execute_test_trade(data: dict):
+async def execute_test_trade(data: dict):
     """Execute a manual test trade"""
     symbol = data.get("symbol", "AAPL")
     action = data.get("action", "buy")
     qty = data.get("qty", 1)
+    if not isinstance(symbol, str) or not symbol:
+        return CodecJSONResponse(status_code=400, content={"success": False, "error": "Invalid symbol"})
+    if action not in ("buy", "sell"):
+        return CodecJSONResponse(
+            status_code=400, content={"success": False, "error": "action must be 'buy' or 'sell'"}
+        )
+    if isinstance(qty, bool) or not isinstance(qty, (int, float)) or not qty > 0:
+        return CodecJSONResponse(
+            status_code=400, content={"success": False, "error": "qty must be a positive number"}
+        )
 
     try:
-        # Execute trade via Alpaca
-        order = submit_market_order(symbol, qty, side=action)
-
-        # Handle unfilled orders in paper trading
-        if order and order.get("filled_avg_price"):
-            price = float(order.get("filled_avg_price"))
-        elif order and order.get("limit_price"):
-            price = float(order.get("limit_price"))
+        # Broker calls block, so they run on the threadpool; the writes run on the event loop.
+        # The order's price is reconciled when the fill arrives.
+        await run_in_threadpool(_refresh_risk_gate)
+        trades = await run_in_threadpool(submit_intents, [("Manual Test", symbol, action, qty)])
+        trade = trades[0]
+
+        # Update strategy performance
+        acc = await run_in_threadpool(get_account)
+        if acc:
+            portfolio_value = float(getattr(acc, '_raw', {}).get("cash", 0))
         else:
-            # Fallback to current market price if order not filled yet
-            try:
-                bars = get_recent_bars(symbol, limit=1)
-                price = float(bars[0]["close"]) if bars else 100.0  # Default fallback
-            except (KeyError, ValueError, IndexError):  # More specific exceptions
-                price = 100.0  # Final fallback price
-
-        # Store trade in database
-        db = SessionLocal()
-        try:
-            trade = ExecutedTrade(
-                symbol=symbol,
-                action=action,
-                price=price,
-                qty=qty,
-                signal=action,
-                strategy="Manual Test"
-            )
-            db.add(trade)
-
-            # Update strategy performance
-            acc = get_account()
-            if acc:
-                portfolio_value = float(getattr(acc, '_raw', {}).get("cash", 0))
-            else:
-                portfolio_value = 0.0
-            performance = StrategyPerformance(
-                strategy="Manual Test",
-                portfolio_value=portfolio_value
-            )
-            db.add(performance)
-            db.commit()
-
-            # Publish trade to Redis for WebSocket broadcast
-            redis_client.publish_trade(
-                symbol=symbol,
-                action=action,
-                price=price,
-                timestamp=datetime.now().isoformat(),
-                strategy="Manual Test"
-            )
+            portfolio_value = 0.0
 
+        async with async_session() as session:
+            repositories.add_trades(session, trades)
+            repositories.add_performance(session, "Manual Test", portfolio_value)
+            await session.commit()
+        await run_in_threadpool(redis_client.touch_version, "trades")
+
+        if trade.status in ("blocked", "failed"):
             return {
-                "success": True,
-                "trade": {
-                    "symbol": symbol,
-                    "action": action,
-                    "price": price,
-                    "qty": qty,
-                    "strategy": "Manual Test"
-                }
+                "success": False,
+                "status": trade.status,
+                "error": (
+                    f"Order blocked by risk check: {trade.block_reason}"
+                    if trade.status == "blocked" else "Order submission failed"
+                ),
             }
-
-        finally:
-            db.close()
+        return {
+            "success": True,
+            "trade": {
+                "symbol": symbol,
+                "action": action,
+                "price": trade.price,
+                "qty": qty,
+                "strategy": "Manual Test",
+                "order_id": trade.order_id,
+                "status": trade.status
+            }
+        }
 
     except (ValueError, KeyError, ConnectionError) as e:
         logger.error("❌ Manual trade execution failed: %s", e)
         return {"success": False, "error": str(e)}
 
 @app.get("/api/trades")
-def get_recent_trades():
-    """Get recent trades from database."""
-    db = SessionLocal()
+async def get_recent_trades(request: Request):
+    """Get recent trades from database (304 if none changed since the client's copy)."""
+    # Read the version before the rows: a trade committed in between makes the next poll a 200
+    version = await run_in_threadpool(redis_client.get_version, "trades")
+    etag = etag_for("trades", version) if version is not None else None
+    return await conditional_response_async(request, etag, _recent_trades)
+
+async def _recent_trades():
+    """The 10 latest trades as dicts."""
     try:
-        trades = db.query(ExecutedTrade).order_by(ExecutedTrade.created_at.desc()).limit(10).all()
+        async with async_session() as session:
+            trades = await repositories.recent_trades(session, limit=10)
         return [
             {
                 "id": trade.id,
@@ -209,44 +310,59 @@ def get_recent_trades():
                 "price": trade.price,
                 "qty": trade.qty,
                 "strategy": trade.strategy,
+                "status": trade.status,
                 "created_at": trade.created_at.isoformat() if trade.created_at else None
             }
             for trade in trades
         ]
     except (ValueError, AttributeError) as e:
         logger.error("❌ Failed to fetch trades: %s", e)
-        return {"error": str(e)}
-    finally:
-        db.close()
+        # A Response is sent without an ETag, so the error is never cached
+        return CodecJSONResponse(content={"error": str(e)})
+
+# ---------- Market Data Endpoints ----------
+
+@app.get("/api/prices")
+def latest_prices():
+    """Latest close per symbol from the trading service's shared-memory bars."""
+    from core.market_data.shared_bars import get_bar_reader  # pylint: disable=import-outside-toplevel
+
+    reader = get_bar_reader()
+    # Returned as a response so the codec encodes the timestamps, skipping jsonable_encoder
+    return CodecJSONResponse(reader.latest_prices() if reader is not None else {})
+
+@app.get("/api/bars/{symbol}")
+def recent_bars(symbol: str, timeframe: str = "1Min", limit: int = 100):
+    """Recent bars of a symbol from the trading service's shared-memory bars."""
+    from core.market_data.shared_bars import get_bar_reader  # pylint: disable=import-outside-toplevel
+
+    reader = get_bar_reader()
+    bars = reader.bars(symbol.upper(), timeframe, max(1, limit)) if reader is not None else None
+    if bars is None:
+        return CodecJSONResponse(status_code=404, content={"error": f"No {timeframe} bars for {symbol}"})
+    return CodecJSONResponse(list(bars))
 
 # ---------- SPA Fallback ----------
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Serve the React SPA for root route."""
-    # Static files are mounted at /workspace/static in container
-    index_file = os.path.join(STATIC_DIR, "index.html")
-
-    # If the static directory and index.html exist, serve the SPA
-    if os.path.exists(index_file):
-        return FileResponse(index_file)
-
-    # Fallback for development when static files don't exist yet
-    return {
-        "message": "Frontend not built yet. Run the build process to generate static files."
-    }
+    return _spa(request)
 
 @app.get("/{path:path}")
-async def spa_fallback():
-    """Serve the React SPA for all non-API routes."""
-    # Static files are mounted at /workspace/static in container
-    index_file = os.path.join(STATIC_DIR, "index.html")
+async def spa_fallback(path: str, request: Request):
+    """Serve top-level build files (e.g. favicon.ico), else the React SPA for all non-API routes."""
+    return _spa(request, path)
+
+def _spa(request: Request, path: str = "") -> Response:
+    """A top-level file of the build if `path` names one, else index.html from memory."""
+    assets = get_static_assets()
 
     # If the static directory and index.html exist, serve the SPA
-    if os.path.exists(index_file):
-        return FileResponse(index_file)
+    if assets is not None and assets.has_index:
+        return (path and assets.response(path, request)) or assets.response("index.html", request)
 
     # Fallback for development when static files don't exist yet
-    return {
+    return CodecJSONResponse({
         "message": "Frontend not built yet. Run the build process to generate static files."
-    }
+    })
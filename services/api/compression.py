@@ -0,0 +1,172 @@
+"""
+Response compression for the API service.
+
+Text responses (JSON, HTML, JavaScript, CSS, SVG) of at least
+COMPRESS_MIN_BYTES are compressed with brotli when the client accepts it and
+the `brotli` package is installed, else with gzip. Responses that are already
+encoded, partial, empty (204/304) or of other types pass through unchanged.
+Bodies are buffered up to COMPRESS_MAX_BYTES; anything larger is streamed
+uncompressed rather than held in memory.
+"""
+import gzip
+import os
+from typing import List, Optional
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "500"))
+COMPRESS_MAX_BYTES = int(os.getenv("COMPRESS_MAX_BYTES", str(8 * 1024 * 1024)))
+# Fast settings: responses are compressed on every request
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Smallest output: static assets are compressed once (see static_assets.py)
+BEST_GZIP_LEVEL = 9
+BEST_BROTLI_QUALITY = 11
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/javascript", "application/xml", "image/svg+xml", "text/",
+)
+
+
+def accepted_encodings(header: str) -> List[str]:
+    """Encodings from an Accept-Encoding header, most preferred first, without q=0 ones."""
+    weighted = []
+    for position, part in enumerate(header.split(",")):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name and quality > 0:
+            weighted.append((-quality, position, name.strip().lower()))
+    return [name for _, _, name in sorted(weighted)]
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    """The best supported encoding the client accepts: br (if available), then gzip."""
+    for name in accepted_encodings(header):
+        if name == "br" and brotli is not None:
+            return "br"
+        if name == "gzip":
+            return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str, best: bool = False) -> bytes:
+    """Compress a body with gzip or brotli, fast or (`best`) as small as possible."""
+    if encoding == "br":
+        return brotli.compress(body, quality=BEST_BROTLI_QUALITY if best else BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=BEST_GZIP_LEVEL if best else GZIP_LEVEL, mtime=0)
+
+
+def _header(headers, name: bytes) -> Optional[bytes]:
+    """A raw ASGI header value, if present."""
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing text responses with brotli or gzip."""
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES, maximum_size: int = COMPRESS_MAX_BYTES):
+        """Wrap an ASGI app."""
+        self.app = app
+        self.minimum_size = minimum_size
+        self.maximum_size = maximum_size
+
+    async def __call__(self, scope, receive, send):
+        """Compress the response if the request accepts an encoding we support."""
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding((_header(scope["headers"], b"accept-encoding") or b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressingResponder(self, encoding, send).run(scope, receive)
+
+
+class _CompressingResponder:
+    """Buffers one response and sends it compressed, or passes it through."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        """Start with nothing buffered."""
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start = None
+        self.chunks: List[bytes] = []
+        self.size = 0
+        self.passing_through = False
+
+    async def run(self, scope, receive):
+        """Run the app with a wrapped `send`."""
+        await self.middleware.app(scope, receive, self.on_message)
+
+    def _eligible(self, message) -> bool:
+        """Whether the response's status and headers allow compression."""
+        headers = message.get("headers", [])
+        if message["status"] in (204, 206, 304) or _header(headers, b"content-encoding"):
+            return False
+        content_type = (_header(headers, b"content-type") or b"").decode("latin-1").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def _pass_through(self):
+        """Send the start message and anything buffered as is."""
+        self.passing_through = True
+        await self.send(self.start)
+        for chunk in self.chunks:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": True})
+        self.chunks = []
+
+    async def on_message(self, message):
+        """Handle one message from the app."""
+        if message["type"] == "http.response.start":
+            self.start = message
+            if not self._eligible(message):
+                await self._pass_through()
+            return
+        if self.passing_through:
+            await self.send(message)
+            return
+        if message["type"] != "http.response.body":
+            # e.g. pathsend: the server sends the file itself
+            await self._pass_through()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        self.chunks.append(body)
+        self.size += len(body)
+        if more_body:
+            if self.size > self.middleware.maximum_size:
+                await self._pass_through()
+            return
+
+        body = b"".join(self.chunks)
+        headers = [(k, v) for k, v in self.start.get("headers", []) if k.lower() != b"content-length"]
+        vary = _header(headers, b"vary")
+        if vary is None:
+            headers.append((b"vary", b"Accept-Encoding"))
+        elif b"accept-encoding" not in vary.lower():
+            headers = [(k, v + b", Accept-Encoding" if k.lower() == b"vary" else v) for k, v in headers]
+        if len(body) >= self.middleware.minimum_size:
+            body = compress(body, self.encoding)
+            headers.append((b"content-encoding", self.encoding.encode()))
+            # A strong ETag names the exact bytes, which encoding changes; a weak one still matches
+            headers = [
+                (k, b"W/" + v if k.lower() == b"etag" and not v.startswith(b"W/") else v)
+                for k, v in headers
+            ]
+        headers.append((b"content-length", str(len(body)).encode()))
+        await self.send({**self.start, "headers": headers})
+        await self.send({"type": "http.response.body", "body": body})
@@ -0,0 +1,148 @@
+"""
+Conditional GET for polled API reads.
+
+Each resource has a version that changes whenever its content may have, and
+its ETag is built from that version alone. A poll that sends the current
+ETag in If-None-Match gets an empty 304 before the resource is queried or
+serialized.
+
+- Trades: the version is a random token in Redis that every writer of
+  `executed_trades` replaces after committing (`redis_client.touch_version`),
+  so it is shared by all API workers. Without Redis there is no ETag and
+  every poll gets the full response.
+- Broker reads (account, positions): one fetch is shared by all requests
+  for API_READ_CACHE_SECONDS, and the version goes up when a refresh returns
+  different content. Only one request refreshes at a time; the others are
+  served the stale value meanwhile. It is local to the worker process, so the ETag also
+  includes a per-process id.
+"""
+import os
+import secrets
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+from core.codec import CodecJSONResponse
+
+# Seconds a broker read is shared by all requests before it is fetched again
+API_READ_CACHE_SECONDS = float(os.getenv("API_READ_CACHE_SECONDS", "5"))
+
+# Distinguishes this process's local versions from other workers'
+PROCESS_ID = secrets.token_hex(4)
+
+
+def etag_for(resource: str, version) -> str:
+    """Weak ETag for a resource version (the same for every content encoding)."""
+    return f'W/"{resource}-{version}"'
+
+
+def not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag` (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in if_none_match.split(","))
+
+
+def _validators(request, etag: Optional[str]) -> Tuple[dict, Optional[Response]]:
+    """Response headers for `etag`, and the 304 to send if the request already has it."""
+    headers = {"Cache-Control": "no-cache"}
+    if etag is not None:
+        headers["ETag"] = etag
+        if not_modified(request.headers.get("if-none-match"), etag):
+            return headers, Response(status_code=304, headers=headers)
+    return headers, None
+
+
+def _tagged(content, headers: dict) -> Response:
+    """`content` as JSON with the validators, or as is if it is already a Response."""
+    if isinstance(content, Response):
+        return content
+    return CodecJSONResponse(content=jsonable_encoder(content), headers=headers)
+
+
+def conditional_response(request, etag: Optional[str], build: Callable[[], Any]) -> Response:
+    """304 if the request already has `etag`, else `build()` as JSON tagged with it.
+
+    `build` only runs when the body is needed. If it returns a Response
+    (e.g. an error), that is sent as is, without the ETag.
+    """
+    headers, unmodified = _validators(request, etag)
+    return unmodified or _tagged(build(), headers)
+
+
+async def conditional_response_async(
+    request, etag: Optional[str], build: Callable[[], Awaitable[Any]]
+) -> Response:
+    """`conditional_response` for a coroutine `build` (e.g. an async database read)."""
+    headers, unmodified = _validators(request, etag)
+    return unmodified or _tagged(await build(), headers)
+
+
+class CachedRead:
+    """A broker read shared by every request for `ttl` seconds, versioned by its content.
+
+    Refreshes are single-flight and run outside the lock: while one caller
+    fetches, the others get the stale value, or wait for the fetch if there
+    is none yet, instead of queueing on the lock behind a slow broker call.
+    """
+
+    def __init__(self, name: str, fetch: Callable[[], Any], ttl: float = API_READ_CACHE_SECONDS):
+        """`fetch()` returns the resource, or None when the read failed (never cached)."""
+        self.name = name
+        self.fetch = fetch
+        self.ttl = ttl
+        self.value = None
+        self.version = 0
+        self.fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+        # Set when the refresh in flight, if any, finishes
+        self._refreshing: Optional[threading.Event] = None
+
+    def _current(self) -> Tuple[Any, Optional[str]]:
+        """The cached value and its ETag, or (None, None) if nothing was fetched yet (caller holds the lock)."""
+        if self.fetched_at is None:
+            return None, None
+        return self.value, etag_for(self.name, f"{PROCESS_ID}.{self.version}")
+
+    def get(self) -> Tuple[Any, Optional[str]]:
+        """The current value and its ETag, or (None, None) if a needed refresh failed."""
+        with self._lock:
+            now = time.monotonic()
+            if self.fetched_at is not None and now - self.fetched_at < self.ttl:
+                return self._current()
+            refreshing = self._refreshing
+            if refreshing is None:
+                self._refreshing = done = threading.Event()
+            elif self.fetched_at is not None:
+                # Another caller is refreshing; the stale value is good enough meanwhile
+                return self._current()
+
+        if refreshing is not None:
+            refreshing.wait()
+            with self._lock:
+                return self._current()
+
+        value = None
+        try:
+            value = self.fetch()
+        finally:
+            with self._lock:
+                if value is not None:
+                    if self.fetched_at is None or _content(value) != _content(self.value):
+                        self.version += 1
+                    self.value, self.fetched_at = value, time.monotonic()
+                self._refreshing = None
+                result = self._current() if value is not None else (None, None)
+            done.set()
+        return result
+
+
+def _content(value):
+    """Comparable content of a broker entity (its raw dict) or plain value."""
+    return getattr(value, "_raw", value)
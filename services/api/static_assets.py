@@ -0,0 +1,217 @@
+"""
+In-memory serving of the built React SPA.
+
+Every file of the frontend build up to STATIC_MAX_FILE_BYTES is read once,
+on the API's startup, with its content type, ETag and compressed variants,
+so a request for index.html or an asset is a dictionary lookup and never
+touches the filesystem. Larger files are served from disk.
+
+- Variants: `<file>.br` / `<file>.gz` written at build time
+  (`python -m services.api.static_assets <dir>`, run by the API Dockerfile)
+  are used as they are; text files without them are compressed on load.
+  Each request gets the variant its Accept-Encoding prefers.
+- Caching: files Vite names by content hash (listed in its manifest, or named
+  `name-<hash>.ext` under assets/) are sent as immutable for a year; anything
+  else, index.html included, is `no-cache` and revalidated by ETag (304).
+"""
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import sys
+import threading
+from typing import Dict, Optional, Set
+
+from fastapi.responses import FileResponse, Response
+
+from services.api.compression import (
+    COMPRESS_MIN_BYTES, COMPRESSIBLE_TYPES, accepted_encodings, brotli, compress
+)
+from services.api.http_cache import etag_for, not_modified
+
+logger = logging.getLogger(__name__)
+
+# Where the API Dockerfile copies the frontend build
+STATIC_DIR = os.getenv("STATIC_DIR", "/workspace/static")
+# Files above this size are served from disk instead of memory
+STATIC_MAX_FILE_BYTES = int(os.getenv("STATIC_MAX_FILE_BYTES", str(4 * 1024 * 1024)))
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+# Vite's default output name for hashed files: assets/<name>-<8+ char hash>.<ext>
+HASHED_ASSET = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+# Vite 4 writes the manifest at the build root, Vite 5 under .vite/
+MANIFEST_PATHS = ("manifest.json", ".vite/manifest.json")
+VARIANT_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def _compressible(content_type: str) -> bool:
+    """Whether a content type is text worth compressing."""
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class StaticFile:
+    """One file's body, compressed variants and response headers."""
+
+    __slots__ = ("body", "variants", "media_type", "etag", "headers")
+
+    def __init__(self, body: bytes, variants: Dict[str, bytes], media_type: str, cache_control: str):
+        """Keep the body and variants; the ETag is a digest of the body."""
+        self.body = body
+        self.variants = variants
+        self.media_type = media_type
+        self.etag = etag_for("static", hashlib.sha1(body).hexdigest()[:16])
+        self.headers = {"ETag": self.etag, "Cache-Control": cache_control}
+        if variants:
+            self.headers["Vary"] = "Accept-Encoding"
+
+    def response(self, request) -> Response:
+        """The best variant for the request, or a 304 if the client's copy is current."""
+        if not_modified(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=self.headers)
+        headers = self.headers
+        body = self.body
+        if self.variants:
+            for encoding in accepted_encodings(request.headers.get("accept-encoding", "")):
+                if encoding in self.variants:
+                    body = self.variants[encoding]
+                    headers = {**headers, "Content-Encoding": encoding}
+                    break
+        return Response(content=body, media_type=self.media_type, headers=headers)
+
+
+class StaticAssets:
+    """A frontend build held in memory, keyed by path relative to its directory."""
+
+    def __init__(self, directory: str, max_file_bytes: int = STATIC_MAX_FILE_BYTES):
+        """Load every file under `directory`."""
+        self.directory = directory
+        self.max_file_bytes = max_file_bytes
+        self.files: Dict[str, StaticFile] = {}
+        # Files over the size limit: relative path -> disk path
+        self.large: Dict[str, str] = {}
+        self._load()
+
+    def _hashed(self) -> Set[str]:
+        """Paths Vite's manifest lists as build outputs, if the build wrote one."""
+        for name in MANIFEST_PATHS:
+            path = os.path.join(self.directory, name)
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    manifest = json.load(f)
+                hashed = set()
+                for chunk in manifest.values():
+                    hashed.add(chunk["file"])
+                    hashed.update(chunk.get("css", ()))
+                    hashed.update(chunk.get("assets", ()))
+                return hashed
+        return set()
+
+    def _load(self):
+        """Read the files, their build-time variants, and compress text without variants."""
+        hashed = self._hashed()
+        size = 0
+        for root, dirs, names in os.walk(self.directory):
+            dirs[:] = [name for name in dirs if not name.startswith(".")]
+            present = set(names)
+            for name in names:
+                if name.startswith(".") or any(
+                    name.endswith(suffix) and name[:-len(suffix)] in present
+                    for suffix in VARIANT_SUFFIXES.values()
+                ):
+                    continue
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                if os.path.getsize(path) > self.max_file_bytes:
+                    self.large[relative] = path
+                    continue
+                with open(path, "rb") as f:
+                    body = f.read()
+                media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                immutable = relative in hashed or HASHED_ASSET.match(relative)
+                self.files[relative] = StaticFile(
+                    body, self._variants(path, body, media_type, present, name),
+                    media_type, IMMUTABLE if immutable else REVALIDATE,
+                )
+                size += len(body)
+        logger.info(
+            "📁 Loaded %d static files (%.1f KB) from %s into memory",
+            len(self.files), size / 1024, self.directory
+        )
+
+    @staticmethod
+    def _variants(path: str, body: bytes, media_type: str, present: Set[str], name: str) -> Dict[str, bytes]:
+        """Compressed variants of a file smaller than its body."""
+        variants = {}
+        for encoding, suffix in VARIANT_SUFFIXES.items():
+            if name + suffix in present:
+                with open(path + suffix, "rb") as f:
+                    variants[encoding] = f.read()
+            elif (
+                _compressible(media_type) and len(body) >= COMPRESS_MIN_BYTES
+                and (encoding != "br" or brotli is not None)
+            ):
+                variants[encoding] = compress(body, encoding)
+        return {encoding: data for encoding, data in variants.items() if len(data) < len(body)}
+
+    def response(self, path: str, request) -> Optional[Response]:
+        """The response for a file of the build, or None if it has no such file."""
+        entry = self.files.get(path)
+        if entry is not None:
+            return entry.response(request)
+        if path in self.large:
+            return FileResponse(self.large[path])
+        return None
+
+    @property
+    def has_index(self) -> bool:
+        """Whether the build has the SPA's index.html."""
+        return "index.html" in self.files or "index.html" in self.large
+
+
+def precompress(directory: str) -> int:
+    """Write the smallest .br/.gz variants of a build's text files; return how many were written."""
+    written = 0
+    for root, dirs, names in os.walk(directory):
+        dirs[:] = [name for name in dirs if not name.startswith(".")]
+        for name in names:
+            media_type = mimetypes.guess_type(name)[0] or ""
+            if name.endswith(tuple(VARIANT_SUFFIXES.values())) or not _compressible(media_type):
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                body = f.read()
+            if len(body) < COMPRESS_MIN_BYTES:
+                continue
+            for encoding, suffix in VARIANT_SUFFIXES.items():
+                if encoding == "br" and brotli is None:
+                    continue
+                data = compress(body, encoding, best=True)
+                if len(data) < len(body):
+                    with open(path + suffix, "wb") as f:
+                        f.write(data)
+                    written += 1
+    return written
+
+
+_assets = None
+_assets_loaded = False
+_assets_lock = threading.Lock()
+
+
+def get_static_assets() -> Optional[StaticAssets]:
+    """Return the frontend build loaded from STATIC_DIR on first use; None if it was not built."""
+    global _assets, _assets_loaded  # pylint: disable=global-statement
+    if not _assets_loaded:
+        with _assets_lock:
+            if not _assets_loaded:
+                _assets = StaticAssets(STATIC_DIR) if os.path.isdir(STATIC_DIR) else None
+                _assets_loaded = True
+    return _assets
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else STATIC_DIR
+    print(f"Wrote {precompress(target)} precompressed variants under {target}")
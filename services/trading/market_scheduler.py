@@ -0,0 +1,106 @@
+"""
+Market-hours aware scheduling for the trading job.
+
+The job fires once a minute during the exchange's weekday hours, a few
+seconds after each minute boundary so the bar that just closed is available.
+Each run checks the trading calendar and only evaluates strategies whose
+cadence (by default their bar timeframe) has a bar closing at that boundary,
+so nothing runs while the market is closed and each strategy runs once per
+bar. Overlapping runs are dropped rather than queued.
+"""
+import logging
+import os
+from datetime import datetime
+from typing import Callable
+
+from core.market_data.timeframes import TIMEFRAMES, timeframe_minutes
+from core.market_data.trading_calendar import MARKET_TZ, Session
+from core.monitoring.metrics import TICKS_SKIPPED_TOTAL
+
+logger = logging.getLogger(__name__)
+
+# Seconds after a bar closes before evaluating it, so the broker has published it
+BAR_CLOSE_DELAY = int(os.getenv("BAR_CLOSE_DELAY", "5"))
+# Latest second of the minute a run may start at: `tick_boundary` takes its
+# boundary from the start time, so a later start would evaluate the next minute
+LAST_START_SECOND = 59
+# Random extra delay (seconds) to spread load when several instances run,
+# capped so delay plus jitter stays within the minute
+SCHEDULER_JITTER = max(0, min(
+    int(os.getenv("SCHEDULER_JITTER", "0")), LAST_START_SECOND - BAR_CLOSE_DELAY
+))
+# A run that starts this late (e.g. after a pause) is skipped instead of run;
+# also capped to the rest of the minute
+MISFIRE_GRACE_SECONDS = max(1, min(
+    int(os.getenv("MISFIRE_GRACE_SECONDS", "30")),
+    LAST_START_SECOND - BAR_CLOSE_DELAY - SCHEDULER_JITTER,
+))
+
+
+def cadence(strategy) -> str:
+    """How often a strategy runs: its `cadence` attribute, else its bar timeframe."""
+    return getattr(strategy, "cadence", strategy.timeframe)
+
+
+def tick_boundary(moment: datetime) -> datetime:
+    """The minute boundary a run belongs to."""
+    return moment.replace(second=0, microsecond=0)
+
+
+def bar_closes_at(timeframe: str, boundary: datetime, session: Session) -> bool:
+    """Whether a bar of `timeframe` completes at `boundary` during `session`.
+
+    Intraday bars are clock-aligned (a 15Min bar closes at :00, :15, :30,
+    :45) and the last bar of the session closes with it, including early
+    closes. The previous daily bar is final at the session open.
+    """
+    market_open, market_close = session
+    minutes = timeframe_minutes(timeframe)
+    if minutes >= TIMEFRAMES["1Day"]:
+        return boundary == market_open
+    if boundary <= market_open or boundary > market_close:
+        return False
+    if boundary == market_close:
+        return True
+    local = boundary.astimezone(MARKET_TZ)
+    return (local.hour * 60 + local.minute) % minutes == 0
+
+
+def is_due(strategy, boundary: datetime, session: Session) -> bool:
+    """Whether `strategy` should run at `boundary`."""
+    return bar_closes_at(cadence(strategy), boundary, session)
+
+
+def _on_skipped(event):
+    """Log runs APScheduler dropped because the previous one was still running or late."""
+    # pylint: disable=import-outside-toplevel
+    from apscheduler.events import EVENT_JOB_MAX_INSTANCES
+
+    reason = "overlap" if event.code == EVENT_JOB_MAX_INSTANCES else "misfire"
+    TICKS_SKIPPED_TOTAL.labels(reason=reason).inc()
+    logger.warning(
+        "⏭️ Skipped trading run scheduled for %s (%s)", event.scheduled_run_time, reason
+    )
+
+
+def create_scheduler(job: Callable[[], None]):
+    """Build a BackgroundScheduler that runs `job` after every minute close in market hours."""
+    # pylint: disable=import-outside-toplevel
+    from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.triggers.cron import CronTrigger
+
+    scheduler = BackgroundScheduler(timezone="America/New_York")
+    scheduler.add_job(
+        job,
+        CronTrigger(
+            day_of_week="mon-fri", hour="9-16", minute="*", second=BAR_CLOSE_DELAY,
+            timezone="America/New_York", jitter=SCHEDULER_JITTER or None,
+        ),
+        id="trading_job",
+        coalesce=True,
+        max_instances=1,
+        misfire_grace_time=MISFIRE_GRACE_SECONDS,
+    )
+    scheduler.add_listener(_on_skipped, EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED)
+    return scheduler
@@ -0,0 +1,355 @@
+"""
+Order management for one trading tick.
+
+Signals from every strategy are collected as intents, netted per symbol so
+opposing signals cancel instead of crossing the spread twice, and the
+remaining orders that pass the pre-trade risk gate are submitted
+concurrently under the broker rate limit. Order
+status then arrives from the broker's trade update stream (or the simulator
+directly), with REST polling as the fallback while the stream is down,
+rather than being read from the submit response, which for a market order is
+usually not filled yet.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.clients.alpaca_trading_client import get_alpaca, get_order, submit_market_order
+from core.monitoring.metrics import ORDER_SUBMIT_SECONDS, ORDERS_TOTAL, span, timed
+from services.trading.risk_gate import RiskGate, get_risk_gate
+
+logger = logging.getLogger(__name__)
+
+# (strategy, symbol, side, qty)
+Intent = Tuple[str, str, str, float]
+
+# Called as on_fill(strategy, symbol, side, qty, price) for each intent once its price is known
+FillCallback = Callable[[str, str, str, float, float], None]
+
+ORDER_WORKERS = int(os.getenv("ORDER_WORKERS", "4"))
+ORDER_POLL_INTERVAL = float(os.getenv("ORDER_POLL_INTERVAL", "1"))
+ORDER_TRACK_TIMEOUT = float(os.getenv("ORDER_TRACK_TIMEOUT", "300"))
+# Safety-net polling interval while trade updates are streaming
+ORDER_STREAM_POLL_INTERVAL = float(os.getenv("ORDER_STREAM_POLL_INTERVAL", "30"))
+
+# Final updates that arrived before their order was tracked
+_RECENT_UPDATES = 1000
+
+TERMINAL_STATUSES = {"filled", "canceled", "expired", "rejected", "done_for_day"}
+# Final statuses whose unfilled quantity gives its risk reservation back
+UNFILLED_STATUSES = {"canceled", "expired", "rejected"}
+
+
+def net_intents(intents: List[Intent]) -> Dict[str, Dict]:
+    """Group intents by symbol with their signed net quantity."""
+    netted: Dict[str, Dict] = {}
+    for intent in intents:
+        _, symbol, side, qty = intent
+        entry = netted.setdefault(symbol, {"symbol": symbol, "net": 0.0, "intents": []})
+        entry["net"] += qty if side == "buy" else -qty
+        entry["intents"].append(intent)
+    return netted
+
+
+def _fill_price(order: Optional[Dict]) -> Optional[float]:
+    """Average fill price of a filled order, if any."""
+    if not order or order.get("status") != "filled" or not order.get("filled_avg_price"):
+        return None
+    return float(order["filled_avg_price"])
+
+
+class OrderTracker:
+    """Follows open orders until they reach a terminal status.
+
+    Updates pushed through `handle_update` (trade update stream) finish orders
+    immediately; a background thread polls the rest, slowly while the stream
+    is connected and every `poll_interval` seconds while it is not.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = ORDER_POLL_INTERVAL,
+        timeout: float = ORDER_TRACK_TIMEOUT,
+        stream_poll_interval: float = ORDER_STREAM_POLL_INTERVAL,
+    ):
+        """Initialize with nothing tracked; the thread starts on first use."""
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.stream_poll_interval = stream_poll_interval
+        self.streaming = False
+        self._pending: Dict[str, Tuple[float, Callable[[Dict], None]]] = {}
+        self._recent: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, order_id: str, callback: Callable[[Dict], None]):
+        """Call `callback(order)` once the order is filled, canceled, expired or rejected."""
+        with self._lock:
+            order = self._recent.pop(order_id, None)
+            if order is None:
+                self._pending[order_id] = (time.monotonic(), callback)
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name="order-tracker", daemon=True
+                    )
+                    self._thread.start()
+        if order is not None:
+            # The update beat the submit response back
+            self._call(order_id, callback, order)
+        else:
+            self._wake.set()
+
+    def handle_update(self, order: Dict):
+        """Apply an order update pushed by the broker."""
+        if order.get("status") not in TERMINAL_STATUSES:
+            return
+        order_id = order.get("id")
+        with self._lock:
+            entry = self._pending.pop(order_id, None)
+            if entry is None:
+                self._recent[order_id] = order
+                while len(self._recent) > _RECENT_UPDATES:
+                    self._recent.popitem(last=False)
+        if entry is not None:
+            self._call(order_id, entry[1], order)
+
+    def set_streaming(self, connected: bool):
+        """Record whether pushed updates are flowing; polling speeds up when they are not."""
+        self.streaming = connected
+        logger.info("📬 Trade update stream %s", "connected" if connected else "disconnected")
+        self._wake.set()
+
+    @property
+    def pending(self) -> int:
+        """Number of orders still being tracked."""
+        with self._lock:
+            return len(self._pending)
+
+    def _run(self):
+        """Poll until nothing is pending."""
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+                pending = dict(self._pending)
+
+            now = time.monotonic()
+            for order_id, (started, _) in pending.items():
+                if self.streaming and now - started < self.stream_poll_interval:
+                    # Still expected on the stream
+                    continue
+                try:
+                    order = get_order(order_id)
+                except Exception as e:
+                    # e.g. a network error: keep polling this and the other orders
+                    logger.error("❌ Error polling order %s: %s", order_id, e)
+                    order = None
+                if order is not None and order.get("status") in TERMINAL_STATUSES:
+                    self.handle_update(order)
+                elif now - started > self.timeout:
+                    self._give_up(order_id)
+
+            self._wake.wait(self.stream_poll_interval if self.streaming else self.poll_interval)
+            self._wake.clear()
+
+    def _give_up(self, order_id: str):
+        """Stop tracking an order that never reached a terminal status."""
+        logger.warning("⚠️ Gave up tracking order %s after %.0fs", order_id, self.timeout)
+        with self._lock:
+            self._pending.pop(order_id, None)
+
+    @staticmethod
+    def _call(order_id: str, callback: Callable[[Dict], None], order: Dict):
+        """Hand a finished order to its callback."""
+        try:
+            callback(order)
+        except Exception as e:
+            logger.error("❌ Order callback failed for %s: %s", order_id, e)
+
+
+class OrderManager:
+    """Nets a tick's intents per symbol and submits what passes the risk gate concurrently."""
+
+    def __init__(
+        self, workers: int = ORDER_WORKERS, tracker: Optional[OrderTracker] = None,
+        risk: Optional[RiskGate] = None,
+    ):
+        """Initialize the worker pool and tracker; `risk` None submits without risk checks."""
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="orders")
+        self.tracker = tracker or OrderTracker()
+        self.risk = risk
+
+    def _submit(self, symbol: str, net: float) -> Optional[Dict]:
+        """Submit one netted market order (rate limited at order priority by the client)."""
+        side = "buy" if net > 0 else "sell"
+        with span("submit_order", symbol=symbol, side=side), \
+                timed(ORDER_SUBMIT_SECONDS):
+            order = submit_market_order(symbol, abs(net), side=side)
+        ORDERS_TOTAL.labels(side=side, status="submitted" if order else "failed").inc()
+        return order
+
+    def submit_batch(
+        self,
+        intents: List[Intent],
+        prices: Optional[Dict[str, float]] = None,
+        on_fill: Optional[FillCallback] = None,
+        on_order: Optional[Callable[[Dict], None]] = None,
+    ) -> List[Dict]:
+        """Net and submit a tick's intents, returning one result per symbol.
+
+        Each result holds the symbol, its intents, the submitted order (None
+        when the intents netted to zero, were blocked or submission failed),
+        the fill price if already known and, for blocked orders, the risk
+        gate's reason under `blocked`. Intents of killed strategies are
+        blocked before netting. Symbols that net to zero are crossed
+        internally at `prices[symbol]`. `on_fill` is called per intent once
+        its price is known, and `on_order` with the final order for orders
+        still open on submission; both may run later on another thread.
+        """
+        prices = prices or {}
+        results = []
+        if self.risk is not None:
+            killed = [intent for intent in intents if self.risk.killed(intent[0])]
+            if killed:
+                intents = [intent for intent in intents if not self.risk.killed(intent[0])]
+                results.extend(self._blocked_killed(killed))
+
+        netted = net_intents(intents)
+        futures = {}
+        reserved_at = time.monotonic()
+        for symbol, entry in netted.items():
+            if entry["net"] == 0:
+                continue
+            if self.risk is not None:
+                entry["blocked"] = self.risk.check(symbol, entry["net"], prices.get(symbol))
+                if entry["blocked"]:
+                    ORDERS_TOTAL.labels(side="buy" if entry["net"] > 0 else "sell", status="blocked").inc()
+                    continue
+            futures[symbol] = self.pool.submit(self._submit, symbol, entry["net"])
+
+        for symbol, entry in netted.items():
+            if entry.get("blocked"):
+                order, price = None, None
+            elif entry["net"] == 0:
+                ORDERS_TOTAL.labels(side="none", status="netted").inc()
+                logger.info("⚖️ %d opposing intents for %s netted out", len(entry["intents"]), symbol)
+                order, price = None, prices.get(symbol)
+            else:
+                try:
+                    order = futures[symbol].result()
+                except Exception as e:
+                    # e.g. a network error or timeout; other symbols' orders still count
+                    logger.error("❌ Order submission failed for %s: %s", symbol, e)
+                    ORDERS_TOTAL.labels(side="buy" if entry["net"] > 0 else "sell", status="failed").inc()
+                    order = None
+                price = _fill_price(order)
+                self._release(symbol, entry["net"], order, prices.get(symbol), reserved_at)
+                if order and price is None and order.get("status") not in TERMINAL_STATUSES:
+                    self.tracker.track(
+                        order["id"], self._fill_handler(
+                            entry, on_fill, on_order, prices.get(symbol), reserved_at
+                        )
+                    )
+
+            if on_fill is not None and price is not None:
+                self._notify(entry["intents"], price, on_fill)
+            results.append({**entry, "order": order, "price": price})
+        return results
+
+    @staticmethod
+    def _blocked_killed(intents: List[Intent]) -> List[Dict]:
+        """Results for intents of killed strategies, one per symbol."""
+        results = []
+        for entry in net_intents(intents).values():
+            ORDERS_TOTAL.labels(side="none", status="blocked").inc()
+            logger.warning(
+                "🛑 Kill switch blocked %d intents for %s", len(entry["intents"]), entry["symbol"]
+            )
+            results.append({**entry, "order": None, "price": None, "blocked": "kill_switch"})
+        return results
+
+    def _release(
+        self, symbol: str, net: float, order: Optional[Dict],
+        price: Optional[float], reserved_at: float,
+    ):
+        """Give back the risk reservation of an order that failed or ended with quantity unfilled."""
+        if self.risk is None:
+            return
+        if order is None:
+            self.risk.release(symbol, net, price, reserved_at)
+        elif order.get("status") in UNFILLED_STATUSES:
+            unfilled = abs(net) - float(order.get("filled_qty") or 0)
+            if unfilled > 0:
+                self.risk.release(symbol, unfilled if net > 0 else -unfilled, price, reserved_at)
+
+    def _fill_handler(
+        self, entry: Dict, on_fill: Optional[FillCallback],
+        on_order: Optional[Callable[[Dict], None]],
+        price: Optional[float], reserved_at: float,
+    ):
+        """Build the tracker callback that reports a late fill or releases an unfilled order."""
+        intents = entry["intents"]
+
+        def handle(order: Dict):
+            self._release(entry["symbol"], entry["net"], order, price, reserved_at)
+            fill_price = _fill_price(order)
+            logger.info(
+                "📬 Order %s for %s %s @ %s", order.get("id"), order.get("symbol"),
+                order.get("status"), fill_price
+            )
+            if on_fill is not None and fill_price is not None:
+                self._notify(intents, fill_price, on_fill)
+            if on_order is not None:
+                on_order(order)
+        return handle
+
+    @staticmethod
+    def _notify(intents: List[Intent], price: float, on_fill: FillCallback):
+        """Report every contributing intent as filled at `price`."""
+        for strategy, symbol, side, qty in intents:
+            on_fill(strategy, symbol, side, qty, price)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_order_manager() -> OrderManager:
+    """Return the shared order manager."""
+    global _manager  # pylint: disable=global-statement
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = OrderManager(risk=get_risk_gate())
+    return _manager
+
+
+def start_fill_tracking(manager: Optional[OrderManager] = None):
+    """Feed broker order updates to the tracker.
+
+    The simulator delivers them in-process; Alpaca's trade update stream runs
+    in a background thread. Returns the stream, if one was started.
+    """
+    tracker = (manager or get_order_manager()).tracker
+    broker = get_alpaca()
+    if hasattr(broker, "subscribe_trade_updates"):
+        broker.subscribe_trade_updates(tracker.handle_update)
+        tracker.set_streaming(True)
+        return None
+
+    from core.clients.trade_update_stream import TradeUpdateStream  # pylint: disable=import-outside-toplevel
+
+    stream = TradeUpdateStream()
+    threading.Thread(
+        target=lambda: asyncio.run(stream.run(tracker.handle_update, tracker.set_streaming)),
+        name="trade-updates",
+        daemon=True,
+    ).start()
+    return stream
@@ -0,0 +1,332 @@
+"""
+Multi-strategy portfolio engine.
+
+Runs every active strategy (`StrategyControl.is_active`) side by side. Market
+data is fetched once per symbol per tick into a shared snapshot covering every
+strategy's timeframe and lookback, and each strategy keeps its own virtual book
+and performance stream so strategies can be compared without switching.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.clients.alpaca_trading_client import broker_deadline
+from core.clients.rate_limiter import RateBudgetExceeded
+from core.clients.redis_messaging_client import redis_client
+from core.database.trading_models import ExecutedTrade, StrategyControl, StrategyPerformance
+from core.market_data.multi_timeframe import fetch_timeframes
+from core.monitoring.metrics import (
+    BAR_FETCH_SECONDS, SIGNALS_TOTAL, STRATEGY_EVAL_SECONDS, span, timed
+)
+from services.trading.position_ledger import PositionLedger, fill_position, get_position_ledger
+from services.trading.strategy_manager import get_strategy
+from services.trading.tick_budget import (
+    EVALUATION_RESERVE, TICK_BUDGET_SECONDS, TickDeadline, TickReport
+)
+
+logger = logging.getLogger(__name__)
+
+# Notional capital each strategy's virtual book starts with
+VIRTUAL_BOOK_CAPITAL = float(os.getenv("VIRTUAL_BOOK_CAPITAL", "100000"))
+
+# (strategy, symbol, side, qty)
+Intent = Tuple[str, str, str, float]
+
+# scanner(symbols, strategies, deadline, report) -> (intents, prices)
+Scanner = Callable[[List[str], Dict[str, object], TickDeadline, TickReport],
+                   Tuple[List[Intent], Dict[str, float]]]
+
+# Symbols fetched concurrently (each request still takes a broker rate-limit token)
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "4"))
+
+
+class VirtualBook:
+    """Cash, positions and realized PnL attributed to a single strategy."""
+
+    def __init__(self, strategy: str, capital: float = VIRTUAL_BOOK_CAPITAL):
+        """Initialize an empty book."""
+        self.strategy = strategy
+        self.cash = capital
+        self.realized_pnl = 0.0
+        # symbol -> [qty, avg_price]
+        self.positions: Dict[str, List[float]] = {}
+        self.last_prices: Dict[str, float] = {}
+
+    def apply_fill(self, symbol: str, side: str, qty: float, price: float):
+        """Update cash, position and realized PnL for a fill."""
+        signed = qty if side == "buy" else -qty
+        held, avg = self.positions.get(symbol, (0.0, 0.0))
+        self.cash -= signed * price
+        new_qty, new_avg, realized = fill_position(held, avg, signed, price)
+        self.realized_pnl += realized
+        if new_qty:
+            self.positions[symbol] = [new_qty, new_avg]
+        else:
+            self.positions.pop(symbol, None)
+        self.last_prices[symbol] = price
+
+    def mark(self, prices: Dict[str, float]):
+        """Record the latest prices used for valuation."""
+        self.last_prices.update(prices)
+
+    @property
+    def unrealized_pnl(self) -> float:
+        """Open PnL at the last marked prices."""
+        return sum(
+            (self.last_prices.get(symbol, avg) - avg) * qty
+            for symbol, (qty, avg) in self.positions.items()
+        )
+
+    @property
+    def equity(self) -> float:
+        """Cash plus marked value of open positions."""
+        return self.cash + sum(
+            self.last_prices.get(symbol, avg) * qty
+            for symbol, (qty, avg) in self.positions.items()
+        )
+
+
+def active_strategy_names(db) -> List[str]:
+    """Registry names of strategies marked active in StrategyControl."""
+    return [row.name for row in db.query(StrategyControl).filter_by(is_active=True).all()]
+
+
+class PortfolioEngine:
+    """Evaluates N strategies over one shared market-data snapshot per tick."""
+
+    def __init__(self, ledger: Optional[PositionLedger] = None):
+        """Initialize with no books; they are rebuilt from trade history on first use.
+
+        Fills and prices are also fed to `ledger` (the shared position ledger by default).
+        """
+        self.books: Dict[str, VirtualBook] = {}
+        self.ledger = ledger or get_position_ledger()
+        # Fills may arrive from the order tracker thread
+        self._lock = threading.RLock()
+        self.pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="fetch")
+        self.last_report: Optional[TickReport] = None
+
+    def _book(self, db, strategy_name: str) -> VirtualBook:
+        """Get a strategy's book, replaying its stored trades the first time."""
+        with self._lock:
+            book = self.books.get(strategy_name)
+            if book is not None:
+                return book
+            book = VirtualBook(strategy_name)
+            trades = (
+                db.query(ExecutedTrade)
+                .filter_by(strategy=strategy_name)
+                .order_by(ExecutedTrade.created_at)
+                .all()
+            )
+            for trade in trades:
+                if trade.price:
+                    book.apply_fill(trade.symbol, trade.action, trade.qty or 1, trade.price)
+            self.books[strategy_name] = book
+            return book
+
+    def on_fill(self, strategy_name: str, symbol: str, side: str, qty: float, price: float):
+        """Apply a fill to the strategy's book and the position ledger."""
+        with self._lock:
+            book = self.books.get(strategy_name)
+            if book is not None:
+                book.apply_fill(symbol, side, qty, price)
+        self.ledger.apply_fill(strategy_name, symbol, side, qty, price)
+
+    @staticmethod
+    def resolve_strategies(db, fallback) -> Dict[str, object]:
+        """Active strategies by class name, or the bot's current strategy if none are active."""
+        names = active_strategy_names(db)
+        strategies = [get_strategy(name) for name in names] or [fallback]
+        return {strategy.__class__.__name__: strategy for strategy in strategies}
+
+    @staticmethod
+    def requirements(strategies: Dict[str, object]) -> Dict[str, int]:
+        """Longest lookback needed per timeframe across all strategies."""
+        needs: Dict[str, int] = {}
+        for strategy in strategies.values():
+            needs[strategy.timeframe] = max(needs.get(strategy.timeframe, 0), strategy.lookback)
+        return needs
+
+    def held_symbols(self) -> List[str]:
+        """Symbols with an open position in any book."""
+        with self._lock:
+            return sorted({symbol for book in self.books.values() for symbol in book.positions})
+
+    def prioritize(self, symbols: List[str]) -> List[str]:
+        """Symbols held by any book first (their exits matter most), then universe order."""
+        held = set(self.held_symbols())
+        return sorted(symbols, key=lambda symbol: symbol not in held)
+
+    @staticmethod
+    def _fetch(symbol: str, needs: Dict[str, int], cutoff: float) -> Dict[str, List[Dict]]:
+        """Fetch one symbol's bars for all timeframes (runs in a worker thread).
+
+        Broker calls give up once monotonic time `cutoff` passes, so a fetch
+        outliving its tick frees its worker and takes no more rate tokens.
+        """
+        with span("fetch_bars", symbol=symbol), timed(BAR_FETCH_SECONDS), \
+                broker_deadline(cutoff):
+            return fetch_timeframes(symbol, needs)
+
+    def fetch_snapshot(
+        self, symbols: List[str], needs: Dict[str, int],
+        deadline: TickDeadline, report: TickReport,
+    ) -> Dict[str, Dict[str, List[Dict]]]:
+        """Fetch every symbol's bars once for all timeframes in `needs`, in priority order.
+
+        Once only the evaluation reserve of the budget is left, queued fetches
+        are cancelled ("deadline") and running ones are left to stop at their
+        next broker call ("deadline_running"); both symbols are skipped.
+        """
+        remaining = deadline.remaining(reserve=EVALUATION_RESERVE)
+        cutoff = time.monotonic() + remaining
+        futures = {symbol: self.pool.submit(self._fetch, symbol, needs, cutoff) for symbol in symbols}
+        wait(futures.values(), timeout=remaining)
+
+        snapshot = {}
+        for symbol, future in futures.items():
+            if not future.done():
+                report.skip(symbol, "deadline" if future.cancel() else "deadline_running")
+            elif isinstance(future.exception(), RateBudgetExceeded):
+                report.skip(symbol, "deadline")
+            elif future.exception() is not None:
+                logger.error("❌ Error fetching bars for %s: %s", symbol, future.exception())
+                report.skip(symbol, "fetch_error")
+            else:
+                snapshot[symbol] = future.result()
+        return snapshot
+
+    @staticmethod
+    def evaluate(
+        strategies: Dict[str, object], snapshot: Dict[str, Dict[str, List[Dict]]],
+        deadline: TickDeadline, report: TickReport,
+    ) -> List[Intent]:
+        """Evaluate every strategy on every symbol; return (strategy, symbol, side, qty) intents.
+
+        Symbols are taken in snapshot (priority) order until the deadline.
+        """
+        intents = []
+        for symbol, frames in snapshot.items():
+            if deadline.expired:
+                report.skip(symbol, "deadline")
+                continue
+            evaluated = False
+            for name, strategy in strategies.items():
+                bars = frames.get(strategy.timeframe, [])[-strategy.lookback:]
+                if len(bars) < strategy.lookback:
+                    continue
+                try:
+                    with span("evaluate", symbol=symbol, strategy=name), \
+                            timed(STRATEGY_EVAL_SECONDS, strategy=name):
+                        signal = strategy.evaluate(bars)
+                except Exception as e:
+                    logger.error("❌ Error evaluating %s for %s: %s", name, symbol, e)
+                    continue
+                evaluated = True
+                SIGNALS_TOTAL.labels(strategy=name, signal=signal).inc()
+                if signal in ["buy", "sell"]:
+                    intents.append((name, symbol, signal, 1))
+            if evaluated:
+                report.complete(symbol)
+            else:
+                report.skip(symbol, "no_data")
+        return intents
+
+    def scan(
+        self, symbols: List[str], strategies: Dict[str, object],
+        deadline: TickDeadline, report: TickReport,
+    ) -> Tuple[List[Intent], Dict[str, float]]:
+        """Fetch and evaluate `symbols` (in the given order) in this process.
+
+        Returns the intents and the latest close per fetched symbol.
+        """
+        snapshot = self.fetch_snapshot(symbols, self.requirements(strategies), deadline, report)
+        prices = {
+            symbol: float(bars[-1]["close"])
+            for symbol, frames in snapshot.items()
+            for bars in frames.values() if bars
+        }
+        return self.evaluate(strategies, snapshot, deadline, report), prices
+
+    def record_performance(self, db, strategies: Dict[str, object], prices: Dict[str, float]):
+        """Mark the ledger and each strategy's book and append to its performance stream."""
+        self.ledger.mark(prices)
+        for name in strategies:
+            with self._lock:
+                book = self._book(db, name)
+                book.mark(prices)
+                equity, realized, unrealized = book.equity, book.realized_pnl, book.unrealized_pnl
+            db.add(StrategyPerformance(strategy=name, portfolio_value=equity))
+            redis_client.publish_performance(
+                strategy=name,
+                equity=equity,
+                realized_pnl=realized,
+                unrealized_pnl=unrealized,
+                timestamp=datetime.now().isoformat(),
+            )
+
+    def run_tick(
+        self, db, symbols: List[str], fallback_strategy, execute,
+        due: Optional[Callable[[object], bool]] = None,
+        budget: float = TICK_BUDGET_SECONDS,
+        scanner: Optional[Scanner] = None,
+        screen: Optional[Callable[[List[str]], List[str]]] = None,
+    ) -> Optional[TickReport]:
+        """Fetch once, evaluate all strategies, execute intents and record performance.
+
+        `execute(db, intents, prices, on_fill)` nets and submits the whole
+        tick's intents at once and reports fills back through `on_fill`.
+        When `due` is given, only strategies for which it returns True run;
+        returns None if none do. Fetching and evaluation stop at `budget`
+        seconds; orders for signals already produced are still submitted.
+        `scanner` replaces the in-process fetch-and-evaluate stage (see
+        `scan`), e.g. to spread it over shard workers. `screen(held)`, when
+        given, replaces `symbols` with this tick's candidates.
+        """
+        strategies = self.resolve_strategies(db, fallback_strategy)
+        if due is not None:
+            strategies = {name: s for name, s in strategies.items() if due(s)}
+            if not strategies:
+                return None
+        deadline = TickDeadline(budget)
+        report = TickReport(deadline, list(strategies))
+        logger.info("🧠 Running %d strategies: %s", len(strategies), ", ".join(strategies))
+        # Load books before this tick's trades are added to the session
+        for name in strategies:
+            self._book(db, name)
+        if screen is not None:
+            symbols = screen(self.held_symbols())
+
+        scan = scanner or self.scan
+        intents, prices = scan(self.prioritize(symbols), strategies, deadline, report)
+        report.intents = len(intents)
+        if intents:
+            try:
+                execute(db, intents, prices, self.on_fill)
+            except Exception as e:
+                logger.error("❌ Error executing %d intents: %s", len(intents), e)
+
+        with span("record_performance"):
+            self.record_performance(db, strategies, prices)
+        report.log()
+        self.last_report = report
+        return report
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_portfolio_engine() -> PortfolioEngine:
+    """Return the shared portfolio engine."""
+    global _engine  # pylint: disable=global-statement
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = PortfolioEngine()
+    return _engine
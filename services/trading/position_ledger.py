@@ -0,0 +1,286 @@
+"""
+Live position ledger: exposure and PnL per symbol, per strategy and in total.
+
+The ledger is updated in place by fills and price marks instead of being
+recomputed from positions, so every total it holds is current after each
+update and a read is a dictionary lookup. A fill or a price change for one
+symbol only touches that symbol's totals and the strategies holding it.
+
+Snapshots go to Redis at most once per LEDGER_PUBLISH_INTERVAL: the latest
+one is stored under `portfolio:snapshot` for the API and published on
+`trading_events` for the WebSocket service. Updates between publishes are
+coalesced into the next one, so a burst of fills costs a single publish.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+
+from core.clients.redis_messaging_client import redis_client
+from core.database.trading_models import ExecutedTrade
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between snapshots published to Redis
+LEDGER_PUBLISH_INTERVAL = float(os.getenv("LEDGER_PUBLISH_INTERVAL", "1"))
+
+
+def fill_position(qty: float, avg: float, signed: float, price: float) -> Tuple[float, float, float]:
+    """Apply a signed fill to a position; return its new (qty, avg price) and the PnL it realized."""
+    if qty == 0 or (qty > 0) == (signed > 0):
+        # Opening or adding: blend the average price
+        new_qty = qty + signed
+        return new_qty, (avg * qty + price * signed) / new_qty, 0.0
+    closed = min(abs(signed), abs(qty))
+    realized = (price - avg) * closed * (1 if qty > 0 else -1)
+    new_qty = qty + signed
+    if new_qty == 0:
+        return 0.0, 0.0, realized
+    if (new_qty > 0) != (qty > 0):
+        # Flipped through flat: the remainder opens at this price
+        return new_qty, price, realized
+    return new_qty, avg, realized
+
+
+class StrategyTotals:
+    """Running totals of one strategy's positions."""
+
+    __slots__ = ("realized_pnl", "market_value", "cost", "gross_exposure", "positions")
+
+    def __init__(self):
+        """Start flat."""
+        self.realized_pnl = 0.0
+        # Signed sum of qty * price, and of qty * avg price, over open positions
+        self.market_value = 0.0
+        self.cost = 0.0
+        self.gross_exposure = 0.0
+        self.positions = 0
+
+    @property
+    def unrealized_pnl(self) -> float:
+        """Open PnL at the last marked prices."""
+        return self.market_value - self.cost
+
+
+class PositionLedger:
+    """Per (strategy, symbol) positions with incrementally maintained exposure and PnL.
+
+    Symbol-level figures net every strategy's position in the symbol, as the
+    account holds it after order netting; strategy-level figures are each
+    strategy's own book.
+    """
+
+    def __init__(self, publish_interval: float = LEDGER_PUBLISH_INTERVAL, publish=None):
+        """Initialize flat; `publish(snapshot)` defaults to `redis_client.publish_portfolio`."""
+        self.publish_interval = publish_interval
+        self._publish = publish or redis_client.publish_portfolio
+        self._lock = threading.RLock()
+        self._last_publish = 0.0
+        self._timer: Optional[threading.Timer] = None
+        self._reset()
+
+    def _reset(self):
+        """Drop every position and total."""
+        # (strategy, symbol) -> [qty, avg_price]
+        self.positions: Dict[Tuple[str, str], list] = {}
+        self.holders: Dict[str, Set[str]] = {}
+        self.prices: Dict[str, float] = {}
+        self.strategies: Dict[str, StrategyTotals] = {}
+        # symbol -> [net qty, net cost]
+        self.symbols: Dict[str, list] = {}
+        self.realized_pnl = 0.0
+        self.long_exposure = 0.0
+        self.short_exposure = 0.0
+        self.unrealized_pnl = 0.0
+
+    # ---------- Updates ----------
+
+    def _price(self, symbol: str) -> float:
+        """Last price of a symbol, or its average cost if it was never marked."""
+        price = self.prices.get(symbol)
+        if price is None:
+            qty, cost = self.symbols.get(symbol, (0.0, 0.0))
+            price = cost / qty if qty else 0.0
+        return price
+
+    def _apply_symbol(self, symbol: str, sign: float):
+        """Add (sign=1) or remove (sign=-1) a symbol's contribution to every running total."""
+        price = self._price(symbol)
+        qty, cost = self.symbols.get(symbol, (0.0, 0.0))
+        value = qty * price
+        if value > 0:
+            self.long_exposure += sign * value
+        else:
+            self.short_exposure -= sign * value
+        self.unrealized_pnl += sign * (value - cost)
+        for strategy in self.holders.get(symbol, ()):
+            held, avg = self.positions[(strategy, symbol)]
+            totals = self.strategies[strategy]
+            totals.market_value += sign * held * price
+            totals.cost += sign * held * avg
+            totals.gross_exposure += sign * abs(held * price)
+
+    def _fill(self, strategy: str, symbol: str, side: str, qty: float, price: float):
+        """Apply a fill to the position and every total it touches (the caller holds the lock)."""
+        self._apply_symbol(symbol, -1)
+        totals = self.strategies.setdefault(strategy, StrategyTotals())
+        held, avg = self.positions.get((strategy, symbol), (0.0, 0.0))
+        new_qty, new_avg, realized = fill_position(held, avg, qty if side == "buy" else -qty, price)
+        totals.realized_pnl += realized
+        self.realized_pnl += realized
+
+        net = self.symbols.setdefault(symbol, [0.0, 0.0])
+        net[0] += new_qty - held
+        net[1] += new_qty * new_avg - held * avg
+        holders = self.holders.setdefault(symbol, set())
+        if new_qty:
+            if not held:
+                totals.positions += 1
+            self.positions[(strategy, symbol)] = [new_qty, new_avg]
+            holders.add(strategy)
+        else:
+            if held:
+                totals.positions -= 1
+            self.positions.pop((strategy, symbol), None)
+            holders.discard(strategy)
+        if not holders:
+            del self.holders[symbol]
+            del self.symbols[symbol]
+
+        self.prices[symbol] = price
+        self._apply_symbol(symbol, 1)
+
+    def apply_fill(self, strategy: str, symbol: str, side: str, qty: float, price: float):
+        """Apply one strategy's fill and mark the symbol at the fill price."""
+        with self._lock:
+            self._fill(strategy, symbol, side, qty, price)
+        self._changed()
+
+    def mark(self, prices: Dict[str, float]):
+        """Revalue positions at new prices; symbols without a position only record the price."""
+        with self._lock:
+            for symbol, price in prices.items():
+                if symbol not in self.symbols:
+                    self.prices[symbol] = price
+                    continue
+                self._apply_symbol(symbol, -1)
+                self.prices[symbol] = price
+                self._apply_symbol(symbol, 1)
+        self._changed()
+
+    def load(self, db):
+        """Rebuild from every stored trade with a known price, oldest first."""
+        trades = (
+            db.query(ExecutedTrade)
+            .filter(ExecutedTrade.price > 0)
+            .order_by(ExecutedTrade.created_at)
+            .all()
+        )
+        with self._lock:
+            self._reset()
+            for trade in trades:
+                self._fill(trade.strategy, trade.symbol, trade.action, trade.qty or 1, trade.price)
+        logger.info(
+            "📒 Position ledger loaded from %d trades: %d open positions",
+            len(trades), len(self.positions)
+        )
+        self._changed()
+
+    # ---------- Reads ----------
+
+    def exposure(self, symbol: str) -> float:
+        """Signed market value of the net position in a symbol."""
+        with self._lock:
+            qty = self.symbols.get(symbol, (0.0, 0.0))[0]
+            return qty * self._price(symbol) if qty else 0.0
+
+    def strategy_totals(self, strategy: str) -> StrategyTotals:
+        """A strategy's running totals (flat if it never traded)."""
+        with self._lock:
+            return self.strategies.get(strategy) or StrategyTotals()
+
+    @property
+    def gross_exposure(self) -> float:
+        """Long plus short market value."""
+        return self.long_exposure + self.short_exposure
+
+    @property
+    def net_exposure(self) -> float:
+        """Long minus short market value."""
+        return self.long_exposure - self.short_exposure
+
+    def snapshot(self) -> Dict:
+        """Totals, symbols and strategies as a JSON-ready dict."""
+        with self._lock:
+            symbols = {}
+            for symbol, (qty, cost) in self.symbols.items():
+                price = self._price(symbol)
+                symbols[symbol] = {
+                    "qty": qty,
+                    "avg_price": cost / qty if qty else 0.0,
+                    "price": price,
+                    "exposure": qty * price,
+                    "unrealized_pnl": qty * price - cost,
+                    "strategies": sorted(self.holders.get(symbol, ())),
+                }
+            strategies = {
+                name: {
+                    "realized_pnl": totals.realized_pnl,
+                    "unrealized_pnl": totals.unrealized_pnl,
+                    "net_exposure": totals.market_value,
+                    "gross_exposure": totals.gross_exposure,
+                    "positions": totals.positions,
+                }
+                for name, totals in self.strategies.items()
+            }
+            return {
+                "realized_pnl": self.realized_pnl,
+                "unrealized_pnl": self.unrealized_pnl,
+                "total_pnl": self.realized_pnl + self.unrealized_pnl,
+                "long_exposure": self.long_exposure,
+                "short_exposure": self.short_exposure,
+                "gross_exposure": self.gross_exposure,
+                "net_exposure": self.net_exposure,
+                "symbols": symbols,
+                "strategies": strategies,
+                "timestamp": datetime.now().isoformat(),
+            }
+
+    # ---------- Publishing ----------
+
+    def _changed(self):
+        """Publish now, or schedule one publish at the end of the current interval."""
+        with self._lock:
+            if self._timer is not None:
+                return
+            delay = self._last_publish + self.publish_interval - time.monotonic()
+            if delay > 0:
+                self._timer = threading.Timer(delay, self.publish)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+            self._last_publish = time.monotonic()
+        self._publish(self.snapshot())
+
+    def publish(self):
+        """Publish the current snapshot immediately."""
+        with self._lock:
+            self._timer = None
+            self._last_publish = time.monotonic()
+        self._publish(self.snapshot())
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_position_ledger() -> PositionLedger:
+    """Return the shared position ledger (empty until `load` is called)."""
+    global _ledger  # pylint: disable=global-statement
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = PositionLedger()
+    return _ledger
@@ -0,0 +1,281 @@
+"""
+Pre-trade risk checks.
+
+Every order the order manager submits first passes the risk gate: strategy
+kill switches, order notional, position size and notional, concentration
+(share of account equity), buying power and orders per minute. The checks
+read a local copy of the account and positions that a background thread
+refreshes from the broker every RISK_SYNC_INTERVAL seconds and that each
+accepted order adjusts immediately, so a check is a few dictionary lookups
+and never a broker round trip.
+
+Orders that only shrink a position skip the exposure checks, so exits are
+never blocked by the limits they bring the account back under. A limit of 0
+is disabled.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Set
+
+from core.clients.alpaca_trading_client import get_account, get_positions
+from core.clients.redis_messaging_client import redis_client
+from core.monitoring.metrics import RISK_REJECTIONS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+RISK_ENABLED = os.getenv("RISK_ENABLED", "true").lower() in ("1", "true", "yes")
+# Largest absolute position, in shares, per symbol
+RISK_MAX_POSITION_QTY = float(os.getenv("RISK_MAX_POSITION_QTY", "0"))
+# Largest absolute position value per symbol
+RISK_MAX_POSITION_NOTIONAL = float(os.getenv("RISK_MAX_POSITION_NOTIONAL", "0"))
+# Largest single order value
+RISK_MAX_ORDER_NOTIONAL = float(os.getenv("RISK_MAX_ORDER_NOTIONAL", "0"))
+# Largest position value per symbol as a fraction of account equity (e.g. 0.2)
+RISK_MAX_CONCENTRATION = float(os.getenv("RISK_MAX_CONCENTRATION", "0"))
+RISK_MAX_ORDERS_PER_MINUTE = int(os.getenv("RISK_MAX_ORDERS_PER_MINUTE", "0"))
+# Strategies (class names) whose orders are always blocked, comma separated
+RISK_KILLED_STRATEGIES = os.getenv("RISK_KILLED_STRATEGIES", "")
+# Seconds between account/position refreshes from the broker
+RISK_SYNC_INTERVAL = float(os.getenv("RISK_SYNC_INTERVAL", "15"))
+
+
+class RiskLimits:
+    """Configured limits; 0 disables a limit."""
+
+    def __init__(
+        self,
+        max_position_qty: float = RISK_MAX_POSITION_QTY,
+        max_position_notional: float = RISK_MAX_POSITION_NOTIONAL,
+        max_order_notional: float = RISK_MAX_ORDER_NOTIONAL,
+        max_concentration: float = RISK_MAX_CONCENTRATION,
+        max_orders_per_minute: int = RISK_MAX_ORDERS_PER_MINUTE,
+        killed: Iterable[str] = (),
+    ):
+        """Set the limits and the strategies killed by configuration."""
+        self.max_position_qty = max_position_qty
+        self.max_position_notional = max_position_notional
+        self.max_order_notional = max_order_notional
+        self.max_concentration = max_concentration
+        self.max_orders_per_minute = max_orders_per_minute
+        self.killed = {name.strip() for name in killed if name.strip()}
+
+    def as_dict(self) -> Dict:
+        """Limits for display."""
+        return {
+            "max_position_qty": self.max_position_qty,
+            "max_position_notional": self.max_position_notional,
+            "max_order_notional": self.max_order_notional,
+            "max_concentration": self.max_concentration,
+            "max_orders_per_minute": self.max_orders_per_minute,
+            "killed_strategies": sorted(self.killed),
+        }
+
+
+class AccountCache:
+    """Account, positions and kill switches as last synced, plus orders accepted since."""
+
+    def __init__(self, interval: float = RISK_SYNC_INTERVAL):
+        """Initialize unsynced; `start` runs the first sync and the background refresher."""
+        self.interval = interval
+        self.equity: Optional[float] = None
+        self.buying_power: Optional[float] = None
+        self.trading_blocked = False
+        # symbol -> signed qty
+        self.positions: Dict[str, float] = {}
+        self.prices: Dict[str, float] = {}
+        # Strategies killed at runtime (Redis), on top of the configured ones
+        self.killed: Set[str] = set()
+        self.synced_at: Optional[float] = None
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> bool:
+        """Replace the cached state with the broker's; False (state kept) if a read fails."""
+        account = get_account()
+        positions = get_positions(strict=True) if account is not None else None
+        if positions is None:
+            logger.warning("⚠️ Risk cache refresh failed; keeping state from the last sync")
+            return False
+        killed = redis_client.killed_strategies()
+        with self.lock:
+            self.equity = float(account.equity)
+            self.buying_power = float(account.buying_power)
+            self.trading_blocked = bool(getattr(account, "trading_blocked", False))
+            self.positions = {p["symbol"]: float(p["qty"]) for p in positions}
+            self.prices.update(
+                {p["symbol"]: float(p["current_price"]) for p in positions if p.get("current_price")}
+            )
+            if killed is not None:
+                self.killed = killed
+            self.synced_at = time.monotonic()
+        return True
+
+    def _run(self):
+        """Refresh every `interval` seconds until stopped."""
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error("❌ Risk cache refresh error: %s", e)
+
+    def start(self, background: bool = True):
+        """Sync once now, then (with `background`) keep syncing in a background thread."""
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error("❌ Initial risk cache refresh error: %s", e)
+        if not background:
+            return
+        self._thread = threading.Thread(target=self._run, name="risk-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background refresher."""
+        self._stop.set()
+
+
+class RiskGate:
+    """Checks orders against the limits using only the cached account state."""
+
+    def __init__(self, limits: Optional[RiskLimits] = None, cache: Optional[AccountCache] = None):
+        """Use the configured limits and a fresh (unstarted) cache by default."""
+        self.limits = limits or RiskLimits(killed=RISK_KILLED_STRATEGIES.split(","))
+        self.cache = cache or AccountCache()
+        self._orders: Deque[float] = deque()
+
+    def killed(self, strategy: str) -> bool:
+        """Whether a strategy's orders are blocked by a kill switch."""
+        return strategy in self.limits.killed or strategy in self.cache.killed
+
+    def _reject(self, symbol: str, qty: float, reason: str, detail: str) -> str:
+        """Count and log a rejection; return its reason."""
+        RISK_REJECTIONS_TOTAL.labels(reason=reason).inc()
+        logger.warning("🛑 Risk check blocked %+g %s: %s", qty, symbol, detail)
+        return reason
+
+    def check(self, symbol: str, qty: float, price: Optional[float] = None) -> Optional[str]:
+        """Check a signed order quantity; return the rejection reason, or None and reserve it.
+
+        Notional checks use `price`, else the last cached price, and are
+        skipped when neither is known. Account checks are skipped until the
+        first sync.
+        """
+        limits, cache = self.limits, self.cache
+        now = time.monotonic()
+        with cache.lock:
+            if cache.trading_blocked:
+                return self._reject(symbol, qty, "trading_blocked", "account trading is blocked")
+            if limits.max_orders_per_minute:
+                while self._orders and now - self._orders[0] > 60.0:
+                    self._orders.popleft()
+                if len(self._orders) >= limits.max_orders_per_minute:
+                    return self._reject(
+                        symbol, qty, "order_rate",
+                        f"{limits.max_orders_per_minute} orders in the last minute"
+                    )
+
+            price = price or cache.prices.get(symbol)
+            held = cache.positions.get(symbol, 0.0)
+            after = held + qty
+            if abs(after) > abs(held):
+                reason = self._exposure_reason(symbol, qty, after, price)
+                if reason:
+                    return self._reject(symbol, qty, *reason)
+
+            if limits.max_orders_per_minute:
+                self._orders.append(now)
+            cache.positions[symbol] = after
+            if price:
+                cache.prices[symbol] = price
+                if abs(after) > abs(held) and cache.buying_power is not None:
+                    cache.buying_power -= (abs(after) - abs(held)) * price
+        return None
+
+    def _exposure_reason(self, symbol: str, qty: float, after: float, price: Optional[float]):
+        """(reason, detail) if an order growing a position to `after` breaks a limit."""
+        limits, cache = self.limits, self.cache
+        if limits.max_position_qty and abs(after) > limits.max_position_qty:
+            return "position_qty", f"position {after:g} over {limits.max_position_qty:g} shares"
+        if not price:
+            return None
+        notional = abs(qty) * price
+        if limits.max_order_notional and notional > limits.max_order_notional:
+            return "order_notional", f"order ${notional:,.0f} over ${limits.max_order_notional:,.0f}"
+        exposure = abs(after) * price
+        if limits.max_position_notional and exposure > limits.max_position_notional:
+            return "position_notional", (
+                f"{symbol} exposure ${exposure:,.0f} over ${limits.max_position_notional:,.0f}"
+            )
+        if limits.max_concentration and cache.equity and exposure > limits.max_concentration * cache.equity:
+            return "concentration", (
+                f"{symbol} would be {exposure / cache.equity:.0%} of equity "
+                f"(max {limits.max_concentration:.0%})"
+            )
+        if cache.buying_power is not None and notional > cache.buying_power:
+            return "buying_power", f"order ${notional:,.0f} over buying power ${cache.buying_power:,.0f}"
+        return None
+
+    def release(
+        self, symbol: str, qty: float, price: Optional[float] = None,
+        reserved_at: Optional[float] = None,
+    ):
+        """Undo what `check` reserved for `qty` of an order that failed or ended unfilled.
+
+        Frees its order-rate slot (if it could still be in the window), its
+        position and the buying power it took. `reserved_at` (monotonic time
+        of the check) skips the position and buying power when a sync since
+        has replaced them with the broker's state.
+        """
+        cache = self.cache
+        now = time.monotonic()
+        with cache.lock:
+            if self._orders and (reserved_at is None or now - reserved_at <= 60.0):
+                self._orders.pop()
+            if reserved_at is not None and cache.synced_at is not None and cache.synced_at > reserved_at:
+                return
+            after = cache.positions.get(symbol, 0.0)
+            held = after - qty
+            cache.positions[symbol] = held
+            price = price or cache.prices.get(symbol)
+            if price and abs(after) > abs(held) and cache.buying_power is not None:
+                cache.buying_power += (abs(after) - abs(held)) * price
+
+    def status(self) -> Dict:
+        """Limits and cached state for display."""
+        cache = self.cache
+        with cache.lock:
+            return {
+                **self.limits.as_dict(),
+                "killed_strategies": sorted(self.limits.killed | cache.killed),
+                "equity": cache.equity,
+                "buying_power": cache.buying_power,
+                "trading_blocked": cache.trading_blocked,
+                "synced": cache.synced_at is not None,
+            }
+
+
+_gate = None
+_gate_lock = threading.Lock()
+
+
+def get_risk_gate(background: bool = True) -> Optional[RiskGate]:
+    """Return the shared risk gate, syncing its account on first use; None if disabled.
+
+    With `background` (the trading service) the first call also starts the
+    refresher thread; without it (the API) the caller refreshes the cache
+    before relying on it. The process's first call decides.
+    """
+    global _gate  # pylint: disable=global-statement
+    if not RISK_ENABLED:
+        return None
+    if _gate is None:
+        with _gate_lock:
+            if _gate is None:
+                gate = RiskGate()
+                gate.cache.start(background)
+                _gate = gate
+    return _gate
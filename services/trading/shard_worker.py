@@ -0,0 +1,166 @@
+"""
+Shard worker: fetches and evaluates the symbols the orchestrator assigns it.
+
+Each worker heartbeats into Redis so the orchestrator's hash ring includes
+it, then takes shard tasks from its own queue. Bars are cached in the worker
+process, so the same symbols returning each tick are cheap to refresh.
+Deadlines are passed as epoch seconds, so worker clocks should be in sync.
+
+Usage:
+    python -m services.trading.shard_worker --id worker-1
+    python -m services.trading.shard_worker --processes 4   # local multi-process run
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from typing import Dict, Optional
+
+from core.clients.redis_messaging_client import redis_client
+from core.codec import dumps, loads
+from core.monitoring.logging_setup import configure_logging
+from services.trading.portfolio_engine import PortfolioEngine
+from services.trading.sharding import WORKER_TTL_SECONDS, WORKERS_KEY, queue_key, results_key
+from services.trading.strategy_manager import STRATEGY_CLASSES
+from services.trading.tick_budget import TickDeadline, TickReport
+
+logger = logging.getLogger(__name__)
+
+# Strategies travel by class name, the name their books and trades use
+STRATEGIES_BY_CLASS = {cls.__name__: cls for cls in STRATEGY_CLASSES.values()}
+
+# Results nobody collects (orchestrator gone) expire after this many seconds
+RESULT_TTL_SECONDS = 60
+
+
+class ShardWorker:
+    """Consumes shard tasks from Redis and pushes back intents and prices."""
+
+    def __init__(self, worker_id: Optional[str] = None, redis=None):
+        """Initialize the worker; nothing connects until `run`."""
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self._redis = redis
+        self.engine = PortfolioEngine()
+        self._stopped = threading.Event()
+
+    @property
+    def redis(self):
+        """Redis connection (the shared client unless one was given)."""
+        return self._redis or redis_client.redis
+
+    def heartbeat(self):
+        """Mark this worker alive."""
+        self.redis.zadd(WORKERS_KEY, {self.worker_id: time.time()})
+
+    def _heartbeat_loop(self):
+        """Heartbeat well within the TTL until stopped."""
+        while not self._stopped.wait(WORKER_TTL_SECONDS / 3):
+            try:
+                self.heartbeat()
+            except Exception as e:
+                logger.error("❌ Heartbeat failed for %s: %s", self.worker_id, e)
+
+    def handle(self, task: Dict) -> Dict:
+        """Fetch and evaluate one shard before the task's deadline."""
+        strategies = {
+            name: STRATEGIES_BY_CLASS[name]()
+            for name in task["strategies"] if name in STRATEGIES_BY_CLASS
+        }
+        deadline = TickDeadline(max(0.0, task["deadline"] - time.time()))
+        report = TickReport(deadline, list(strategies))
+        if deadline.expired:
+            # Picked up too late to matter
+            for symbol in task["symbols"]:
+                report.skip(symbol, "deadline")
+            intents, prices = [], {}
+        else:
+            intents, prices = self.engine.scan(task["symbols"], strategies, deadline, report)
+        logger.info(
+            "🧩 Shard of %d symbols: %d done, %d skipped, %d intents",
+            len(task["symbols"]), len(report.done), len(report.skipped), len(intents)
+        )
+        return {
+            "worker": self.worker_id,
+            "intents": intents,
+            "prices": prices,
+            "done": report.done,
+            "skipped": report.skipped,
+        }
+
+    def run(self):
+        """Heartbeat and process shard tasks until stopped."""
+        self.heartbeat()
+        threading.Thread(target=self._heartbeat_loop, name="shard-heartbeat", daemon=True).start()
+        logger.info("🚀 Shard worker %s started", self.worker_id)
+        try:
+            while not self._stopped.is_set():
+                item = self.redis.brpop(queue_key(self.worker_id), timeout=1)
+                if item is None:
+                    continue
+                task = loads(item[1])
+                try:
+                    result = self.handle(task)
+                except Exception as e:
+                    logger.exception("❌ Shard task %s failed: %s", task.get("tick_id"), e)
+                    result = {
+                        "worker": self.worker_id, "intents": [], "prices": {}, "done": [],
+                        "skipped": {symbol: "worker_error" for symbol in task["symbols"]},
+                    }
+                key = results_key(task["tick_id"])
+                self.redis.lpush(key, dumps(result))
+                self.redis.expire(key, RESULT_TTL_SECONDS)
+        finally:
+            self.redis.zrem(WORKERS_KEY, self.worker_id)
+            logger.info("🛑 Shard worker %s stopped", self.worker_id)
+
+    def stop(self):
+        """Stop after the current task."""
+        self._stopped.set()
+
+
+def _run_worker(worker_id: str):
+    """Process entry point for one worker."""
+    from core.market_data.shared_bars import share_fetched_bars  # pylint: disable=import-outside-toplevel
+
+    configure_logging("shard-worker")
+    # No-op unless this is the first process on the host to take the writer lock
+    share_fetched_bars()
+    worker = ShardWorker(worker_id)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        worker.stop()
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Run trading shard workers")
+    parser.add_argument("--id", help="Worker id (default: host-pid)")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Start this many local worker processes")
+    args = parser.parse_args()
+
+    base = args.id or f"{socket.gethostname()}-{os.getpid()}"
+    if args.processes <= 1:
+        _run_worker(base)
+        return
+
+    processes = [
+        multiprocessing.Process(target=_run_worker, args=(f"{base}-{i}",), name=f"shard-{i}")
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Distributed fetch-and-evaluate over shard workers.
+
+With TRADING_MODE=distributed the trading service stays the orchestrator:
+it decides which strategies are due, then splits the universe over the live
+shard workers with a consistent-hash ring and pushes one shard per worker
+onto that worker's Redis queue. Each worker fetches and evaluates its
+symbols and pushes back intents, prices and its done/skipped lists. The
+orchestrator merges the results and does netting, order submission, books
+and performance itself, as in single-process mode.
+
+Because a symbol always hashes to the same worker while membership is
+stable, each worker's bar cache stays warm for its symbols; adding or
+removing a worker only moves the symbols on that part of the ring.
+"""
+import bisect
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List, Tuple
+
+from core.clients.redis_messaging_client import redis_client
+from core.codec import dumps, loads
+from services.trading.portfolio_engine import get_portfolio_engine
+from services.trading.tick_budget import TickDeadline, TickReport
+
+logger = logging.getLogger(__name__)
+
+TRADING_MODE = os.getenv("TRADING_MODE", "local").lower()
+
+# Workers not seen for this many seconds drop out of the ring
+WORKER_TTL_SECONDS = float(os.getenv("SHARD_WORKER_TTL", "15"))
+# Virtual nodes per worker; more gives a more even split
+RING_REPLICAS = 100
+
+WORKERS_KEY = "shards:workers"
+
+
+def queue_key(worker_id: str) -> str:
+    """Redis list a worker takes its shards from."""
+    return f"shards:queue:{worker_id}"
+
+
+def results_key(tick_id: str) -> str:
+    """Redis list a tick's shard results are pushed to."""
+    return f"shards:results:{tick_id}"
+
+
+def _hash(value: str) -> int:
+    """Stable 64-bit hash (Python's hash() is salted per process)."""
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent-hash ring mapping symbols to workers."""
+
+    def __init__(self, nodes: List[str], replicas: int = RING_REPLICAS):
+        """Place `replicas` virtual points per node on the ring."""
+        points = sorted((_hash(f"{node}#{i}"), node) for node in nodes for i in range(replicas))
+        self._keys = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key: str) -> str:
+        """The node owning `key`: the first point clockwise from its hash."""
+        if not self._nodes:
+            raise ValueError("Hash ring has no nodes")
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._nodes[index]
+
+    def assign(self, keys: List[str]) -> Dict[str, List[str]]:
+        """Group keys by owning node, keeping their order within each group."""
+        shards: Dict[str, List[str]] = {}
+        for key in keys:
+            shards.setdefault(self.node_for(key), []).append(key)
+        return shards
+
+
+def live_workers(redis=None) -> List[str]:
+    """Workers that sent a heartbeat within WORKER_TTL_SECONDS."""
+    redis = redis or redis_client.redis
+    return sorted(redis.zrangebyscore(WORKERS_KEY, time.time() - WORKER_TTL_SECONDS, "+inf"))
+
+
+class ShardOrchestrator:
+    """Scanner that farms a tick's fetch-and-evaluate stage out to shard workers."""
+
+    def __init__(self, local_scan, redis=None):
+        """Use `local_scan` when no workers are alive."""
+        self.local_scan = local_scan
+        self._redis = redis
+
+    @property
+    def redis(self):
+        """Redis connection (the shared client unless one was given)."""
+        return self._redis or redis_client.redis
+
+    def scan(
+        self, symbols: List[str], strategies: Dict[str, object],
+        deadline: TickDeadline, report: TickReport,
+    ) -> Tuple[List[tuple], Dict[str, float]]:
+        """Dispatch shards, wait for results until the deadline and merge them."""
+        workers = live_workers(self.redis)
+        if not workers:
+            logger.warning("⚠️ No shard workers alive, scanning %d symbols locally", len(symbols))
+            return self.local_scan(symbols, strategies, deadline, report)
+
+        tick_id = uuid.uuid4().hex
+        shards = HashRing(workers).assign(symbols)
+        task = {
+            "tick_id": tick_id,
+            "strategies": [strategy.__class__.__name__ for strategy in strategies.values()],
+            "deadline": time.time() + deadline.remaining(),
+        }
+        for worker, shard in shards.items():
+            self.redis.lpush(queue_key(worker), dumps({**task, "symbols": shard}))
+        logger.info(
+            "🧩 Dispatched %d symbols to %d shard workers", len(symbols), len(shards)
+        )
+
+        intents: List[tuple] = []
+        prices: Dict[str, float] = {}
+        pending = set(shards)
+        while pending:
+            remaining = deadline.remaining()
+            if remaining <= 0:
+                break
+            # Redis 6+ takes fractional timeouts, so the wait ends at the deadline (0 would block forever)
+            item = self.redis.blpop(results_key(tick_id), timeout=remaining)
+            if item is None:
+                continue
+            result = loads(item[1])
+            pending.discard(result["worker"])
+            intents.extend(tuple(intent) for intent in result["intents"])
+            prices.update(result["prices"])
+            for symbol in result["done"]:
+                report.complete(symbol)
+            for symbol, reason in result["skipped"].items():
+                report.skip(symbol, reason)
+
+        for worker in pending:
+            logger.warning("⚠️ Shard worker %s did not report before the deadline", worker)
+            for symbol in shards[worker]:
+                report.skip(symbol, "worker_timeout")
+        self.redis.delete(results_key(tick_id))
+        return intents, prices
+
+
+_orchestrator = None
+_orchestrator_lock = threading.Lock()
+
+
+def get_shard_orchestrator() -> ShardOrchestrator:
+    """Return the shared orchestrator, falling back to the portfolio engine's local scan."""
+    global _orchestrator  # pylint: disable=global-statement
+    if _orchestrator is None:
+        with _orchestrator_lock:
+            if _orchestrator is None:
+                _orchestrator = ShardOrchestrator(get_portfolio_engine().scan)
+    return _orchestrator
@@ -1,20 +1,31 @@
 """Breakout trading strategy implementation."""
 from typing import List, Dict
 
-from pandas import DataFrame
-
 
 class BreakoutStrategy:
     """Breakout strategy using support/resistance levels."""
 
+    def __init__(self, window=20, timeframe="1Hour"):
+        """Initialize the breakout strategy."""
+        self.window = window
+        self.timeframe = timeframe
+
+    @property
+    def lookback(self) -> int:
+        """Bars needed: a full window ending at the previous bar, plus the current bar."""
+        return self.window + 1
+
     def evaluate(self, bars: List[Dict]) -> str:
         """Evaluate breakout signal."""
-        df = DataFrame(bars)
-        high_n = df['high'].rolling(window=20).max()
-        low_n = df['low'].rolling(window=20).min()
-        if df['high'].iloc[-1] > high_n.iloc[-2]:
+        # pylint: disable=import-outside-toplevel
+        from core.market_data.indicators import column, rolling_max, rolling_min
+
+        highs, lows = column(bars, "high"), column(bars, "low")
+        high_n = rolling_max(highs, self.window)
+        low_n = rolling_min(lows, self.window)
+        if highs[-1] > high_n[-2]:
             return "buy"
-        elif df['low'].iloc[-1] < low_n.iloc[-2]:
+        elif lows[-1] < low_n[-2]:
             return "sell"
         return "hold"
 
@@ -2,20 +2,32 @@
 from datetime import datetime
 from typing import List, Dict
 
-from pandas import DataFrame
-
 
 class MomentumStrategy:
     """Momentum strategy using moving averages."""
 
+    def __init__(self, fast=50, slow=200, timeframe="1Day"):
+        """Initialize the momentum strategy."""
+        self.fast = fast
+        self.slow = slow
+        self.timeframe = timeframe
+
+    @property
+    def lookback(self) -> int:
+        """Bars needed for the slow moving average."""
+        return self.slow
+
     def evaluate(self, bars: List[Dict]) -> str:
         """Evaluate momentum signal based on moving averages."""
-        df = DataFrame(bars)
-        df['ma_fast'] = df['close'].rolling(window=50).mean()
-        df['ma_slow'] = df['close'].rolling(window=200).mean()
-        if df['ma_fast'].iloc[-1] > df['ma_slow'].iloc[-1]:
+        # pylint: disable=import-outside-toplevel
+        from core.market_data.indicators import column, sma
+
+        closes = column(bars, "close")
+        ma_fast = sma(closes, self.fast)[-1]
+        ma_slow = sma(closes, self.slow)[-1]
+        if ma_fast > ma_slow:
             return "buy"
-        elif df['ma_fast'].iloc[-1] < df['ma_slow'].iloc[-1]:
+        elif ma_fast < ma_slow:
             return "sell"
         return "hold"
 
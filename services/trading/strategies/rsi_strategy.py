@@ -1,20 +1,29 @@
 """RSI trading strategy implementation."""
 from typing import List, Dict
 
-from ta.momentum import RSIIndicator
-from pandas import DataFrame
-
 
 class RSIStrategy:
     """RSI strategy using relative strength index."""
 
+    def __init__(self, window=14, timeframe="15Min"):
+        """Initialize the RSI strategy."""
+        self.window = window
+        self.timeframe = timeframe
+
+    @property
+    def lookback(self) -> int:
+        """Bars needed: one price change per RSI period."""
+        return self.window + 1
+
     def evaluate(self, bars: List[Dict]) -> str:
         """Evaluate RSI signal."""
-        df = DataFrame(bars)
-        rsi = RSIIndicator(df['close'], window=14).rsi()
-        if rsi.iloc[-1] < 30:
+        # pylint: disable=import-outside-toplevel
+        from core.market_data.indicators import column, rsi
+
+        value = rsi(column(bars, "close"), self.window)[-1]
+        if value < 30:
             return "buy"
-        elif rsi.iloc[-1] > 70:
+        elif value > 70:
             return "sell"
         return "hold"
 
@@ -5,18 +5,26 @@ from typing import List, Dict
 class SmaCrossover:
     """Simple Moving Average crossover strategy."""
 
-    def __init__(self, short=3, long=5):
+    def __init__(self, short=3, long=5, timeframe="5Min"):
         """Initialize the SMA crossover strategy."""
         self.short = short
         self.long = long
+        self.timeframe = timeframe
+
+    @property
+    def lookback(self) -> int:
+        """Bars needed for the long moving average."""
+        return self.long
 
     def evaluate(self, bars: List[Dict]) -> str:
         """Evaluate SMA crossover signal."""
-        closes = [bar["close"] for bar in bars]
+        from core.market_data.indicators import column  # pylint: disable=import-outside-toplevel
+
+        closes = column(bars, "close")
         if len(closes) < self.long:
             return "hold"
-        short_avg = sum(closes[-self.short:]) / self.short
-        long_avg = sum(closes[-self.long:]) / self.long
+        short_avg = closes[-self.short:].sum() / self.short
+        long_avg = closes[-self.long:].sum() / self.long
         if short_avg > long_avg:
             return "buy"
         elif short_avg < long_avg:
@@ -1,16 +1,24 @@
 """Strategy registry for trading bot strategies."""
+from typing import List
+
 from services.trading.strategies.momentum_strategy import MomentumStrategy
 from services.trading.strategies.rsi_strategy import RSIStrategy
 from services.trading.strategies.breakout_strategy import BreakoutStrategy
 from services.trading.strategies.sma_crossover_strategy import SmaCrossover
 
+STRATEGY_CLASSES = {
+    "momentum": MomentumStrategy,
+    "rsi": RSIStrategy,
+    "breakout": BreakoutStrategy,
+    "sma_crossover": SmaCrossover,
+}
+
 
 def get_strategy(name: str):
     """Get a strategy instance by name."""
-    strategies = {
-        "momentum": MomentumStrategy(),
-        "rsi": RSIStrategy(),
-        "breakout": BreakoutStrategy(),
-        "sma_crossover": SmaCrossover(),
-    }
-    return strategies.get(name, MomentumStrategy())
+    return STRATEGY_CLASSES.get(name, MomentumStrategy)()
+
+
+def available_strategies() -> List[str]:
+    """Names of all registered strategies."""
+    return list(STRATEGY_CLASSES)
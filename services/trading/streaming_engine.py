@@ -0,0 +1,203 @@
+"""
+Event-driven trading engine fed by a streaming bar feed.
+
+Instead of polling REST every 5 minutes, minute bars arrive over the
+market-data WebSocket, are aggregated into the strategy's timeframe and
+appended to per-symbol rolling windows held in memory, and the current
+strategy is evaluated as soon as each bar of its timeframe completes.
+"""
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from core.clients.alpaca_trading_client import market_now
+from core.clients.market_data_stream import MarketDataStream
+from core.clients.redis_messaging_client import redis_client
+from core.database.database_manager import SessionLocal, init_db
+from core.market_data.multi_timeframe import fetch_bars
+from core.market_data.timeframes import BASE_TIMEFRAME, BarAggregator, epoch_seconds
+from core.monitoring.logging_setup import configure_logging
+from core.monitoring.metrics import (
+    DB_COMMIT_SECONDS, SIGNALS_TOTAL, STRATEGY_EVAL_SECONDS, timed
+)
+from services.trading.order_manager import start_fill_tracking
+from services.trading.position_ledger import PositionLedger, get_position_ledger
+from services.trading.trading_engine import get_bot, execute_signal
+from services.trading.universe import TOP_SP500_SYMBOLS
+
+logger = logging.getLogger(__name__)
+
+
+class RollingBarWindows:
+    """Per-symbol fixed-size windows of the most recent bars."""
+
+    def __init__(self, size: int):
+        """Initialize empty windows."""
+        self.size = size
+        self._windows: Dict[str, Deque[Dict]] = {}
+
+    def _window(self, symbol: str) -> Deque[Dict]:
+        """Get or create the window for a symbol."""
+        window = self._windows.get(symbol)
+        if window is None:
+            window = deque(maxlen=self.size)
+            self._windows[symbol] = window
+        return window
+
+    def seed(self, symbol: str, bars: List[Dict]):
+        """Replace a symbol's window with historical bars."""
+        window = self._window(symbol)
+        window.clear()
+        window.extend(bars)
+
+    def append(self, symbol: str, bar: Dict) -> List[Dict]:
+        """Append a bar (replacing a last bar with its timestamp) and return the window as a list."""
+        window = self._window(symbol)
+        if window and epoch_seconds(window[-1]["timestamp"]) == epoch_seconds(bar["timestamp"]):
+            window[-1] = bar
+        else:
+            window.append(bar)
+        return list(window)
+
+    def get(self, symbol: str) -> List[Dict]:
+        """Return a copy of the symbol's window."""
+        return list(self._windows.get(symbol, ()))
+
+
+class StreamingTradingEngine:
+    """Evaluates the active strategy whenever a bar of its timeframe completes."""
+
+    def __init__(
+        self,
+        symbols: Optional[List[str]] = None,
+        stream: Optional[MarketDataStream] = None,
+        ledger: Optional[PositionLedger] = None,
+    ):
+        """Initialize the streaming engine.
+
+        Fills and live prices are fed to `ledger` (the shared position ledger by default).
+        """
+        self.symbols = symbols or list(TOP_SP500_SYMBOLS)
+        self.stream = stream or MarketDataStream()
+        self.ledger = ledger or get_position_ledger()
+        self.strategy = None
+        self.windows = RollingBarWindows(0)
+        self.aggregators: Dict[str, BarAggregator] = {}
+        # Shared-memory bar store this process writes, if any (see start_streaming)
+        self.shared = None
+
+    def _configure(self, strategy):
+        """Size windows and aggregators for the strategy's timeframe and lookback."""
+        self.strategy = strategy
+        self.windows = RollingBarWindows(strategy.lookback)
+        self.aggregators = {symbol: BarAggregator(strategy.timeframe) for symbol in self.symbols}
+
+    def warm_up(self):
+        """Seed the rolling windows with history in the strategy's timeframe.
+
+        A last bar still forming is handed to the symbol's aggregator instead,
+        which emits it once it closes.
+        """
+        strategy = get_bot().strategy
+        self._configure(strategy)
+        now = market_now().timestamp()
+        for symbol in self.symbols:
+            try:
+                bars = list(fetch_bars(symbol, strategy.timeframe, strategy.lookback + 1))
+                if bars and self.aggregators[symbol].resume(bars[-1], now):
+                    bars.pop()
+                self.windows.seed(symbol, bars)
+            except Exception as e:
+                logger.error("❌ Failed to warm up %s: %s", symbol, e)
+
+    def _execute(self, symbol: str, signal: str, strategy_name: str):
+        """Execute a signal in its own DB session (runs in a worker thread)."""
+        db = SessionLocal()
+        try:
+            execute_signal(db, symbol, signal, strategy_name, on_fill=self.ledger.apply_fill)
+            with timed(DB_COMMIT_SECONDS):
+                db.commit()
+            redis_client.touch_version("trades")
+        except Exception as e:
+            logger.error("❌ Error executing %s signal for %s: %s", signal, symbol, e)
+        finally:
+            db.close()
+
+    async def on_bar(self, bar: Dict):
+        """Fold a minute bar into its symbol's aggregator and evaluate on completed bars."""
+        bot = get_bot()
+        if bot.strategy is not self.strategy:
+            # Strategy switched: its timeframe or lookback may differ, so re-seed
+            logger.info("🔁 Strategy changed, re-seeding streaming windows")
+            await asyncio.to_thread(self.warm_up)
+
+        symbol = bar["symbol"]
+        self.ledger.mark({symbol: float(bar["close"])})
+        if self.shared is not None:
+            self._share(symbol, bar)
+        aggregator = self.aggregators.get(symbol)
+        if aggregator is None:
+            return
+
+        for completed in aggregator.update(bar):
+            window = self.windows.append(symbol, completed)
+            if bot.running:
+                await self._evaluate(bot.strategy, symbol, window)
+
+    def _share(self, symbol: str, bar: Dict):
+        """Append a live minute bar to the symbol's shared-memory ring."""
+        from core.market_data.bars import Bars  # pylint: disable=import-outside-toplevel
+
+        try:
+            self.shared.publish(symbol, BASE_TIMEFRAME, Bars.from_records([bar]))
+        except Exception as e:
+            logger.error("❌ Failed to share %s bar: %s", symbol, e)
+
+    async def _evaluate(self, strategy, symbol: str, window: List[Dict]):
+        """Evaluate the strategy on a window and execute any signal."""
+        strategy_name = strategy.__class__.__name__
+        try:
+            with timed(STRATEGY_EVAL_SECONDS, strategy=strategy_name):
+                signal = strategy.evaluate(window)
+        except Exception as e:
+            logger.error("❌ Error evaluating %s for %s: %s", strategy_name, symbol, e)
+            return
+        SIGNALS_TOTAL.labels(strategy=strategy_name, signal=signal).inc()
+
+        if signal in ["buy", "sell"]:
+            # Order submission and DB writes block, keep them off the event loop
+            await asyncio.to_thread(self._execute, symbol, signal, strategy_name)
+
+    async def run(self):
+        """Warm up, then consume the bar stream until it is stopped."""
+        await asyncio.to_thread(self.warm_up)
+        logger.info("🚀 Streaming engine started for %d symbols", len(self.symbols))
+        await self.stream.run(self.symbols, self.on_bar)
+
+    def stop(self):
+        """Stop consuming the stream."""
+        self.stream.stop()
+
+
+def start_streaming():
+    """Run the streaming engine in the foreground."""
+    # pylint: disable=import-outside-toplevel
+    from core.market_data.shared_bars import get_bar_writer, share_fetched_bars
+
+    configure_logging("streaming")
+    init_db()
+    engine = StreamingTradingEngine()
+    db = SessionLocal()
+    try:
+        engine.ledger.load(db)
+    finally:
+        db.close()
+    start_fill_tracking()
+    if share_fetched_bars():
+        engine.shared = get_bar_writer()
+    asyncio.run(engine.run())
+
+
+if __name__ == "__main__":
+    start_streaming()
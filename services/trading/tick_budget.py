@@ -0,0 +1,96 @@
+"""
+Time budget and outcome report for one trading tick.
+
+A tick must finish before the next one is due, so each gets a deadline.
+Symbols are worked in priority order; whatever has not finished when the
+deadline passes is abandoned and recorded as skipped, so an oversized
+universe degrades by dropping its lowest-priority symbols instead of making
+ticks overlap.
+"""
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+from core.monitoring.metrics import TICK_SYMBOLS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+# Seconds a tick may spend fetching and evaluating; must stay below the
+# scheduler interval (one minute) minus BAR_CLOSE_DELAY
+TICK_BUDGET_SECONDS = float(os.getenv("TICK_BUDGET_SECONDS", "45"))
+
+# Share of the budget held back from fetching so fetched symbols can still be evaluated
+EVALUATION_RESERVE = 0.2
+
+
+class TickDeadline:
+    """Monotonic deadline for one tick."""
+
+    def __init__(self, budget: float = TICK_BUDGET_SECONDS):
+        """Start the clock."""
+        self.budget = budget
+        self.started = time.monotonic()
+        self.deadline = self.started + budget
+
+    def remaining(self, reserve: float = 0.0) -> float:
+        """Seconds left before the deadline minus `reserve` (a share of the budget), never negative."""
+        return max(0.0, self.deadline - reserve * self.budget - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """Whether the budget is used up."""
+        return time.monotonic() >= self.deadline
+
+    def elapsed(self) -> float:
+        """Seconds since the tick started."""
+        return time.monotonic() - self.started
+
+
+class TickReport:
+    """What a tick did: symbols completed, skipped (with reason) and orders sent."""
+
+    def __init__(self, deadline: TickDeadline, strategies: Optional[List[str]] = None):
+        """Initialize an empty report."""
+        self.deadline = deadline
+        self.strategies = strategies or []
+        self.done: List[str] = []
+        self.skipped: Dict[str, str] = {}
+        self.intents = 0
+
+    def complete(self, symbol: str):
+        """Record a symbol as fully evaluated."""
+        self.done.append(symbol)
+        TICK_SYMBOLS_TOTAL.labels(outcome="done").inc()
+
+    def skip(self, symbol: str, reason: str):
+        """Record a symbol as skipped and why (deadline, deadline_running, fetch_error, no_data)."""
+        self.skipped[symbol] = reason
+        TICK_SYMBOLS_TOTAL.labels(outcome=reason).inc()
+
+    def as_dict(self) -> Dict:
+        """The report as a plain dict."""
+        return {
+            "strategies": self.strategies,
+            "budget_seconds": self.deadline.budget,
+            "elapsed_seconds": round(self.deadline.elapsed(), 3),
+            "deadline_hit": any(reason.startswith("deadline") for reason in self.skipped.values()),
+            "done": list(self.done),
+            "skipped": dict(self.skipped),
+            "intents": self.intents,
+        }
+
+    def log(self):
+        """Log a one-line summary, as a warning when anything was skipped."""
+        summary = self.as_dict()
+        if self.skipped:
+            logger.warning(
+                "⏱️ Tick finished in %.1fs/%gs: %d done, %d skipped %s, %d intents",
+                summary["elapsed_seconds"], self.deadline.budget, len(self.done),
+                len(self.skipped), self.skipped, self.intents
+            )
+        else:
+            logger.info(
+                "⏱️ Tick finished in %.1fs/%gs: %d done, %d intents",
+                summary["elapsed_seconds"], self.deadline.budget, len(self.done), self.intents
+            )
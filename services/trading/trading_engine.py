@@ -1,17 +1,33 @@
 """Trading bot scheduler with strategy execution."""
 import logging
+import os
+import threading
 from datetime import datetime
+from functools import partial
 
-from apscheduler.schedulers.background import BackgroundScheduler
-
-from core.clients.alpaca_trading_client import get_recent_bars, submit_market_order, get_account
+from core.clients.alpaca_trading_client import market_now
+from core.market_data.trading_calendar import get_calendar
+from services.trading.market_scheduler import create_scheduler, is_due, tick_boundary
+from services.trading.order_manager import get_order_manager, start_fill_tracking
+from services.trading.portfolio_engine import get_portfolio_engine
+from services.trading.position_ledger import get_position_ledger
+from services.trading.sharding import TRADING_MODE, get_shard_orchestrator
+from services.trading.universe import get_universe
 from services.trading.strategy_manager import get_strategy
-from core.database.database_manager import SessionLocal
-from core.database.trading_models import ExecutedTrade, StrategyPerformance, BotControl
+from core.database.database_manager import SessionLocal, init_db
+from core.database.trading_models import ExecutedTrade, BotControl
 from core.clients.redis_messaging_client import redis_client
+from core.monitoring.logging_setup import configure_logging
+from core.monitoring.metrics import (
+    DB_COMMIT_SECONDS, TICK_SECONDS, span, start_metrics_server, timed
+)
 
 logger = logging.getLogger(__name__)
 
+# Retries while a fill arrives before its trades are committed
+FILL_RECONCILE_ATTEMPTS = 10
+FILL_RECONCILE_DELAY = 0.5
+
 class TradingBot:
     """Trading bot that executes strategies on a schedule."""
     def __init__(self):
@@ -77,101 +93,211 @@ class TradingBot:
         """Get the current bot status as a string."""
         return "Running" if self.running else "Paused"
 
-bot = TradingBot()
-
-# Top 10 S&P 500 stocks by market cap (as of 2024)
-TOP_SP500_SYMBOLS = [
-    "AAPL",  # Apple Inc.
-    "MSFT",  # Microsoft Corporation
-    "GOOGL", # Alphabet Inc. Class A
-    "AMZN",  # Amazon.com Inc.
-    "NVDA",  # NVIDIA Corporation
-    "TSLA",  # Tesla Inc.
-    "META",  # Meta Platforms Inc.
-    "BRK.B", # Berkshire Hathaway Inc. Class B
-    "UNH",   # UnitedHealth Group Inc.
-    "JNJ"    # Johnson & Johnson
-]
-
-def run_trading_job():
-    """Execute a trading job for multiple symbols."""
-    logger.info("🔄 Running trading job - Bot status: %s", bot.status)
+_bot = None
+_bot_lock = threading.Lock()
 
-    if not bot.running:
-        logger.info("⏸️ Bot is paused, skipping trading job")
-        return
+def get_bot() -> TradingBot:
+    """Return the shared trading bot, loading its state from the database on first use."""
+    global _bot  # pylint: disable=global-statement
+    if _bot is None:
+        with _bot_lock:
+            if _bot is None:
+                _bot = TradingBot()
+    return _bot
+
+def __getattr__(name):
+    """Keep `trading_engine.bot` working as a lazy alias."""
+    if name == "bot":
+        return get_bot()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _publish_fill(order):
+    """Publish an order's final state to Redis."""
+    redis_client.publish_fill(
+        order_id=order["id"],
+        symbol=order.get("symbol"),
+        side=order.get("side"),
+        qty=float(order.get("filled_qty") or order.get("qty") or 0),
+        price=float(order["filled_avg_price"]) if order.get("filled_avg_price") else None,
+        status=order.get("status"),
+        timestamp=datetime.now().isoformat()
+    )
+
+def reconcile_order(order, attempts=FILL_RECONCILE_ATTEMPTS):
+    """Update the stored trades of an order that reached a final status, then publish it.
+
+    Runs on the order tracker's thread with its own session. If the trades
+    are not committed yet (the fill beat the tick's commit), retry shortly.
+    """
+    values = {"status": order.get("status")}
+    if order.get("filled_avg_price"):
+        values["price"] = float(order["filled_avg_price"])
 
     db = SessionLocal()
     try:
-        strategy_name = bot.strategy.__class__.__name__
-        logger.info("🧠 Using strategy: %s", strategy_name)
-
-        # Iterate through all top S&P 500 symbols
-        for symbol in TOP_SP500_SYMBOLS:
-            try:
-                logger.info("📊 Fetching bars for %s", symbol)
-                bars = get_recent_bars(symbol)
-
-                logger.info("🧠 Evaluating %s strategy for %s", strategy_name, symbol)
-                signal = bot.strategy.evaluate(bars)
-                logger.info("📈 %s evaluation result: %s", symbol, signal)
-
-                if signal in ["buy", "sell"]:
-                    logger.info("💰 Executing %s order for %s", signal.upper(), symbol)
-                    order = submit_market_order(symbol, 1, side=signal)
-                    price = float(order.get("filled_avg_price", 0))
-
-                    # Store trade in database
-                    trade = ExecutedTrade(
-                        symbol=symbol,
-                        action=signal,
-                        price=price,
-                        qty=1,
-                        signal=signal,
-                        strategy=strategy_name
-                    )
-                    db.add(trade)
-
-                    logger.info(
-                        "✅ Trade executed and stored: %s %s @ $%s", signal.upper(), symbol, price
-                    )
-
-                    # Publish trade to Redis for WebSocket service to broadcast
-                    redis_client.publish_trade(
-                        symbol=symbol,
-                        action=signal,
-                        price=price,
-                        timestamp=datetime.now().isoformat(),
-                        strategy=strategy_name
-                    )
-                else:
-                    logger.info("🔍 No trading signal for %s", symbol)
-
-            except Exception as e:
-                logger.error("❌ Error processing %s: %s", symbol, e)
-                continue  # Continue with next symbol if one fails
-
-        # Update strategy performance after processing all symbols
-        try:
-            account = get_account()
-            performance = StrategyPerformance(
+        updated = (
+            db.query(ExecutedTrade)
+            .filter_by(order_id=order["id"])
+            .update(values, synchronize_session=False)
+        )
+        db.commit()
+    except Exception as e:
+        logger.error("❌ Failed to reconcile order %s: %s", order["id"], e)
+        updated = 0
+    finally:
+        db.close()
+    if updated:
+        redis_client.touch_version("trades")
+
+    if not updated and attempts > 0:
+        retry = threading.Timer(FILL_RECONCILE_DELAY, reconcile_order, args=(order, attempts - 1))
+        retry.daemon = True
+        retry.start()
+        return
+    if not updated:
+        logger.warning("⚠️ No stored trades for order %s", order["id"])
+    else:
+        logger.info("🧾 Reconciled %d trades for order %s: %s", updated, order["id"], values)
+    _publish_fill(order)
+
+def execute_intents(db, intents, prices=None, on_fill=None):
+    """Net and submit a batch of (strategy, symbol, side, qty) intents, store and publish them.
+
+    One ExecutedTrade is stored per intent so each strategy keeps its own
+    history. Orders still open on submission are stored with a price of 0 and
+    their order status, and are reconciled by `reconcile_order` when the fill
+    arrives.
+    """
+    trades = submit_intents(intents, prices=prices, on_fill=on_fill)
+    db.add_all(trades)
+    return trades
+
+def submit_intents(intents, prices=None, on_fill=None):
+    """Net, submit and publish intents like `execute_intents`; return their trades unsaved.
+
+    Only trades with an order or netted internally are published, with their status.
+    """
+    trades = []
+    results = get_order_manager().submit_batch(
+        intents, prices=prices, on_fill=on_fill, on_order=reconcile_order
+    )
+    for result in results:
+        order = result["order"]
+        if result.get("blocked"):
+            status = "blocked"
+        elif order is None:
+            status = "netted" if result["net"] == 0 else "failed"
+        else:
+            status = order.get("status")
+        price = result["price"] or 0.0
+        for strategy_name, symbol, signal, qty in result["intents"]:
+            trade = ExecutedTrade(
+                symbol=symbol,
+                action=signal,
+                price=price,
+                qty=qty,
+                signal=signal,
                 strategy=strategy_name,
-                portfolio_value=float(getattr(account, '_raw', {}).get("cash", 0))
+                order_id=order["id"] if order else None,
+                status=status
+            )
+            trade.block_reason = result.get("blocked")
+            trades.append(trade)
+
+            logger.info(
+                "✅ Trade stored: %s %s (%s) @ $%s", signal.upper(), symbol, status, price
             )
-            db.add(performance)
-            db.commit()
-            logger.info("📊 Updated strategy performance for %s", strategy_name)
-        except Exception as e:
-            logger.error("❌ Failed to update strategy performance: %s", e)
 
+            # Publish trade to Redis for WebSocket service to broadcast;
+            # blocked and failed intents are stored but never traded
+            if status in ("blocked", "failed"):
+                continue
+            redis_client.publish_trade(
+                symbol=symbol,
+                action=signal,
+                price=price,
+                timestamp=datetime.now().isoformat(),
+                strategy=strategy_name,
+                status=status
+            )
+        if order is not None and status == "filled":
+            _publish_fill(order)
+    return trades
+
+def execute_signal(db, symbol: str, signal: str, strategy_name: str, on_fill=None):
+    """Submit an order for a single buy/sell signal, store it and publish it to Redis.
+
+    `on_fill` is called like `execute_intents`'s once the fill price is known.
+    """
+    logger.info("💰 Executing %s order for %s", signal.upper(), symbol)
+    return execute_intents(db, [(strategy_name, symbol, signal, 1)], on_fill=on_fill)[0]
+
+def run_trading_job(force: bool = False):
+    """Run the strategies with a bar closing now, if the market is open.
+
+    With `force`, every active strategy runs regardless of the calendar.
+    """
+    bot = get_bot()
+    if not bot.running:
+        logger.info("⏸️ Bot is paused, skipping trading job")
+        return
+
+    due = None
+    if not force:
+        now = market_now()
+        session = get_calendar().session_at(now)
+        if session is None:
+            logger.debug("🌙 Market closed at %s, skipping trading job", now)
+            return
+        due = partial(is_due, boundary=tick_boundary(now), session=session)
+
+    db = SessionLocal()
+    try:
+        with span("trading_job.tick"), timed(TICK_SECONDS):
+            _run_tick(db, due)
     except Exception as e:
         logger.exception("❌ Trading job error: %s", e)
 
     finally:
         db.close()
 
+def _run_tick(db, due=None):
+    """Run the due active strategies over one shared data snapshot, then commit."""
+    scanner = get_shard_orchestrator().scan if TRADING_MODE == "distributed" else None
+    universe = get_universe()
+    report = get_portfolio_engine().run_tick(
+        db, universe.symbols, get_bot().strategy, execute_intents,
+        due=due, scanner=scanner, screen=universe.screen
+    )
+    if report is None:
+        return
+    try:
+        with span("db_commit"), timed(DB_COMMIT_SECONDS):
+            db.commit()
+        if report.intents:
+            redis_client.touch_version("trades")
+        logger.info("📊 Updated strategy performance for %s", ", ".join(report.strategies))
+    except Exception as e:
+        logger.error("❌ Failed to update strategy performance: %s", e)
+
 def start_scheduler():
-    """Start the background scheduler."""
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(run_trading_job, "interval", minutes=5)
+    """Start the market-hours scheduler."""
+    # pylint: disable=import-outside-toplevel
+    from core.market_data.shared_bars import share_fetched_bars
+
+    configure_logging("trading")
+    init_db()
+    metrics_port = os.getenv("METRICS_PORT")
+    if metrics_port:
+        start_metrics_server(int(metrics_port))
+    db = SessionLocal()
+    try:
+        get_position_ledger().load(db)
+    finally:
+        db.close()
+    start_fill_tracking()
+    share_fetched_bars()
+    scheduler = create_scheduler(run_trading_job)
     scheduler.start()
+    logger.info("📅 Trading scheduler started; next session opens %s",
+                get_calendar().next_open(market_now()))
@@ -0,0 +1,247 @@
+"""
+Symbol universe and the pre-screen that picks each tick's candidates.
+
+The universe is every symbol the bot may trade: the built-in top 10 S&P 500
+list, a constituents file, or the broker's tradable asset list. Strategy
+evaluation only runs on the candidates that pass a cheap pre-screen over
+cached daily bars (last price, average dollar volume and annualized
+volatility), ranked by dollar volume and capped at UNIVERSE_MAX_ACTIVE.
+The screen's inputs only change once a day, so they are refreshed in the
+background once per session and each tick's screen is a few array masks,
+whatever the size of the universe.
+"""
+import csv
+import logging
+import os
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Iterable, List, Optional
+
+from core.clients.alpaca_trading_client import market_now
+from core.market_data.bar_cache import bar_cache
+from core.market_data.timeframes import alpaca_timeframe, calendar_days_for
+from core.market_data.trading_calendar import MARKET_TZ
+
+logger = logging.getLogger(__name__)
+
+# static (TOP_SP500_SYMBOLS), file (UNIVERSE_FILE) or broker (tradable asset list)
+UNIVERSE_SOURCE = os.getenv("UNIVERSE_SOURCE", "static").lower()
+# CSV with a `symbol` column, or one symbol per line
+UNIVERSE_FILE = os.getenv("UNIVERSE_FILE", "")
+# Most candidates evaluated per tick (held symbols come on top)
+UNIVERSE_MAX_ACTIVE = int(os.getenv("UNIVERSE_MAX_ACTIVE", "50"))
+
+# Daily bars the screen looks back over
+SCREEN_LOOKBACK = int(os.getenv("SCREEN_LOOKBACK", "20"))
+SCREEN_MIN_PRICE = float(os.getenv("SCREEN_MIN_PRICE", "5"))
+# 0 disables the upper bound
+SCREEN_MAX_PRICE = float(os.getenv("SCREEN_MAX_PRICE", "0"))
+SCREEN_MIN_DOLLAR_VOLUME = float(os.getenv("SCREEN_MIN_DOLLAR_VOLUME", "10000000"))
+# Annualized volatility of daily log returns; 0 disables a bound
+SCREEN_MIN_VOLATILITY = float(os.getenv("SCREEN_MIN_VOLATILITY", "0"))
+SCREEN_MAX_VOLATILITY = float(os.getenv("SCREEN_MAX_VOLATILITY", "0"))
+# Concurrent daily-bar fetches while refreshing screen data
+SCREEN_WORKERS = int(os.getenv("SCREEN_WORKERS", "4"))
+
+TRADING_DAYS_PER_YEAR = 252
+
+# Top 10 S&P 500 stocks by market cap (as of 2024)
+TOP_SP500_SYMBOLS = [
+    "AAPL",  # Apple Inc.
+    "MSFT",  # Microsoft Corporation
+    "GOOGL", # Alphabet Inc. Class A
+    "AMZN",  # Amazon.com Inc.
+    "NVDA",  # NVIDIA Corporation
+    "TSLA",  # Tesla Inc.
+    "META",  # Meta Platforms Inc.
+    "BRK.B", # Berkshire Hathaway Inc. Class B
+    "UNH",   # UnitedHealth Group Inc.
+    "JNJ"    # Johnson & Johnson
+]
+
+
+def _unique(symbols: Iterable[str]) -> List[str]:
+    """Upper-cased symbols without blanks or duplicates, in order."""
+    seen = {}
+    for symbol in symbols:
+        symbol = symbol.strip().upper()
+        if symbol:
+            seen.setdefault(symbol, None)
+    return list(seen)
+
+
+def read_constituents(path: str) -> List[str]:
+    """Symbols from a constituents file: a CSV with a `symbol` column, or one per line."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = [row for row in csv.reader(f) if row and row[0].strip() and not row[0].startswith("#")]
+    if not rows:
+        return []
+    header = [column.strip().lower() for column in rows[0]]
+    if "symbol" in header:
+        column = header.index("symbol")
+        return _unique(row[column] for row in rows[1:] if len(row) > column)
+    return _unique(row[0] for row in rows)
+
+
+def load_symbols(source: str = UNIVERSE_SOURCE, path: str = UNIVERSE_FILE) -> List[str]:
+    """Load the universe from `source`, falling back to TOP_SP500_SYMBOLS if it yields nothing."""
+    symbols: List[str] = []
+    if source == "file":
+        if path:
+            symbols = read_constituents(path)
+        else:
+            logger.warning("⚠️ UNIVERSE_SOURCE=file but UNIVERSE_FILE is not set")
+    elif source == "broker":
+        # pylint: disable=import-outside-toplevel
+        from core.clients.alpaca_trading_client import get_tradable_symbols
+
+        symbols = _unique(get_tradable_symbols())
+    elif source != "static":
+        logger.warning("⚠️ Unknown UNIVERSE_SOURCE %r, using the static list", source)
+
+    if not symbols:
+        symbols = list(TOP_SP500_SYMBOLS)
+    logger.info("🌐 Universe of %d symbols from %s", len(symbols), source)
+    return symbols
+
+
+class ScreenData:
+    """Per-symbol screen inputs as aligned arrays, computed from daily bars."""
+
+    def __init__(self, day: date, symbols: List[str], closes, volumes):
+        """Reduce (symbols x bars) close and volume matrices, NaN padded, to screen inputs."""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        self.day = day
+        self.symbols = np.array(symbols, dtype=object)
+        self.index = {symbol: i for i, symbol in enumerate(symbols)}
+        with warnings.catch_warnings():
+            # Symbols without bars reduce to NaN (with a warning) and fail every filter
+            warnings.simplefilter("ignore", RuntimeWarning)
+            self.last = closes[:, -1]
+            self.dollar_volume = np.nanmean(closes * volumes, axis=1)
+            returns = np.diff(np.log(closes), axis=1)
+            self.volatility = np.nanstd(returns, axis=1, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+    def passing(self, symbols: List[str], limit: int = UNIVERSE_MAX_ACTIVE) -> List[str]:
+        """Symbols among `symbols` passing every filter, most liquid first, at most `limit`."""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        rows = np.array([self.index[s] for s in symbols if s in self.index], dtype=np.intp)
+        if not rows.size:
+            return []
+        last, dollar_volume, volatility = self.last[rows], self.dollar_volume[rows], self.volatility[rows]
+        with np.errstate(invalid="ignore"):
+            mask = (last >= SCREEN_MIN_PRICE) & (dollar_volume >= SCREEN_MIN_DOLLAR_VOLUME)
+            if SCREEN_MAX_PRICE > 0:
+                mask &= last <= SCREEN_MAX_PRICE
+            if SCREEN_MIN_VOLATILITY > 0:
+                mask &= volatility >= SCREEN_MIN_VOLATILITY
+            if SCREEN_MAX_VOLATILITY > 0:
+                mask &= volatility <= SCREEN_MAX_VOLATILITY
+        kept = rows[mask]
+        order = np.argsort(-dollar_volume[mask], kind="stable")[:limit]
+        return list(self.symbols[kept[order]])
+
+
+class Universe:
+    """The tradable symbols plus the daily screen data that narrows them each tick."""
+
+    def __init__(self, symbols: List[str], lookback: int = SCREEN_LOOKBACK):
+        """Initialize with no screen data; it is fetched on the first screen of each day."""
+        self.symbols = symbols
+        self.lookback = lookback
+        self.data: Optional[ScreenData] = None
+        self._lock = threading.Lock()
+        self._refreshing: Optional[date] = None
+
+    def _closes_volumes(self, symbol: str):
+        """Last lookback+1 daily closes and volumes of a symbol (runs in a worker thread)."""
+        frame = bar_cache.get_frame(
+            symbol, alpaca_timeframe("1Day"), calendar_days_for("1Day", self.lookback + 1)
+        )
+        if frame is None or frame.empty:
+            return [], []
+        tail = frame.tail(self.lookback + 1)
+        return tail["close"].to_numpy(dtype=float), tail["volume"].to_numpy(dtype=float)
+
+    def refresh(self, day: date):
+        """Fetch daily bars for the whole universe and rebuild the screen data."""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        width = self.lookback + 1
+        closes = np.full((len(self.symbols), width), np.nan)
+        volumes = np.full((len(self.symbols), width), np.nan)
+        with ThreadPoolExecutor(max_workers=SCREEN_WORKERS, thread_name_prefix="screen") as pool:
+            for i, (close, volume) in enumerate(pool.map(self._safe_fetch, self.symbols)):
+                if len(close):
+                    # Right-align so the last column is always the latest bar
+                    closes[i, width - len(close):] = close
+                    volumes[i, width - len(volume):] = volume
+        data = ScreenData(day, self.symbols, closes, volumes)
+        with self._lock:
+            self.data = data
+            self._refreshing = None
+        logger.info(
+            "🔎 Screen data for %s: %d symbols, %d pass",
+            day, len(self.symbols), len(data.passing(self.symbols, limit=len(self.symbols)))
+        )
+
+    def _safe_fetch(self, symbol: str):
+        """`_closes_volumes` that logs and returns no bars on error."""
+        try:
+            return self._closes_volumes(symbol)
+        except Exception as e:
+            logger.error("❌ Screen fetch failed for %s: %s", symbol, e)
+            return [], []
+
+    def _refresh_in_background(self, day: date):
+        """Start a refresh for `day` unless one is already running."""
+        with self._lock:
+            if self._refreshing is not None:
+                return
+            self._refreshing = day
+
+        def run():
+            try:
+                self.refresh(day)
+            except Exception as e:
+                logger.exception("❌ Screen refresh failed: %s", e)
+                with self._lock:
+                    self._refreshing = None
+
+        threading.Thread(target=run, name="universe-screen", daemon=True).start()
+
+    def screen(self, held: Iterable[str] = (), day: Optional[date] = None) -> List[str]:
+        """This tick's candidates: held symbols, then the screen's picks.
+
+        Held symbols always stay in so their exits are evaluated. Until the
+        first screen data is in, the first UNIVERSE_MAX_ACTIVE symbols are used.
+        """
+        day = day or market_now().astimezone(MARKET_TZ).date()
+        with self._lock:
+            data = self.data
+        if data is None or data.day != day:
+            self._refresh_in_background(day)
+        if data is None:
+            picks = self.symbols[:UNIVERSE_MAX_ACTIVE]
+        else:
+            picks = data.passing(self.symbols)
+        held = [symbol for symbol in held if symbol]
+        return _unique([*held, *picks])
+
+
+_universe = None
+_universe_lock = threading.Lock()
+
+
+def get_universe() -> Universe:
+    """Return the shared universe, loading UNIVERSE_SOURCE on first use."""
+    global _universe  # pylint: disable=global-statement
+    if _universe is None:
+        with _universe_lock:
+            if _universe is None:
+                _universe = Universe(load_symbols())
+    return _universe
@@ -1,10 +1,11 @@
 """WebSocket connection manager for broadcasting messages."""
-import json
 import logging
 from typing import List
 
 from fastapi import WebSocket
 
+from core.codec import as_text
+
 logger = logging.getLogger(__name__)
 
 class ConnectionManager:
@@ -29,15 +30,15 @@ class ConnectionManager:
                 len(self.active_connections)
             )
 
-    async def broadcast(self, message: dict):
-        """Broadcast a message to all connected WebSockets."""
+    async def broadcast(self, message):
+        """Broadcast pre-encoded JSON (str or bytes), or an object encoded once, to all WebSockets."""
         if not self.active_connections:
             logger.warning("📡 No active WebSocket connections to broadcast to")
             return
 
-        # Validate message is JSON serializable
+        # Encode once for every client, rejecting messages that are not JSON serializable
         try:
-            json.dumps(message)
+            text = as_text(message)
         except (TypeError, ValueError) as e:
             logger.error("❌ Message not JSON serializable: %s", e)
             return
@@ -47,7 +48,7 @@ class ConnectionManager:
 
         for conn in self.active_connections:
             try:
-                await conn.send_json(message)
+                await conn.send_text(text)
                 successful_broadcasts += 1
             except Exception as e:
                 logger.warning(
@@ -4,17 +4,22 @@ This service handles ONLY WebSocket connections and Redis message forwarding.
 """
 
 import asyncio
-import json
 import logging
 import threading
 from typing import List
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
 from core.clients.redis_messaging_client import redis_client
+from core.codec import CodecJSONResponse, JSONDecodeError, as_text, loads
+from core.monitoring.logging_setup import configure_logging
+from core.monitoring.metrics import (
+    BROADCASTS_TOTAL, QUEUE_DEPTH, WEBSOCKET_CONNECTIONS, metrics_payload
+)
 
-logging.basicConfig(level=logging.INFO)
+configure_logging("websocket")
 logger = logging.getLogger(__name__)
 
 class WebSocketManager:
@@ -27,6 +32,7 @@ class WebSocketManager:
         """Accept and register a new WebSocket connection."""
         await websocket.accept()
         self.active_connections.append(websocket)
+        WEBSOCKET_CONNECTIONS.set(len(self.active_connections))
         logger.info(
             "📱 WebSocket connected. Active connections: %d", len(self.active_connections)
         )
@@ -35,23 +41,29 @@ class WebSocketManager:
         """Remove a WebSocket connection."""
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+            WEBSOCKET_CONNECTIONS.set(len(self.active_connections))
             logger.info(
                 "📱 WebSocket disconnected. Active connections: %d",
                 len(self.active_connections)
             )
 
-    async def broadcast(self, message: dict):
-        """Broadcast a message to all connected WebSocket clients."""
+    async def broadcast(self, message):
+        """Broadcast a message to all connected WebSocket clients.
+
+        `message` is pre-encoded JSON (str or bytes) as published to Redis, or
+        an object to encode; either way it is encoded at most once, not per client.
+        """
         if not self.active_connections:
             logger.warning("📡 No active WebSocket connections to broadcast to")
             return
+        text = as_text(message)
 
         disconnected = []
         successful_broadcasts = 0
 
         for connection in self.active_connections:
             try:
-                await connection.send_json(message)
+                await connection.send_text(text)
                 successful_broadcasts += 1
             except Exception as e:
                 logger.warning(
@@ -62,6 +74,7 @@ class WebSocketManager:
         # Remove disconnected clients
         for connection in disconnected:
             self.disconnect(connection)
+        BROADCASTS_TOTAL.inc()
 
         logger.info(
             "📡 Broadcast successful to %d/%d clients",
@@ -81,17 +94,20 @@ def redis_subscriber():
         for message in pubsub.listen():
             if message['type'] == 'message':
                 try:
-                    data = json.loads(message['data'])
+                    # Already JSON from the publisher: forwarded as is, never decoded here
+                    data = message['data']
                     logger.info("📨 Received Redis message: %s", data)
 
                     # Schedule the broadcast in the event loop
-                    asyncio.run_coroutine_threadsafe(
+                    QUEUE_DEPTH.labels(queue="broadcast").inc()
+                    future = asyncio.run_coroutine_threadsafe(
                         manager.broadcast(data),
                         LOOP
                     )
+                    future.add_done_callback(
+                        lambda _: QUEUE_DEPTH.labels(queue="broadcast").dec()
+                    )
 
-                except json.JSONDecodeError as e:
-                    logger.error("❌ Invalid JSON in Redis message: %s", e)
                 except Exception as e:
                     logger.error("❌ Error processing Redis message: %s", e)
 
@@ -99,7 +115,7 @@ def redis_subscriber():
         logger.error("❌ Redis subscriber error: %s", e)
 
 # FastAPI app for WebSocket service
-app = FastAPI(title="WebSocket Service")
+app = FastAPI(title="WebSocket Service", default_response_class=CodecJSONResponse)
 
 # Global event loop variable
 LOOP = None
@@ -130,6 +146,15 @@ async def startup_event():
     subscriber_thread.start()
     logger.info("🚀 WebSocket service started")
 
+async def send_price_snapshot(websocket: WebSocket):
+    """Send a new client the latest price of every symbol in the shared-memory bars."""
+    from core.market_data.shared_bars import get_bar_reader  # pylint: disable=import-outside-toplevel
+
+    reader = get_bar_reader()
+    prices = await asyncio.to_thread(reader.latest_prices) if reader is not None else {}
+    if prices:
+        await websocket.send_text(as_text({"type": "prices", "data": prices}))
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time communication."""
@@ -137,6 +162,7 @@ async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
 
     try:
+        await send_price_snapshot(websocket)
         while True:
             # Keep connection alive and listen for client messages
             data = await websocket.receive_text()
@@ -144,7 +170,7 @@ async def websocket_endpoint(websocket: WebSocket):
 
             # Forward client messages to Redis if needed
             try:
-                message = json.loads(data)
+                message = loads(data)
                 message_type = message.get("type")
 
                 if message_type == "strategy_change":
@@ -156,7 +182,7 @@ async def websocket_endpoint(websocket: WebSocket):
                     # This would be handled by the main API service
                     logger.info("Status toggle received - forwarding to main API")
 
-            except json.JSONDecodeError:
+            except JSONDecodeError:
                 logger.warning("⚠️ Received invalid JSON from WebSocket client")
 
     except WebSocketDisconnect:
@@ -171,6 +197,12 @@ def health():
     """Health check endpoint."""
     return {"status": "healthy", "connections": len(manager.active_connections)}
 
+@app.get("/metrics")
+def metrics():
+    """Prometheus metrics endpoint."""
+    payload, content_type = metrics_payload()
+    return Response(content=payload, media_type=content_type)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)